@@ -0,0 +1,150 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from faq_index import normalize_text
+
+
+class AnswerLease:
+    """The right (and duty) to ask the LLM for one cache key; see AnswerCache.acquire"""
+
+    def __init__(self, cache, key, event, generation):
+        self.cache = cache
+        self.key = key
+        self.event = event  # None when not registered as the in-flight leader
+        self.generation = generation
+        self.released = False
+
+    def release(self, answer=None, cacheable=False):
+        """Store the answer if cacheable and wake requests waiting on this key; safe to call twice"""
+        if not self.released:
+            self.released = True
+            self.cache._release(self, answer, cacheable)
+
+
+class AnswerCache:
+    """
+    TTL + LRU cache of chatbot LLM answers with single-flight coalescing: while one
+    request is asking the LLM a question, identical questions wait for its answer
+    instead of making their own upstream call.
+    """
+
+    def __init__(self, ttl_seconds=3600, max_entries=1024, wait_timeout=30.0):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+
+        self._entries = OrderedDict()  # key -> (answer, stored_at)
+        self._in_flight = {}  # key -> threading.Event set when the leader finishes
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by invalidate() so in-flight answers aren't stored
+
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query, chunk_ids, version):
+        """
+        Cache key for a question answered from the given knowledge chunks of a document
+        version. Nothing user-specific goes in: answers that depend on a conversation's
+        history must not be cached at all.
+        """
+        raw = "\0".join((version, normalize_text(query), ",".join(map(str, chunk_ids))))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key, now):
+        """Fresh cached answer or None; caller must hold the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry[1] >= self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def acquire(self, key):
+        """
+        (answer, None) for a cached answer, waiting for an identical in-flight request
+        first if there is one; otherwise (None, lease) and the caller must ask the LLM
+        and call lease.release(answer, cacheable) when done.
+        """
+        with self._lock:
+            answer = self._lookup(key, time.time())
+            if answer is not None:
+                self.hits += 1
+                return answer, None
+            event = self._in_flight.get(key)
+            if event is None:
+                event = threading.Event()
+                self._in_flight[key] = event
+                self.misses += 1
+                self.upstream_calls += 1
+                return None, AnswerLease(self, key, event, self._generation)
+
+        event.wait(self.wait_timeout)
+        with self._lock:
+            answer = self._lookup(key, time.time())
+            if answer is not None:
+                self.coalesced += 1
+                return answer, None
+            # The leader failed or timed out; ask on our own without blocking others
+            self.misses += 1
+            self.upstream_calls += 1
+            return None, AnswerLease(self, key, None, self._generation)
+
+    def _release(self, lease, answer, cacheable):
+        with self._lock:
+            if cacheable and answer and lease.generation == self._generation:
+                self._entries[lease.key] = (answer, time.time())
+                self._entries.move_to_end(lease.key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            if lease.event is not None:
+                del self._in_flight[lease.key]
+        if lease.event is not None:
+            lease.event.set()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached answer for key, or call compute() -> (answer, cacheable).
+        Only cacheable answers are stored or shared with waiting requests; a waiter
+        whose leader failed computes its own answer.
+        """
+        answer, lease = self.acquire(key)
+        if lease is None:
+            return answer
+        cacheable = False
+        try:
+            answer, cacheable = compute()
+        finally:
+            lease.release(answer, cacheable)
+        return answer
+
+    def invalidate(self):
+        """Drop every cached answer, e.g. after the chatbot's document_text changes"""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+        return dropped
+
+    def stats(self):
+        with self._lock:
+            saved = self.hits + self.coalesced
+            lookups = saved + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "hit_rate": saved / lookups if lookups else 0.0,
+                "upstream_calls": self.upstream_calls,
+                "upstream_calls_saved": saved,
+                "invalidations": self.invalidations,
+            }
@@ -1,14 +1,45 @@
 import sqlite3
 import os
+import json
+import time
+import uuid
+import zlib
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, url_for, session, g
+from flask import Flask, render_template, request, redirect, url_for, session, g, Response, flash
+from flask import before_render_template, template_rendered
 from werkzeug.security import generate_password_hash, check_password_hash
-from groq import Groq
 from dotenv import load_dotenv
 from flask import jsonify
 from chatbot import FoodPulseChatbot
-
-chatbot_instance = FoodPulseChatbot()
+from answer_cache import AnswerCache
+from chat_sessions import ChatSessionStore
+from rate_limiter import MemoryBucketStore, RateLimiter, SQLiteBucketStore
+from llm_gateway import get_default_gateway
+from shelf_life_cache import ShelfLifeCache, normalize_food_name
+from shelf_life_rules import EstimateTierStats, estimate_shelf_life_by_rules
+from estimation_worker import EstimationWorkerPool
+from expiry_sweeper import ExpirySweeper
+from listing_events import RESYNC, ListingEventBroker
+from dashboard_cache import VersionedCache, data_version
+from migrations import migrate
+from db import ConnectionPool
+from metrics import SQL_BUCKETS, MetricsRegistry, statement_label, timed_connection_factory
+from claims import CLAIM_MESSAGES, CLAIMED, NOT_FOUND, claim_listing
+from queries import (
+    ADMIN_ARCHIVE_PAGE_SQL, ADMIN_LISTINGS_PAGE_SQL, ADMIN_NGOS_SQL, ADMIN_RESTAURANTS_SQL, NEARBY_LISTINGS_SQL,
+    NGO_LISTINGS_PAGE_SQL, RESTAURANT_ARCHIVE_PAGE_SQL, RESTAURANT_LISTINGS_PAGE_SQL, RESTAURANT_LISTINGS_SQL
+)
+from pagination import DEFAULT_PAGE_SIZE, encode_cursor, decode_cursor, fetch_page, listing_to_dict, parse_page_size
+from listing_search import SEARCH_STATUSES, find_listings, hours_left, parse_hours, search_params, search_terms
+from geo import DEFAULT_RADIUS_KM, distance_from_row, nearby_params, parse_coordinates, parse_radius
+from bulk_ingest import MAX_BULK_ROWS, estimate_shelf_lives, parse_batch_response, parse_bulk_listings, validate_rows
+
+# Per-user chatbot history lives in chat_sessions; the chatbot itself is created once the database is ready
+chat_sessions = ChatSessionStore(
+    max_sessions=int(os.environ.get("CHAT_MAX_SESSIONS", 10000)),
+    ttl_seconds=int(os.environ.get("CHAT_SESSION_TTL", 3600)),
+    max_bytes=int(os.environ.get("CHAT_MAX_BYTES", 64 * 1024 * 1024)),
+)
 
 
 def adapt_datetime(dt):
@@ -31,54 +62,291 @@ app = Flask(__name__)
 app.secret_key = os.urandom(24)
 DATABASE = 'database.db'
 
-# Initialize Groq Client
-try:
-    groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-except Exception as e:
-    print(f"Failed to initialize Groq client: {e}")
-    groq_client = None
+# Bring the schema up to date before anything touches the database
+migrate(DATABASE)
+
+# Timing hooks published on /metrics in the Prometheus text format; METRICS_ENABLED=0 turns
+# them off. SLOW_QUERY_MS / SLOW_REQUEST_MS (0 = off) print statements and requests slower than that.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 0))
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 0))
+metrics = MetricsRegistry()
+request_seconds = metrics.histogram(
+    "foodpulse_request_duration_seconds", "Time to build each response, by route", ("method", "route", "status"))
+sql_seconds = metrics.histogram(
+    "foodpulse_sql_statement_duration_seconds", "SQLite execute and fetch time per statement", ("statement",), SQL_BUCKETS)
+template_seconds = metrics.histogram(
+    "foodpulse_template_render_duration_seconds", "Jinja render time per template", ("template",))
+password_check_seconds = metrics.histogram(
+    "foodpulse_password_check_duration_seconds", "check_password_hash time at login")
+llm_seconds = metrics.histogram(
+    "foodpulse_llm_request_duration_seconds", "Groq completion time including retries, by outcome", ("model", "outcome"))
+chat_replies = metrics.counter(
+    "foodpulse_chat_replies_total", "Chatbot replies by where they came from", ("source",))
+
+def record_statement(sql, seconds):
+    sql_seconds.observe(seconds, statement_label(sql))
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        print(f"Slow query ({seconds * 1000:.1f} ms): {' '.join(sql.split())}")
+
+def record_llm_call(model, seconds, outcome):
+    llm_seconds.observe(seconds, model or "unknown", outcome)
+
+# Pooled connections with WAL / busy_timeout pragmas (see db.pragmas_from_env)
+db_pool = ConnectionPool(
+    DATABASE,
+    max_idle=int(os.environ.get("SQLITE_POOL_SIZE", 8)),
+    factory=timed_connection_factory(record_statement) if METRICS_ENABLED else sqlite3.Connection,
+)
+
+# Chatbot LLM rate limits. CHAT_RATE_LIMIT_BACKEND=sqlite shares the buckets between
+# worker processes (e.g. several gunicorn workers) through the rate_limit_buckets table.
+chat_rate_limiter = RateLimiter(
+    store=SQLiteBucketStore(db_pool) if os.environ.get("CHAT_RATE_LIMIT_BACKEND") == "sqlite" else MemoryBucketStore(),
+    user_rate=float(os.environ.get("CHAT_USER_RATE", 1.0)),
+    user_burst=int(os.environ.get("CHAT_USER_BURST", 3)),
+    global_rate=float(os.environ.get("CHAT_GLOBAL_RATE", 10.0)),
+    global_burst=int(os.environ.get("CHAT_GLOBAL_BURST", 20)),
+    daily_quota=int(os.environ.get("CHAT_DAILY_QUOTA", 100)),
+    global_daily_quota=int(os.environ.get("CHAT_GLOBAL_DAILY_QUOTA", 1000)),
+)
+
+# One pooled Groq client for both freshness estimates and the chatbot
+llm_gateway = get_default_gateway()
+if METRICS_ENABLED:
+    llm_gateway.on_call = record_llm_call
+
+# Stateless chatbot logic shared by all users; LLM answers are cached across users
+chat_answer_cache = AnswerCache(
+    ttl_seconds=int(os.environ.get("CHAT_CACHE_TTL", 3600)),
+    max_entries=int(os.environ.get("CHAT_CACHE_SIZE", 1024)),
+)
+chatbot_instance = FoodPulseChatbot(
+    rate_limiter=chat_rate_limiter, gateway=llm_gateway, answer_cache=chat_answer_cache,
+    on_reply=chat_replies.inc if METRICS_ENABLED else None,
+)
+
+# Shelf-life estimates cache (in-process LRU backed by the shelf_life_cache table)
+shelf_life_cache = ShelfLifeCache(
+    db_pool,
+    ttl_seconds=int(os.environ.get("SHELF_LIFE_CACHE_TTL", 7 * 24 * 3600)),
+    max_entries=int(os.environ.get("SHELF_LIFE_CACHE_SIZE", 1024)),
+)
+
+# Offline rule table answers first; the LLM is only asked when its confidence is below this
+SHELF_LIFE_RULE_CONFIDENCE = float(os.environ.get("SHELF_LIFE_RULE_CONFIDENCE", 0.75))
+shelf_life_tiers = EstimateTierStats()
 
 # Database Connection Management
 def get_db():
     db = getattr(g, '_database', None)
     if db is None:
-        db = g._database = sqlite3.connect(DATABASE, detect_types=sqlite3.PARSE_DECLTYPES)
-        db.row_factory = sqlite3.Row
+        db = g._database = db_pool.acquire()
     return db
 
 @app.teardown_appcontext
 def close_connection(exception):
-    db = getattr(g, '_database', None)
+    db = g.pop('_database', None)
     if db is not None:
-        db.close()
+        db_pool.release(db)
+
+@app.before_request
+def start_request_timer():
+    g._request_started = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    """Streamed responses (SSE, /chat/stream) are timed to their first byte"""
+    started = g.pop('_request_started', None)
+    if METRICS_ENABLED and started is not None:
+        seconds = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        request_seconds.observe(seconds, request.method, route, str(response.status_code))
+        if SLOW_REQUEST_MS and seconds * 1000 >= SLOW_REQUEST_MS:
+            print(f"Slow request ({seconds * 1000:.1f} ms): {request.method} {request.full_path} -> {response.status_code}")
+    return response
+
+def start_template_timer(sender, template, context, **extra):
+    g.setdefault('_template_starts', []).append(time.perf_counter())
+
+def record_template(sender, template, context, **extra):
+    starts = g.get('_template_starts')
+    if starts:
+        template_seconds.observe(time.perf_counter() - starts.pop(), template.name or 'string')
+
+if METRICS_ENABLED:
+    before_render_template.connect(start_template_timer, app)
+    template_rendered.connect(record_template, app)
 
 # Groq Function to get food freshness
-def get_food_freshness_duration(food_item_name):
-    if not groq_client:
-        print("Groq client not available. Defaulting to 48 hours.")
-        return 48
-
+def query_food_freshness_duration(food_item_name):
+    """Ask the LLM for a shelf life in hours; raises if the call fails or the response is unusable"""
+    response_text = llm_gateway.chat_completion({
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are a food safety expert. Your task is to estimate the safe consumption shelf life of a food item in hours, assuming it's prepared and stored correctly at room/refrigerated temperature. Respond with ONLY an integer representing the number of hours. Do not add any other text, explanation, or units."
+            },
+            {
+                "role": "user",
+                "content": f"Food item: '{food_item_name}'. How many hours does it stay fresh?"
+            }
+        ],
+        # --- MODIFIED: Switched to a currently supported model ---
+        "model": "llama-3.3-70b-versatile",
+        "temperature": 0.2,
+    })
+    return int(response_text)
+
+def query_food_freshness_batch(food_item_names):
+    """Estimate many food items in one LLM call; returns {food item: hours} for the items it could parse"""
+    item_lines = "\n".join(f"- {name}" for name in food_item_names)
+    response_text = llm_gateway.chat_completion({
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are a food safety expert. Your task is to estimate the safe consumption shelf life of each food item in hours, assuming it's prepared and stored correctly at room/refrigerated temperature. Respond with ONLY a JSON object mapping each food item exactly as written to an integer number of hours. Do not add any other text, explanation, or units."
+            },
+            {
+                "role": "user",
+                "content": f"Food items:\n{item_lines}\nHow many hours does each stay fresh?"
+            }
+        ],
+        "model": "llama-3.3-70b-versatile",
+        "temperature": 0.2,
+    })
+    return parse_batch_response(response_text, food_item_names)
+
+def rule_shelf_life(food_item_name):
+    """Hours from the offline rule table when it is confident enough, else None"""
+    estimate = estimate_shelf_life_by_rules(food_item_name)
+    if estimate is not None and estimate.confidence >= SHELF_LIFE_RULE_CONFIDENCE:
+        return estimate.hours
+    return None
+
+def offline_estimate(food_item_name):
+    """(hours, tier) without calling the LLM: confident rule estimate, then the cache; (None, None) if neither knows"""
+    hours = rule_shelf_life(food_item_name)
+    if hours is not None:
+        shelf_life_tiers.record("rules")
+        return hours, "rules"
+    hours = shelf_life_cache.get(food_item_name)
+    if hours is not None:
+        shelf_life_tiers.record("cache")
+        return hours, "cache"
+    return None, None
+
+def offline_shelf_life(food_item_name):
+    """Shelf life without calling the LLM: confident rule estimate, then the cache; None if neither knows"""
+    return offline_estimate(food_item_name)[0]
+
+def estimate_food_freshness(food_item_name):
+    """(hours, tier) from the rules, the cache, then the LLM; raises when no estimate could be made"""
+    hours, tier = offline_estimate(food_item_name)
+    if hours is not None:
+        return hours, tier
+
+    hours = query_food_freshness_duration(food_item_name)
+    # Only real estimates are cached; fallbacks are retried next time
+    shelf_life_cache.set(food_item_name, hours)
+    shelf_life_tiers.record("llm")
+    return hours, "llm"
+
+def estimate_food_freshness_duration(food_item_name):
+    """Shelf-life estimate in hours (rules, cache, then LLM); raises when no estimate could be made"""
+    return estimate_food_freshness(food_item_name)[0]
+
+def fallback_estimate(food_item_name):
+    """(hours, tier) when the LLM can't answer: the rule estimate even at low confidence, else 48 hours"""
+    estimate = estimate_shelf_life_by_rules(food_item_name)
+    if estimate is not None:
+        shelf_life_tiers.record("rules_fallback")
+        return estimate.hours, "rules_fallback"
+    shelf_life_tiers.record("default")
+    return 48, "default"
+
+def fallback_shelf_life(food_item_name):
+    return fallback_estimate(food_item_name)[0]
+
+def food_freshness_estimate(food_item_name):
+    """(hours, tier) for a food item, falling back when the LLM fails; never raises"""
     try:
-        chat_completion = groq_client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a food safety expert. Your task is to estimate the safe consumption shelf life of a food item in hours, assuming it's prepared and stored correctly at room/refrigerated temperature. Respond with ONLY an integer representing the number of hours. Do not add any other text, explanation, or units."
-                },
-                {
-                    "role": "user",
-                    "content": f"Food item: '{food_item_name}'. How many hours does it stay fresh?"
-                }
-            ],
-            # --- MODIFIED: Switched to a currently supported model ---
-            model="llama-3.3-70b-versatile",
-            temperature=0.2,
-        )
-        response_text = chat_completion.choices[0].message.content.strip()
-        return int(response_text)
+        return estimate_food_freshness(food_item_name)
     except Exception as e:
-        print(f"Groq API call failed or returned invalid data: {e}. Defaulting to 48 hours.")
-        return 48
+        hours, tier = fallback_estimate(food_item_name)
+        print(f"Groq API call failed or returned invalid data: {e}. Defaulting to {hours} hours.")
+        return hours, tier
+
+def get_food_freshness_duration(food_item_name):
+    return food_freshness_estimate(food_item_name)[0]
+
+# Live listing updates for NGO dashboards (GET /api/listings/events)
+listing_events = ListingEventBroker(
+    max_subscribers=int(os.environ.get("LISTING_EVENTS_MAX_SUBSCRIBERS", 500)),
+    max_queue=int(os.environ.get("LISTING_EVENTS_QUEUE_SIZE", 256)),
+    history_size=int(os.environ.get("LISTING_EVENTS_HISTORY", 4096)),
+    stall_seconds=float(os.environ.get("LISTING_EVENTS_STALL_SECONDS", 5)),
+)
+LISTING_EVENTS_HEARTBEAT = float(os.environ.get("LISTING_EVENTS_HEARTBEAT", 15))
+
+# Rendered dashboards (and the NGO listing page they share) are cached per data version:
+# triggers bump the data_version row on every listing and user write, whichever process
+# or script made it. Entries also roll over every DASHBOARD_CACHE_TTL seconds, which
+# bounds how long read-time expiry and the "Near You" collection window can lag. DASHBOARD_CACHE_TTL=0 turns caching off.
+dashboard_cache = VersionedCache(max_entries=int(os.environ.get("DASHBOARD_CACHE_SIZE", 512)))
+DASHBOARD_CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", 30))
+
+def listings_changed(event_type, data):
+    """Tell live dashboards what changed (cached ones are invalidated by the data_version row)"""
+    listing_events.publish(event_type, data)
+
+def publish_new_listings(db, restaurant_id, listings):
+    """Announce freshly inserted listings, given as (id, food_item, quantity, fresh_until) tuples"""
+    restaurant = db.execute('SELECT name, address FROM users WHERE id = ?', (restaurant_id,)).fetchone()
+    listings_changed("listings_added", {"listings": [
+        {
+            "id": listing_id,
+            "restaurant_id": restaurant_id,
+            "restaurant_name": restaurant['name'],
+            "restaurant_address": restaurant['address'],
+            "food_item": food_item,
+            "quantity": quantity,
+            "fresh_until": fresh_until.isoformat() if fresh_until else None,
+        }
+        for listing_id, food_item, quantity, fresh_until in listings
+    ]})
+
+def publish_estimate(listing_id, fresh_until):
+    listings_changed("listing_updated", {"id": listing_id, "fresh_until": fresh_until.isoformat()})
+
+# Asynchronous estimation: listings are inserted with fresh_until = NULL ("pending estimate")
+# and a background pool fills it in. Enabled with FRESHNESS_ASYNC=1.
+estimation_pool = None
+if os.environ.get("FRESHNESS_ASYNC") == "1":
+    estimation_pool = EstimationWorkerPool(
+        db_pool,
+        estimate_food_freshness_duration,
+        max_workers=int(os.environ.get("FRESHNESS_WORKERS", 4)),
+        max_queue_size=int(os.environ.get("FRESHNESS_QUEUE_SIZE", 256)),
+        max_retries=int(os.environ.get("FRESHNESS_RETRIES", 3)),
+        fallback_fn=fallback_shelf_life,
+        on_resolved=publish_estimate,
+    )
+    estimation_pool.start()
+    estimation_pool.requeue_pending()
+
+# Stores status = 'Expired' once fresh_until passes and archives old Claimed / Expired listings.
+# EXPIRY_SWEEP_INTERVAL=0 turns the background thread off (e.g. when cron runs expiry_sweeper.py).
+expiry_sweeper = ExpirySweeper(
+    db_pool,
+    batch_size=int(os.environ.get("EXPIRY_SWEEP_BATCH", 500)),
+    archive_after_days=float(os.environ.get("LISTING_ARCHIVE_AFTER_DAYS", 30)),
+    on_expired=lambda ids: listings_changed("listings_expired", {"ids": ids}),
+)
+EXPIRY_SWEEP_INTERVAL = float(os.environ.get("EXPIRY_SWEEP_INTERVAL", 60))
+if EXPIRY_SWEEP_INTERVAL > 0:
+    expiry_sweeper.start(EXPIRY_SWEEP_INTERVAL)
 
 
 
@@ -118,7 +386,12 @@ def login_page():
         db = get_db()
         user = db.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
 
-        if user and check_password_hash(user['password'], password):
+        valid = False
+        if user:
+            started = time.perf_counter()
+            valid = check_password_hash(user['password'], password)
+            password_check_seconds.observe(time.perf_counter() - started)
+        if valid:
             session['user_id'] = user['id']
             session['name'] = user['name']
             session['account_type'] = user['account_type']
@@ -138,44 +411,253 @@ def dashboard():
     if not session.get('is_profile_complete'):
         return redirect(url_for('profile'))
 
+    # A page with flash messages to show is rendered fresh (and consumes them)
+    if DASHBOARD_CACHE_TTL <= 0 or '_flashes' in session:
+        return render_dashboard(None)
+
+    version = (data_version(get_db()), int(time.time() // DASHBOARD_CACHE_TTL))
+    etag = f"{session['user_id']}-{version[0]}-{version[1]}-{zlib.crc32(request.full_path.encode('utf-8')):x}"
+    if request.if_none_match.contains(etag):
+        # Nothing changed since this browser's copy: one primary-key read and no page queries
+        response = app.response_class(status=304)
+    else:
+        key = (session['user_id'], session['account_type'], request.full_path)
+        html = dashboard_cache.get(key, version)
+        if html is None:
+            html = render_dashboard(version)
+            if not isinstance(html, str):
+                return html
+            dashboard_cache.put(key, version, html)
+        response = app.make_response(html)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def render_dashboard(version):
+    """The logged-in user's dashboard; version (None: don't cache) lets NGOs share the listing page query"""
     db = get_db()
     account_type = session['account_type']
     
-    expiration_check_sql = "CASE WHEN DATETIME('now', 'localtime') > fresh_until THEN 'Expired' ELSE status END as current_status"
-
     if account_type == 'restaurant':
-        listings = db.execute(
-            f'SELECT *, {expiration_check_sql} FROM food_listings WHERE restaurant_id = ? ORDER BY timestamp DESC',
-            (session['user_id'],)
-        ).fetchall()
-        return render_template('restaurant_dashboard.html', listings=listings)
+        listings = db.execute(RESTAURANT_LISTINGS_SQL, (session['user_id'],)).fetchall()
+        return render_template('restaurant_dashboard.html', listings=listings, async_estimates=estimation_pool is not None)
 
     elif account_type in ['ngo', 'old-age-home']:
-        listings = db.execute(
-            f"""
-            SELECT fl.*, u.name as restaurant_name, u.address as restaurant_address, {expiration_check_sql}
-            FROM food_listings fl
-            JOIN users u ON fl.restaurant_id = u.id
-            WHERE fl.status != 'Claimed'
-            ORDER BY fl.timestamp DESC
-            """
-        ).fetchall()
-        return render_template('ngo_dashboard.html', listings=listings)
+        cursor = request.args.get('cursor')
+        load_page = lambda: fetch_page(db, NGO_LISTINGS_PAGE_SQL, (), cursor, DEFAULT_PAGE_SIZE)
+        if version is None:
+            listings, next_cursor = load_page()
+        else:
+            listings, next_cursor = dashboard_cache.get_or_compute(('ngo_listings', cursor), version, load_page)
+        nearby = None
+        location = user_location(db, session['user_id'])
+        if location is not None and not request.args.get('cursor'):
+            nearby = find_nearby_listings(db, *location, DEFAULT_RADIUS_KM, DEFAULT_PAGE_SIZE)
+        search_query = request.args.get('q', '').strip()
+        search_results = search_listings(db, search_query) if search_query else None
+        return render_template('ngo_dashboard.html', listings=listings, next_cursor=next_cursor,
+                               nearby=nearby, nearby_radius_km=DEFAULT_RADIUS_KM,
+                               search_query=search_query, search_results=search_results)
 
     elif account_type == 'admin':
-        restaurants = db.execute("SELECT name, email, address, phone_number FROM users WHERE account_type = 'restaurant'").fetchall()
-        ngos = db.execute("SELECT name, email, address, phone_number FROM users WHERE account_type IN ('ngo', 'old-age-home')").fetchall()
-        listings = db.execute(
-            f"""
-            SELECT fl.*, u.name as restaurant_name, {expiration_check_sql}
-            FROM food_listings fl JOIN users u ON fl.restaurant_id = u.id 
-            ORDER BY fl.timestamp DESC
-            """
-        ).fetchall()
-        return render_template('admin_dashboard.html', restaurants=restaurants, ngos=ngos, listings=listings)
+        restaurants = db.execute(ADMIN_RESTAURANTS_SQL).fetchall()
+        ngos = db.execute(ADMIN_NGOS_SQL).fetchall()
+        archive = request.args.get('archive') == '1'
+        listings_sql = ADMIN_ARCHIVE_PAGE_SQL if archive else ADMIN_LISTINGS_PAGE_SQL
+        listings, next_cursor = fetch_page(db, listings_sql, (), request.args.get('cursor'), DEFAULT_PAGE_SIZE)
+        return render_template('admin_dashboard.html', restaurants=restaurants, ngos=ngos, listings=listings,
+                               next_cursor=next_cursor, totals=platform_totals(restaurants), archive=archive)
 
     return redirect(url_for('index'))
 
+def platform_totals(restaurants):
+    """Platform-wide figures summed from the per-restaurant rollup rows"""
+    totals = {key: sum(r[key] for r in restaurants) for key in ('listed', 'claimed', 'expired', 'timed_claims', 'claim_seconds')}
+    listed = totals['listed']
+    totals['claim_rate'] = totals['claimed'] / listed if listed else 0.0
+    totals['expiry_rate'] = totals['expired'] / listed if listed else 0.0
+    totals['avg_hours_to_claim'] = totals['claim_seconds'] / totals['timed_claims'] / 3600 if totals['timed_claims'] else None
+    return totals
+
+@app.route('/api/listings')
+def api_listings():
+    """
+    Keyset-paginated listings for the logged-in user's role, streamed as JSON.
+    Restaurants and admins pass ?archive=1 for listings the expiry sweeper archived.
+    """
+    if 'user_id' not in session:
+        return jsonify({"error": "Login required"}), 401
+
+    account_type = session['account_type']
+    archive = request.args.get('archive') == '1'
+    if account_type == 'restaurant':
+        sql = RESTAURANT_ARCHIVE_PAGE_SQL if archive else RESTAURANT_LISTINGS_PAGE_SQL
+        params = (session['user_id'],)
+    elif account_type in ['ngo', 'old-age-home']:
+        sql, params = NGO_LISTINGS_PAGE_SQL, ()
+    elif account_type == 'admin':
+        sql, params = ADMIN_ARCHIVE_PAGE_SQL if archive else ADMIN_LISTINGS_PAGE_SQL, ()
+    else:
+        return jsonify({"error": "Unknown account type"}), 403
+
+    page_size = parse_page_size(request.args.get('limit'))
+    params = (*params, *decode_cursor(request.args.get('cursor')), page_size + 1)
+
+    def generate():
+        # Rows are serialized one at a time straight off the SQLite cursor. The generator
+        # outlives the request's app context, so it holds its own pooled connection.
+        db = db_pool.acquire()
+        try:
+            yield '{"listings": ['
+            next_cursor = None
+            last_row = None
+            for count, row in enumerate(db.execute(sql, params)):
+                if count == page_size:
+                    next_cursor = encode_cursor(last_row)
+                    break
+                yield (',' if count else '') + json.dumps(listing_to_dict(row))
+                last_row = row
+            yield f'], "next_cursor": {json.dumps(next_cursor)}}}'
+        finally:
+            db_pool.release(db)
+
+    return Response(generate(), mimetype='application/json')
+
+def user_location(db, user_id):
+    row = db.execute('SELECT latitude, longitude FROM users WHERE id = ?', (user_id,)).fetchone()
+    if row is None or row['latitude'] is None or row['longitude'] is None:
+        return None
+    return row['latitude'], row['longitude']
+
+def find_nearby_listings(db, lat, lon, radius_km, limit):
+    """Available listings within radius_km that can still be collected in time, soonest-expiring first"""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = db.execute(NEARBY_LISTINGS_SQL, nearby_params(lat, lon, radius_km, now, limit)).fetchall()
+    listings = []
+    for row in rows:
+        listing = listing_to_dict(row)
+        del listing['distance_sq_km'], listing['spare_hours']
+        listing['distance_km'] = distance_from_row(row)
+        listings.append(listing)
+    return listings
+
+@app.route('/api/listings/nearby')
+def api_nearby_listings():
+    """Listings near ?lat=&lon= (default: the user's saved location) within ?radius_km=, soonest-expiring first"""
+    if 'user_id' not in session:
+        return jsonify({"error": "Login required"}), 401
+    if session['account_type'] not in ['ngo', 'old-age-home', 'admin']:
+        return jsonify({"error": "Only NGOs and old-age homes can search nearby listings"}), 403
+
+    db = get_db()
+    try:
+        location = parse_coordinates(request.args.get('lat'), request.args.get('lon'))
+    except ValueError:
+        return jsonify({"error": "lat and lon must be valid coordinates"}), 400
+    if location is None:
+        location = user_location(db, session['user_id'])
+    if location is None:
+        return jsonify({"error": "Pass lat and lon, or save your location on the profile page"}), 400
+
+    radius_km = parse_radius(request.args.get('radius_km'))
+    listings = find_nearby_listings(db, *location, radius_km, parse_page_size(request.args.get('limit')))
+    return jsonify({"latitude": location[0], "longitude": location[1], "radius_km": radius_km, "listings": listings})
+
+def search_listings(db, text, status='Available', restaurant_id=None, min_hours_left=None, max_hours_left=None,
+                    limit=DEFAULT_PAGE_SIZE):
+    """Listings matching the search words and filters, best match first, then closest to expiring"""
+    now = datetime.now()
+    params = search_params(search_terms(text), status, restaurant_id, min_hours_left, max_hours_left, now, limit)
+    listings = []
+    for row in find_listings(db, params):
+        listing = listing_to_dict(row)
+        hours = hours_left(row['fresh_until'], now)
+        listing['hours_left'] = round(hours, 2) if hours is not None else None
+        listing.pop('rank_score', None)
+        # bm25 is lower for better matches; relevance reads the usual way round
+        listing['relevance'] = round(-row['rank_score'], 3) if 'rank_score' in row.keys() else None
+        listings.append(listing)
+    return listings
+
+@app.route('/api/listings/search')
+def api_search_listings():
+    """
+    Full-text search over food item and quantity: ?q= (every word must match), ?status=
+    (default Available), ?restaurant_id=, ?min_hours_left= / ?max_hours_left= (freshness
+    window, negative for the past) and ?limit=. Restaurants only search their own listings.
+    """
+    if 'user_id' not in session:
+        return jsonify({"error": "Login required"}), 401
+
+    status = request.args.get('status') or 'Available'
+    if status not in SEARCH_STATUSES:
+        return jsonify({"error": f"status must be one of {', '.join(SEARCH_STATUSES)}"}), 400
+    try:
+        restaurant_id = request.args.get('restaurant_id')
+        restaurant_id = int(restaurant_id) if restaurant_id else None
+        min_hours_left = parse_hours(request.args.get('min_hours_left'))
+        max_hours_left = parse_hours(request.args.get('max_hours_left'))
+    except ValueError:
+        return jsonify({"error": "restaurant_id must be an integer and min/max_hours_left numbers"}), 400
+    if session['account_type'] == 'restaurant':
+        restaurant_id = session['user_id']
+
+    query = request.args.get('q', '')
+    listings = search_listings(get_db(), query, status, restaurant_id, min_hours_left, max_hours_left,
+                               parse_page_size(request.args.get('limit')))
+    return jsonify({"query": query, "status": status, "listings": listings})
+
+@app.route('/api/admin/stats')
+def admin_stats():
+    """Internal counters for the connection pool and shelf-life estimation"""
+    if session.get('account_type') != 'admin':
+        return jsonify({"error": "Admin login required"}), 403
+    return jsonify({
+        "db_pool": db_pool.stats(),
+        "chat_sessions": chat_sessions.stats(),
+        "llm_gateway": llm_gateway.stats(),
+        "chat_answer_cache": chat_answer_cache.stats(),
+        "shelf_life_cache": shelf_life_cache.stats(),
+        "shelf_life_tiers": shelf_life_tiers.stats(),
+        "estimation_pool": estimation_pool.stats() if estimation_pool is not None else None,
+        "listing_events": listing_events.stats(),
+        "expiry_sweeper": expiry_sweeper.stats(),
+        "dashboard_cache": dict(dashboard_cache.stats(), data_version=data_version(get_db())),
+    })
+
+def faq_hit_ratio():
+    """Share of chat questions past the greeting / off-topic filter that an FAQ answered instead of the LLM"""
+    counts = {labels[0]: count for labels, count in chat_replies.values().items()}
+    answered = counts.get('faq', 0) + counts.get('llm', 0)
+    return {(): counts.get('faq', 0) / answered if answered else 0.0}
+
+# "default" is the 48-hour fallback used when neither the rules nor the LLM could estimate
+metrics.collected(
+    "foodpulse_shelf_life_estimates_total", "Shelf-life estimates by the tier that answered",
+    lambda: {('default_48h' if tier == 'default' else tier,): count
+             for tier, count in shelf_life_tiers.stats()['counts'].items()},
+    ("tier",), metric_type="counter",
+)
+metrics.collected("foodpulse_chat_faq_hit_ratio", "FAQ answers / (FAQ + LLM answers) since start", faq_hit_ratio)
+metrics.collected("foodpulse_db_connections_in_use", "Pooled SQLite connections checked out",
+                  lambda: {(): db_pool.stats()['in_use']})
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Timing histograms and counters for Prometheus; with METRICS_TOKEN set, scrapers send it as a bearer token"""
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    if METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+        return jsonify({"error": "Metrics token required"}), 401
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
+@app.route('/api/admin/chat_cache/invalidate', methods=['POST'])
+def invalidate_chat_cache():
+    """Drop cached chatbot answers, e.g. after editing the chatbot's document_text"""
+    if session.get('account_type') != 'admin':
+        return jsonify({"error": "Admin login required"}), 403
+    return jsonify({"invalidated": chat_answer_cache.invalidate()})
+
 @app.route('/profile', methods=['GET', 'POST'])
 def profile():
     if 'user_id' not in session:
@@ -184,9 +666,15 @@ def profile():
     if request.method == 'POST':
         address = request.form['address']
         phone_number = request.form['phone_number']
+        try:
+            location = parse_coordinates(request.form.get('latitude'), request.form.get('longitude'))
+        except ValueError:
+            flash('Please enter a valid latitude and longitude, or leave both blank.')
+            return redirect(url_for('profile'))
+        latitude, longitude = location if location is not None else (None, None)
         db.execute(
-            'UPDATE users SET address = ?, phone_number = ?, is_profile_complete = 1 WHERE id = ?',
-            (address, phone_number, session['user_id'])
+            'UPDATE users SET address = ?, phone_number = ?, latitude = ?, longitude = ?, is_profile_complete = 1 WHERE id = ?',
+            (address, phone_number, latitude, longitude, session['user_id'])
         )
         db.commit()
         session['is_profile_complete'] = 1
@@ -203,36 +691,134 @@ def add_food():
     quantity = request.form['quantity']
     restaurant_id = session['user_id']
     
-    hours_to_be_fresh = get_food_freshness_duration(food_item)
-    
     current_time = datetime.now()
-    fresh_until_time = current_time + timedelta(hours=hours_to_be_fresh)
-    
     db = get_db()
-    db.execute(
+
+    if estimation_pool is not None:
+        known_hours = offline_shelf_life(food_item)
+        fresh_until_time = current_time + timedelta(hours=known_hours) if known_hours is not None else None
+        cursor = db.execute(
+            'INSERT INTO food_listings (restaurant_id, food_item, quantity, fresh_until) VALUES (?, ?, ?, ?)',
+            (restaurant_id, food_item, quantity, fresh_until_time)
+        )
+        db.commit()
+        if fresh_until_time is None and not estimation_pool.submit(cursor.lastrowid, food_item, current_time):
+            # Queue is full: resolve inline rather than leave the row pending
+            hours_to_be_fresh = get_food_freshness_duration(food_item)
+            fresh_until_time = current_time + timedelta(hours=hours_to_be_fresh)
+            db.execute(
+                'UPDATE food_listings SET fresh_until = ? WHERE id = ?',
+                (fresh_until_time, cursor.lastrowid)
+            )
+            db.commit()
+        publish_new_listings(db, restaurant_id, [(cursor.lastrowid, food_item, quantity, fresh_until_time)])
+        return redirect(url_for('dashboard'))
+
+    hours_to_be_fresh = get_food_freshness_duration(food_item)
+    fresh_until_time = current_time + timedelta(hours=hours_to_be_fresh)
+
+    cursor = db.execute(
         'INSERT INTO food_listings (restaurant_id, food_item, quantity, fresh_until) VALUES (?, ?, ?, ?)',
         (restaurant_id, food_item, quantity, fresh_until_time)
     )
     db.commit()
+    publish_new_listings(db, restaurant_id, [(cursor.lastrowid, food_item, quantity, fresh_until_time)])
     return redirect(url_for('dashboard'))
 
+@app.route('/add_food/bulk', methods=['POST'])
+def add_food_bulk():
+    """Create many listings from a CSV or JSON upload in one transaction"""
+    if 'user_id' not in session or session['account_type'] != 'restaurant':
+        return jsonify({"error": "Login as a restaurant to add listings"}), 401
+
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            body = upload.read().decode('utf-8-sig')
+            content_type = 'application/json' if upload.filename.lower().endswith('.json') else 'text/csv'
+        else:
+            body = request.get_data(as_text=True)
+            content_type = request.content_type or ''
+        rows = parse_bulk_listings(content_type, body)
+    except ValueError as e:  # including UnicodeDecodeError
+        return jsonify({"error": f"Invalid upload: {e}"}), 400
+    if len(rows) > MAX_BULK_ROWS:
+        return jsonify({"error": f"At most {MAX_BULK_ROWS} listings per upload"}), 400
+
+    valid_rows, results = validate_rows(rows)
+    estimates = estimate_shelf_lives(
+        [food_item for _, food_item, _ in valid_rows],
+        shelf_life_cache,
+        query_food_freshness_batch,
+        food_freshness_estimate,
+        local_estimate=rule_shelf_life,
+        record_tier=shelf_life_tiers.record,
+    )
+
+    current_time = datetime.now()
+    restaurant_id = session['user_id']
+    inserts = []
+    for index, food_item, quantity in valid_rows:
+        hours, source = estimates[normalize_food_name(food_item)]
+        fresh_until_time = current_time + timedelta(hours=hours)
+        inserts.append((restaurant_id, food_item, quantity, fresh_until_time))
+        results.append({
+            "row": index,
+            "status": "created",
+            "food_item": food_item,
+            "fresh_until": fresh_until_time.isoformat(),
+            "estimate_source": source,
+        })
+
+    db = get_db()
+    with db:
+        db.executemany(
+            'INSERT INTO food_listings (restaurant_id, food_item, quantity, fresh_until) VALUES (?, ?, ?, ?)',
+            inserts
+        )
+        # The transaction holds the write lock, so AUTOINCREMENT gave the rows consecutive ids
+        # ending at last_insert_rowid(); executemany can't return rows, so RETURNING is no help
+        last_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
+    if inserts:
+        first_id = last_id - len(inserts) + 1
+        publish_new_listings(db, restaurant_id, [(first_id + i, *insert[1:]) for i, insert in enumerate(inserts)])
+
+    results.sort(key=lambda result: result["row"])
+    return jsonify({"created": len(inserts), "failed": len(results) - len(inserts), "results": results})
+
 @app.route('/claim_food/<int:listing_id>', methods=['POST'])
 def claim_food(listing_id):
     if 'user_id' not in session or session['account_type'] not in ['ngo', 'old-age-home']:
         return redirect(url_for('login_page'))
-    db = get_db()
-    db.execute(
-        "UPDATE food_listings SET status = 'Claimed', claimed_by_id = ? WHERE id = ?",
-        (session['user_id'], listing_id)
-    )
-    db.commit()
+    result = claim_listing(get_db(), listing_id, session['user_id'])
+    if result == CLAIMED:
+        listings_changed("listing_claimed", {"id": listing_id})
+
+    if request.accept_mimetypes.best == 'application/json':
+        status_code = {CLAIMED: 200, NOT_FOUND: 404}.get(result, 409)
+        return jsonify({"result": result, "message": CLAIM_MESSAGES[result]}), status_code
+
+    flash(CLAIM_MESSAGES[result])
     return redirect(url_for('dashboard'))
 
 @app.route('/logout')
 def logout():
+    chat_sessions.discard(session.get('chat_session_id'))
     session.clear()
     return redirect(url_for('index'))
 
+def get_chat_state():
+    """
+    Each browser session gets its own history. Rate limits count against the logged-in
+    account, or the client IP when anonymous: a client can drop its cookie for a fresh
+    session, but not for fresh limits.
+    """
+    if 'chat_session_id' not in session:
+        session['chat_session_id'] = uuid.uuid4().hex
+    state = chat_sessions.get(session['chat_session_id'])
+    state.rate_limit_key = f"account:{session['user_id']}" if 'user_id' in session else f"ip:{request.remote_addr}"
+    return state
+
 @app.route('/chat', methods=['POST'])
 def chat():
     # Ensure the request is in the correct format (JSON)
@@ -243,9 +829,82 @@ def chat():
     if not user_message:
         return jsonify({"error": "No message provided"}), 400
 
-    # Use the chatbot instance to get a response
-    ai_response = chatbot_instance.generate_response(user_message)
+    chat_state = get_chat_state()
+    ai_response = chatbot_instance.generate_response(user_message, chat_state)
+    if chat_state.retry_after:
+        # Rate limited: answer immediately and tell the client when to come back.
+        # 429 for our own limits, 503 when Groq is the one refusing.
+        response = jsonify({'reply': ai_response, 'retry_after': chat_state.retry_after})
+        response.headers['Retry-After'] = str(chat_state.retry_after)
+        return response, 503 if chat_state.busy else 429
     return jsonify({'reply': ai_response})
 
+def sse_event(data, event=None, event_id=None):
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    prefix += f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.route('/api/listings/events')
+def listing_event_stream():
+    """
+    Server-sent listing events for NGO dashboards: "listings_added", "listing_updated"
+    (estimate ready), "listing_claimed", or "resync" when the client must reload.
+    Browsers resume after a dropped connection by sending Last-Event-ID.
+    """
+    if session.get('account_type') not in ['ngo', 'old-age-home', 'admin']:
+        return jsonify({"error": "Login as an NGO or old-age home"}), 403
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    subscription = listing_events.subscribe(int(last_event_id) if last_event_id and last_event_id.isdigit() else None)
+    if subscription is None:
+        return jsonify({"error": "Too many live connections, reload the page for updates"}), 503, {"Retry-After": "30"}
+
+    def generate():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                events = subscription.get(LISTING_EVENTS_HEARTBEAT)
+                if not events:
+                    yield ": keepalive\n\n"  # also how a vanished client gets noticed
+                    continue
+                yield "".join(sse_event(event["data"], event["type"], event["id"]) for event in events)
+                if events[-1]["type"] == RESYNC:
+                    return
+        finally:
+            subscription.close()
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    /chat as server-sent events: "data: {"delta": ...}" events as the reply is generated,
+    then an "event: done" carrying the full reply (and retry_after when rate limited)
+    """
+    if not request.is_json:
+        return jsonify({"error": "Invalid request: must be JSON"}), 400
+
+    user_message = request.json.get('message')
+    if not user_message:
+        return jsonify({"error": "No message provided"}), 400
+
+    chat_state = get_chat_state()
+
+    def generate():
+        pieces = []
+        for piece in chatbot_instance.stream_response(user_message, chat_state):
+            pieces.append(piece)
+            yield sse_event({"delta": piece})
+        done = {"reply": "".join(pieces)}
+        if chat_state.retry_after:
+            done["retry_after"] = chat_state.retry_after
+        yield sse_event(done, event="done")
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # don't let a reverse proxy buffer the stream
+    })
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Admin dashboard rollups (restaurant_stats / ngo_stats): seeds a listing history, drives
+listings, claims and expiries through the app, and checks the trigger-maintained totals
+match a full rebuild. Times the admin dashboard against aggregating the raw listings,
+and measures what the triggers add to each write. Exits non-zero if a check fails.
+
+    python benchmarks/bench_admin_rollups.py --listings 200000
+"""
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from common import SAMPLE_FOOD_ITEMS, create_user, load_app, login
+
+# What the admin view would run without rollups
+RAW_AGGREGATE_SQL = """
+    SELECT u.id, u.name, COUNT(fl.id), SUM(fl.status = 'Claimed'), SUM(fl.status = 'Expired'),
+           AVG(CASE WHEN fl.status = 'Claimed' THEN julianday(fl.claimed_at) - julianday(fl.timestamp) END)
+    FROM users u LEFT JOIN food_listings fl ON fl.restaurant_id = u.id
+    WHERE u.account_type = 'restaurant'
+    GROUP BY u.id
+"""
+RAW_NGO_AGGREGATE_SQL = """
+    SELECT claimed_by_id, COUNT(*), AVG(julianday(claimed_at) - julianday(timestamp))
+    FROM food_listings WHERE status = 'Claimed' GROUP BY claimed_by_id
+"""
+
+
+def seed(connection, restaurants, ngos, listings, rng):
+    def users(prefix, account_type, count):
+        connection.executemany(
+            "INSERT INTO users (name, email, password, account_type, address, phone_number, is_profile_complete) "
+            "VALUES (?, ?, 'x', ?, 'Bench Street', '0', 1)",
+            [(f"{prefix}{i}", f"{prefix}{i}@bench.local", account_type) for i in range(count)],
+        )
+        return [row[0] for row in connection.execute("SELECT id FROM users WHERE account_type = ?", (account_type,))]
+
+    restaurant_ids = users("r", "restaurant", restaurants)
+    ngo_ids = users("n", "ngo", ngos)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(listings):
+        listed_at = now - timedelta(hours=rng.uniform(0, 24 * 90))
+        status = rng.choices(["Available", "Claimed", "Expired"], weights=(2, 5, 3))[0]
+        claimed_by = rng.choice(ngo_ids) if status == "Claimed" else None
+        claimed_at = listed_at + timedelta(hours=rng.uniform(0.1, 12)) if status == "Claimed" else None
+        rows.append((rng.choice(restaurant_ids), SAMPLE_FOOD_ITEMS[i % len(SAMPLE_FOOD_ITEMS)], "5 kg", status,
+                     claimed_by, listed_at.strftime("%Y-%m-%d %H:%M:%S"),
+                     claimed_at.strftime("%Y-%m-%d %H:%M:%S") if claimed_at else None,
+                     listed_at + timedelta(hours=48)))
+    connection.executemany(
+        "INSERT INTO food_listings (restaurant_id, food_item, quantity, status, claimed_by_id, timestamp, claimed_at, fresh_until) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows,
+    )
+    connection.commit()
+
+
+def snapshot(connection):
+    def rows(sql):
+        return sorted(tuple(round(v, 3) if isinstance(v, float) else v for v in row) for row in connection.execute(sql))
+    return rows("SELECT * FROM restaurant_stats"), rows("SELECT * FROM ngo_stats")
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=200000)
+    parser.add_argument("--restaurants", type=int, default=500)
+    parser.add_argument("--ngos", type=int, default=200)
+    parser.add_argument("--operations", type=int, default=200, help="listings, claims and expiries driven through the app")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = load_app({"SHELF_LIFE_RULE_CONFIDENCE": "0"})
+    from rollups import rebuild_rollups
+
+    rng = random.Random(18)
+    connection = sqlite3.connect(app.DATABASE, isolation_level=None)
+    connection.execute("BEGIN")
+    start = time.perf_counter()
+    seed(connection, args.restaurants, args.ngos, args.listings, rng)
+    seed_seconds = time.perf_counter() - start
+
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    # Incremental path: real routes for listing and claiming; expiry as the stored status change
+    create_user(app, "bench-restaurant", "restaurant")
+    create_user(app, "bench-ngo", "ngo")
+    create_user(app, "bench-admin", "admin")
+    restaurant, ngo, admin = (app.app.test_client() for _ in range(3))
+    login(restaurant, "bench-restaurant")
+    login(ngo, "bench-ngo")
+    login(admin, "bench-admin")
+    for i in range(args.operations):
+        restaurant.post("/add_food", data={"food_item": SAMPLE_FOOD_ITEMS[i % len(SAMPLE_FOOD_ITEMS)], "quantity": "2 trays"})
+    available = [row[0] for row in connection.execute(
+        "SELECT id FROM food_listings WHERE status = 'Available' ORDER BY id DESC LIMIT ?", (2 * args.operations,))]
+    for listing_id in available[:args.operations]:
+        ngo.post(f"/claim_food/{listing_id}", headers={"Accept": "application/json"})
+    connection.executemany("UPDATE food_listings SET status = 'Expired' WHERE id = ?",
+                           [(listing_id,) for listing_id in available[args.operations:]])
+
+    incremental = snapshot(connection)
+    start = time.perf_counter()
+    rebuilt_counts = rebuild_rollups(connection)
+    rebuild_seconds = time.perf_counter() - start
+    check("incremental rollups match a full rebuild", snapshot(connection) == incremental)
+    check("one rollup row per active restaurant", rebuilt_counts["restaurants"] == args.restaurants + 1)
+
+    page = admin.get("/dashboard")
+    check("admin dashboard renders the totals", page.status_code == 200 and b"Platform Totals" in page.data)
+
+    admin_ms = median_ms(lambda: admin.get("/dashboard"), args.repeat)
+    rollup_sql_ms = median_ms(lambda: (connection.execute(app.ADMIN_RESTAURANTS_SQL).fetchall(),
+                                       connection.execute(app.ADMIN_NGOS_SQL).fetchall()), args.repeat)
+    raw_sql_ms = median_ms(lambda: (connection.execute(RAW_AGGREGATE_SQL).fetchall(),
+                                    connection.execute(RAW_NGO_AGGREGATE_SQL).fetchall()), args.repeat)
+
+    # Write cost of the triggers: the same inserts with and without them
+    def insert_batch():
+        connection.execute("BEGIN")
+        connection.executemany(
+            "INSERT INTO food_listings (restaurant_id, food_item, quantity) VALUES (?, 'Bench Rice', '1 kg')",
+            [(rng.randint(1, args.restaurants),) for _ in range(5000)],
+        )
+        connection.execute("ROLLBACK")
+    with_triggers_ms = median_ms(insert_batch, args.repeat)
+    connection.execute("BEGIN")
+    connection.execute("DROP TRIGGER listing_stats_after_insert")
+    without_triggers_ms = median_ms(lambda: connection.executemany(
+        "INSERT INTO food_listings (restaurant_id, food_item, quantity) VALUES (?, 'Bench Rice', '1 kg')",
+        [(rng.randint(1, args.restaurants),) for _ in range(5000)]), args.repeat)
+    connection.execute("ROLLBACK")
+    connection.close()
+
+    print(json.dumps({
+        "listings": args.listings,
+        "restaurants": args.restaurants,
+        "ngos": args.ngos,
+        "seed_seconds": round(seed_seconds, 2),
+        "rebuild_seconds": round(rebuild_seconds, 3),
+        "admin_dashboard_ms": admin_ms,
+        "summary_queries_ms": {"rollups": rollup_sql_ms, "raw_aggregation": raw_sql_ms,
+                               "speedup": round(raw_sql_ms / rollup_sql_ms, 1)},
+        "insert_5000_ms": {"with_triggers": with_triggers_ms, "without_triggers": without_triggers_ms},
+        "failed_checks": failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare adding N listings one form POST at a time against a single /add_food/bulk upload.
+The LLM is replaced by a stub that sleeps for --latency seconds per call.
+
+    python benchmarks/bench_bulk_ingest.py --items 60 --latency 0.3
+"""
+import argparse
+import json
+import time
+
+from common import SAMPLE_FOOD_ITEMS, create_user, load_app, login
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per LLM call")
+    args = parser.parse_args()
+
+    # Rule-table answers would skip the LLM for most sample items; measure the LLM paths only
+    app = load_app({"SHELF_LIFE_RULE_CONFIDENCE": "2"})
+    calls = {"single": 0, "batch": 0}
+
+    def fake_single(food_item_name):
+        calls["single"] += 1
+        time.sleep(args.latency)
+        return 24
+
+    def fake_batch(food_item_names):
+        calls["batch"] += 1
+        time.sleep(args.latency)
+        return {name: 24 for name in food_item_names}
+
+    app.query_food_freshness_duration = fake_single
+    app.query_food_freshness_batch = fake_batch
+
+    items = [f"{SAMPLE_FOOD_ITEMS[i % len(SAMPLE_FOOD_ITEMS)]} {i // len(SAMPLE_FOOD_ITEMS)}" for i in range(args.items)]
+    create_user(app, "bench-restaurant", "restaurant")
+    client = app.app.test_client()
+    login(client, "bench-restaurant")
+
+    start = time.perf_counter()
+    for food_item in items:
+        client.post("/add_food", data={"food_item": food_item, "quantity": "10 meals"})
+    single_seconds = time.perf_counter() - start
+    single_calls = calls["single"]
+
+    # Fresh names so the bulk path cannot reuse the cache filled above
+    app.shelf_life_cache._memory.clear()
+    bulk_items = [{"food_item": f"{food_item} bulk", "quantity": "10 meals"} for food_item in items]
+    start = time.perf_counter()
+    response = client.post("/add_food/bulk", data=json.dumps(bulk_items), content_type="application/json")
+    bulk_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "items": args.items,
+        "llm_latency_s": args.latency,
+        "one_at_a_time": {"seconds": round(single_seconds, 3), "llm_calls": single_calls},
+        "bulk": {
+            "seconds": round(bulk_seconds, 3),
+            "llm_calls": calls["batch"] + calls["single"] - single_calls,
+            "created": response.get_json()["created"],
+        },
+        "speedup": round(single_seconds / bulk_seconds, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Replays a burst of chatbot questions that miss the FAQ against the fake Groq server:
+many users asking a handful of popular questions at once. Reports upstream calls with
+and without the answer cache, and checks that concurrent identical questions were
+coalesced into a single upstream call. Exits non-zero if a check fails.
+
+    python benchmarks/bench_chat_answer_cache.py --users 64 --questions 4 --latency 0.3
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq import start_fake_groq
+
+QUESTIONS = [
+    "Can volunteers help deliver food on weekends?",
+    "Does the restaurant need a fridge to donate leftover food?",
+    "How quickly should an NGO collect a donation after claiming it?",
+    "Can home cooks donate surplus meals?",
+    "Is there a minimum quantity of food to list?",
+    "Do you support food donation drives for schools?",
+]
+
+
+def run_burst(chatbot, users, questions):
+    from chat_sessions import ChatSession
+
+    barrier = threading.Barrier(users)
+    replies = [None] * users
+
+    def ask(i):
+        state = ChatSession(f"user-{i}")
+        barrier.wait()
+        replies[i] = chatbot.generate_response(QUESTIONS[i % questions], state)
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, replies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--questions", type=int, default=4, help="distinct questions in the burst")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake Groq response time in seconds")
+    args = parser.parse_args()
+    args.questions = min(args.questions, len(QUESTIONS))
+
+    server, base_url = start_fake_groq(latency=args.latency)
+    os.environ.setdefault("GROQ_API_KEY", "bench-key")
+
+    from answer_cache import AnswerCache
+    from chatbot import FoodPulseChatbot
+    from llm_gateway import LLMGateway
+    from rate_limiter import RateLimiter
+
+    def make_chatbot(answer_cache):
+        return FoodPulseChatbot(
+            rate_limiter=RateLimiter(user_burst=10, global_rate=1000, global_burst=1000),
+            gateway=LLMGateway("bench-key", base_url=base_url, pool_size=args.users),
+            answer_cache=answer_cache,
+        )
+
+    results = {"users": args.users, "distinct_questions": args.questions}
+    failures = []
+
+    # Baseline: a cache that never stores anything, so every question goes upstream
+    uncached = make_chatbot(AnswerCache(max_entries=0, wait_timeout=0))
+    uncached.answer_cache.get_or_compute = lambda key, compute: compute()[0]
+    elapsed, _ = run_burst(uncached, args.users, args.questions)
+    results["uncached"] = {"seconds": round(elapsed, 3), "upstream_requests": server.stats["requests"]}
+
+    server.stats["requests"] = 0
+    chatbot = make_chatbot(AnswerCache())
+    elapsed, replies = run_burst(chatbot, args.users, args.questions)
+    cold_requests = server.stats["requests"]
+    results["cached_cold"] = {"seconds": round(elapsed, 3), "upstream_requests": cold_requests}
+    if cold_requests != args.questions:
+        failures.append("concurrent identical questions were not coalesced")
+    if any(reply != server.config["chat_reply"] for reply in replies):
+        failures.append("a coalesced request got the wrong reply")
+
+    elapsed, _ = run_burst(chatbot, args.users, args.questions)
+    results["cached_warm"] = {"seconds": round(elapsed, 3), "upstream_requests": server.stats["requests"] - cold_requests}
+    if server.stats["requests"] != cold_requests:
+        failures.append("warm burst went upstream")
+
+    chatbot.set_document_text(chatbot.document_text + "\nFood Pulse now also accepts bakery donations.")
+    run_burst(chatbot, args.users, args.questions)
+    if server.stats["requests"] != cold_requests + args.questions:
+        failures.append("answers survived a document_text change")
+
+    results["answer_cache"] = chatbot.answer_cache.stats()
+    results["failed_checks"] = failures
+    print(json.dumps(results, indent=2))
+    server.shutdown()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compares chatbot prompt size and end-to-end latency for questions that miss the FAQ:
+the old prompt (all of document_text, the last three exchanges and the question repeated
+in the system prompt) against retrieval-based prompts. Runs against the fake Groq server,
+whose response time grows with prompt length (--prefill-latency seconds per 1,000 chars).
+
+    python benchmarks/bench_chat_prompt_size.py --prefill-latency 0.05
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq import start_fake_groq
+
+# Multi-turn conversation; every question misses the FAQ so it goes to the LLM
+CONVERSATION = [
+    "Which UN sustainable development goals does Food Pulse support?",
+    "Can volunteers help deliver food on weekends?",
+    "Which regions give restaurants tax relief for donating?",
+    "What happens after an NGO request is approved by the admin?",
+    "How is raw food handled differently from cooked meals?",
+    "Are there plans for real-time donation tracking?",
+    "Can a restaurant give away meals close to their best-before time?",
+    "How does Food Pulse keep donations transparent?",
+]
+
+
+def make_legacy_chatbot_class(base):
+    class LegacyPromptChatbot(base):
+        """Builds the system prompt as before retrieval"""
+
+        def get_conversation_context(self, state):
+            recent_exchanges = state.recent_history(3)
+            if not recent_exchanges:
+                return ""
+            context = "Previous conversation:\n"
+            for exchange in recent_exchanges:
+                context += f"User: {exchange['user']}\nAssistant: {exchange['assistant']}\n"
+            return context
+
+        def build_messages(self, user_input, conversation_context, chunk_ids=None):
+            system_prompt = f"""You are a helpful, accurate assistant for Food Pulse platform.
+
+CONTEXT INFORMATION:
+{self.document_text}
+
+GUIDELINES:
+- Answer based ONLY on the context provided above
+- If information isn't in context, say you don't know
+- Keep responses concise (2-3 paragraphs maximum)
+- Be factual and helpful
+- Focus on Food Pulse operations, registration, food safety, and impact
+- If asked about unrelated topics, politely redirect to Food Pulse topics
+
+{conversation_context}
+
+Current user question: {user_input}"""
+            return [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_input}]
+
+    return LegacyPromptChatbot
+
+
+def run(chatbot, server, rounds):
+    from chat_sessions import ChatSession
+
+    server.stats["requests"] = 0
+    server.stats["prompt_chars"] = 0
+    latencies = []
+    for round_number in range(rounds):
+        chatbot.answer_cache.invalidate()
+        state = ChatSession(f"bench-{round_number}")
+        for question in CONVERSATION:
+            start = time.perf_counter()
+            chatbot.generate_response(question, state)
+            latencies.append((time.perf_counter() - start) * 1000)
+    prompt_chars = server.stats["prompt_chars"] / server.stats["requests"]
+    return {
+        "llm_calls": server.stats["requests"],
+        "avg_prompt_chars": round(prompt_chars),
+        "avg_prompt_tokens_est": round(prompt_chars / 4),
+        "avg_latency_ms": round(statistics.mean(latencies), 2),
+        "p95_latency_ms": round(sorted(latencies)[int(len(latencies) * 0.95) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="fixed fake Groq response time in seconds")
+    parser.add_argument("--prefill-latency", type=float, default=0.05, help="seconds per 1,000 prompt chars")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_groq(latency=args.latency, prefill_latency=args.prefill_latency)
+    # A realistically long reply, so history grows like it would in production
+    server.config["chat_reply"] = " ".join(["Food Pulse connects restaurants with NGOs."] * 12)
+    os.environ.setdefault("GROQ_API_KEY", "bench-key")
+
+    from chatbot import FoodPulseChatbot
+    from llm_gateway import LLMGateway
+    from rate_limiter import RateLimiter
+
+    def make_chatbot(chatbot_class):
+        return chatbot_class(
+            rate_limiter=RateLimiter(user_burst=1000, global_rate=1000, global_burst=1000, daily_quota=10 ** 6,
+                                     global_daily_quota=10 ** 6),
+            gateway=LLMGateway("bench-key", base_url=base_url),
+        )
+
+    before = run(make_chatbot(make_legacy_chatbot_class(FoodPulseChatbot)), server, args.rounds)
+    after = run(make_chatbot(FoodPulseChatbot), server, args.rounds)
+
+    print(json.dumps({
+        "questions": len(CONVERSATION) * args.rounds,
+        "before_full_document": before,
+        "after_retrieval": after,
+        "prompt_size_reduction": round(1 - after["avg_prompt_chars"] / before["avg_prompt_chars"], 3),
+    }, indent=2))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+End-to-end check of POST /chat/stream against the fake Groq server streaming word by word:
+time to first token vs. the blocking /chat route, that the streamed pieces add up to the
+reply, that FAQ hits arrive at once, and that the full reply lands in the chat history.
+Exits non-zero if a check fails.
+
+    python benchmarks/bench_chat_streaming.py --word-delay 0.05
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+from common import load_app
+from fake_groq import start_fake_groq
+
+LLM_QUESTION = "Can volunteers help deliver food on weekends?"
+FAQ_QUESTION = "how does food pulse work"
+
+
+def read_stream(http, base_url, message):
+    """POST to /chat/stream; returns (seconds to first delta, total seconds, deltas, done event)"""
+    start = time.perf_counter()
+    first_delta = None
+    deltas = []
+    done = None
+    with http.post(f"{base_url}/chat/stream", json={"message": message}, stream=True) as response:
+        response.raise_for_status()
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+                if event == "done":
+                    done = data
+                else:
+                    first_delta = first_delta or time.perf_counter() - start
+                    deltas.append(data["delta"])
+                event = None
+    return first_delta, time.perf_counter() - start, deltas, done
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--word-delay", type=float, default=0.05, help="fake generation time per reply word")
+    args = parser.parse_args()
+
+    fake, fake_url = start_fake_groq(word_delay=args.word_delay)
+    fake.config["chat_reply"] = " ".join(["Volunteers can help NGOs collect and deliver donations."] * 4)
+    app = load_app({"GROQ_API_KEY": "bench-key", "GROQ_BASE_URL": fake_url, "CHAT_USER_BURST": "10"})
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    http = requests.Session()
+
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    start = time.perf_counter()
+    blocking_reply = http.post(f"{base_url}/chat", json={"message": LLM_QUESTION}).json()["reply"]
+    blocking_seconds = time.perf_counter() - start
+
+    app.chat_answer_cache.invalidate()
+    first, total, deltas, done = read_stream(http, base_url, LLM_QUESTION)
+    check("stream reassembles the reply", "".join(deltas).strip() == blocking_reply and done["reply"] == "".join(deltas))
+    check("reply streamed in pieces", len(deltas) > 1)
+    check("first token well before the full reply", first < blocking_seconds / 2)
+
+    faq_first, faq_total, faq_deltas, faq_done = read_stream(http, base_url, FAQ_QUESTION)
+    check("FAQ answer arrives in one piece", len(faq_deltas) == 1 and faq_done["reply"] == faq_deltas[0])
+
+    # The only chat session is this client's
+    (chat_state,) = app.chat_sessions._sessions.values()
+    history = chat_state.recent_history(10)
+    check("streamed reply recorded in history", [h["assistant"] for h in history][-2:] == [done["reply"].strip(), faq_done["reply"]])
+
+    print(json.dumps({
+        "blocking_chat": {"seconds": round(blocking_seconds, 3)},
+        "streaming_chat": {
+            "time_to_first_token": round(first, 3),
+            "seconds": round(total, 3),
+            "deltas": len(deltas),
+        },
+        "faq_stream": {"time_to_first_token": round(faq_first, 4), "deltas": len(faq_deltas)},
+        "failed_checks": failures,
+    }, indent=2))
+    server.shutdown()
+    fake.shutdown()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Stress test for claim_food: many threads (each acting as a different NGO) race to claim
+the same few listings. Verifies exactly one winner per listing and reports claims/s.
+Exits non-zero if any listing ends up with zero or several winners.
+
+    python benchmarks/bench_claim_contention.py --threads 32 --listings 200 --claims 5000
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from common import load_app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--listings", type=int, default=200)
+    parser.add_argument("--claims", type=int, default=5000, help="total claim attempts")
+    args = parser.parse_args()
+
+    app = load_app()
+    from claims import CLAIMED, claim_listing
+    from db import ConnectionPool
+
+    pool = ConnectionPool(app.DATABASE, max_idle=args.threads)
+    with pool.connection() as db:
+        db.execute("INSERT INTO users (name, email, password, account_type) VALUES ('r', 'r@bench.local', 'x', 'restaurant')")
+        db.executemany(
+            "INSERT INTO food_listings (restaurant_id, food_item, quantity, fresh_until) "
+            "VALUES (1, ?, '10 meals', DATETIME('now', 'localtime', '+1 day'))",
+            [(f"item {i}",) for i in range(args.listings)]
+        )
+        db.commit()
+
+    attempts = [random.randint(1, args.listings) for _ in range(args.claims)]
+    chunks = [attempts[i::args.threads] for i in range(args.threads)]
+    winners = Counter()
+    outcomes = Counter()
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(args.threads)
+
+    def worker(ngo_id, listing_ids):
+        local_outcomes = Counter()
+        local_winners = Counter()
+        start_barrier.wait()
+        for listing_id in listing_ids:
+            with pool.connection() as db:
+                result = claim_listing(db, listing_id, ngo_id)
+            local_outcomes[result] += 1
+            if result == CLAIMED:
+                local_winners[listing_id] += 1
+        with lock:
+            outcomes.update(local_outcomes)
+            winners.update(local_winners)
+
+    threads = [threading.Thread(target=worker, args=(1000 + i, chunk)) for i, chunk in enumerate(chunks)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    bad = {listing_id: winners[listing_id] for listing_id in range(1, args.listings + 1) if winners[listing_id] != 1}
+    print(json.dumps({
+        "threads": args.threads,
+        "listings": args.listings,
+        "claim_attempts": args.claims,
+        "seconds": round(elapsed, 3),
+        "claims_per_s": round(args.claims / elapsed, 1),
+        "outcomes": dict(outcomes),
+        "listings_without_exactly_one_winner": bad,
+    }, indent=2))
+    if bad:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Dashboard caching for the NGO view: requests per second over HTTP with caching off,
+with cached renders, and with browsers revalidating (If-None-Match -> 304). Checks that
+a cached page matches a fresh render, that a 304 costs one connection (the version row
+read) and no page render, and that a claim, or a write made outside the app (another
+worker, a cron script), invalidates the cached pages. Exits non-zero if a check fails.
+
+    python benchmarks/bench_dashboard_cache.py --listings 20000 --ngos 50 --threads 8
+"""
+import argparse
+import json
+import logging
+import random
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+from werkzeug.serving import make_server
+
+from common import SAMPLE_FOOD_ITEMS, create_user, load_app, login
+
+
+def seed(connection, listings, restaurants, rng):
+    connection.executemany(
+        "INSERT INTO users (name, email, password, account_type, address, phone_number, is_profile_complete, latitude, longitude) "
+        "VALUES (?, ?, 'x', 'restaurant', 'Bench Street', '0', 1, ?, ?)",
+        [(f"r{i}", f"r{i}@bench.local", 22.5 + rng.random() * 0.2, 88.3 + rng.random() * 0.2) for i in range(restaurants)],
+    )
+    restaurant_ids = [row[0] for row in connection.execute("SELECT id FROM users WHERE account_type = 'restaurant'")]
+    now = datetime.now()
+    connection.executemany(
+        "INSERT INTO food_listings (restaurant_id, food_item, quantity, fresh_until) VALUES (?, ?, '5 kg', ?)",
+        [(rng.choice(restaurant_ids), SAMPLE_FOOD_ITEMS[i % len(SAMPLE_FOOD_ITEMS)], now + timedelta(hours=rng.uniform(2, 48)))
+         for i in range(listings)],
+    )
+    connection.commit()
+
+
+def drive(base_url, cookies, seconds, threads, etags=None):
+    """
+    Hammer /dashboard from `threads` clients, each cycling through the NGO sessions; with
+    etags ({cookie: ETag}) they revalidate like a browser. Returns requests/s and statuses.
+    """
+    deadline = time.perf_counter() + seconds
+    counts = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def client(offset):
+        http = requests.Session()
+        done = 0
+        local_statuses = {}
+        while time.perf_counter() < deadline:
+            cookie = cookies[(offset + done) % len(cookies)]
+            headers = {"If-None-Match": etags[cookie]} if etags else {}
+            response = http.get(f"{base_url}/dashboard", cookies={"session": cookie}, headers=headers)
+            local_statuses[response.status_code] = local_statuses.get(response.status_code, 0) + 1
+            done += 1
+        with lock:
+            counts.append(done)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return round(sum(counts) / (time.perf_counter() - start), 1), statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=20000)
+    parser.add_argument("--restaurants", type=int, default=300)
+    parser.add_argument("--ngos", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    app = load_app({"DASHBOARD_CACHE_TTL": "3600"})
+    connection = sqlite3.connect(app.DATABASE)
+    seed(connection, args.listings, args.restaurants, random.Random(20))
+    connection.close()
+
+    cookies = []
+    for i in range(args.ngos):
+        create_user(app, f"ngo{i}", "ngo")
+        client = app.app.test_client()
+        login(client, f"ngo{i}")
+        client.post("/profile", data={"address": "Bench Street", "phone_number": "0",
+                                      "latitude": str(22.55 + i * 0.001), "longitude": "88.4"})
+        cookies.append(client.get_cookie("session").value)
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    http = requests.Session()
+    ngo = {"session": cookies[0]}
+
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    app.DASHBOARD_CACHE_TTL = 0
+    fresh = http.get(f"{base_url}/dashboard", cookies=ngo)
+    uncached_rps, _ = drive(base_url, cookies, args.seconds, args.threads)
+
+    app.DASHBOARD_CACHE_TTL = 3600
+    first = http.get(f"{base_url}/dashboard", cookies=ngo)
+    cached = http.get(f"{base_url}/dashboard", cookies=ngo)
+    check("cached page matches a fresh render", first.text == fresh.text and cached.text == fresh.text)
+    etag = cached.headers.get("ETag")
+    check("dashboard has an ETag", bool(etag) and etag == first.headers.get("ETag"))
+    # Steady state: every NGO has loaded the page once since the last change
+    etags = {cookie: http.get(f"{base_url}/dashboard", cookies={"session": cookie}).headers["ETag"] for cookie in cookies}
+    cached_rps, _ = drive(base_url, cookies, args.seconds, args.threads)
+
+    before, lookups = app.db_pool.stats(), app.dashboard_cache.stats()
+    not_modified = http.get(f"{base_url}/dashboard", cookies=ngo, headers={"If-None-Match": etag})
+    after = app.db_pool.stats()
+    check("revalidation gets 304 with no body", not_modified.status_code == 304 and not not_modified.content)
+    check("304 only reads the version row",
+          after["created"] + after["reused"] - before["created"] - before["reused"] <= 1
+          and app.dashboard_cache.stats() == lookups)
+    conditional_rps, statuses = drive(base_url, cookies, args.seconds, args.threads, etags)
+
+    # A claim bumps the data version row: new ETag, and the claimed listing is gone from the page
+    listing_id = int(cached.text.split('data-listing-id="', 1)[1].split('"', 1)[0])
+    claimer = app.app.test_client()
+    login(claimer, "ngo1")
+    claimer.post(f"/claim_food/{listing_id}", headers={"Accept": "application/json"})
+    after_claim = http.get(f"{base_url}/dashboard", cookies=ngo, headers={"If-None-Match": etag})
+    check("claim invalidates the cached page", after_claim.status_code == 200
+          and after_claim.headers.get("ETag") != etag and f'data-listing-id="{listing_id}"' not in after_claim.text)
+
+    # A write this process never saw, as from another worker or a cron sweep
+    etag = after_claim.headers.get("ETag")
+    listing_id = int(after_claim.text.split('data-listing-id="', 1)[1].split('"', 1)[0])
+    connection = sqlite3.connect(app.DATABASE)
+    connection.execute("UPDATE food_listings SET status = 'Expired' WHERE id = ?", (listing_id,))
+    connection.commit()
+    connection.close()
+    after_write = http.get(f"{base_url}/dashboard", cookies=ngo, headers={"If-None-Match": etag})
+    check("outside write invalidates the cached page", after_write.status_code == 200
+          and after_write.headers.get("ETag") != etag and f'data-listing-id="{listing_id}"' not in after_write.text)
+    server.shutdown()
+
+    print(json.dumps({
+        "listings": args.listings,
+        "ngo_sessions": args.ngos,
+        "threads": args.threads,
+        "requests_per_second": {
+            "uncached": uncached_rps,
+            "cached": cached_rps,
+            "conditional_304": conditional_rps,
+        },
+        "speedup": {
+            "cached": round(cached_rps / uncached_rps, 1),
+            "conditional_304": round(conditional_rps / uncached_rps, 1),
+        },
+        "conditional_statuses": statuses,
+        "dashboard_cache": app.dashboard_cache.stats(),
+        "failed_checks": failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Expiry sweeper and hot/archive split: seeds months of listing history in which most
+old listings were never marked expired, then runs one sweep while NGOs keep claiming.
+Reports sweep duration and rows moved, claim latency during the sweep, and the hot
+table / NGO dashboard query before and after. Checks that nothing overdue is left
+Available, no listing was lost, the admin rollups still match a rebuild, and a second
+sweep is a no-op. Exits non-zero if a check fails.
+
+    python benchmarks/bench_expiry_sweeper.py --listings 200000
+"""
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from common import SAMPLE_FOOD_ITEMS, load_app
+
+
+def seed(connection, listings, days, rng):
+    connection.executemany(
+        "INSERT INTO users (name, email, password, account_type, is_profile_complete) VALUES (?, ?, 'x', ?, 1)",
+        [(f"u{i}", f"u{i}@bench.local", "restaurant" if i < 300 else "ngo") for i in range(400)],
+    )
+    restaurants = [row[0] for row in connection.execute("SELECT id FROM users WHERE account_type = 'restaurant'")]
+    ngos = [row[0] for row in connection.execute("SELECT id FROM users WHERE account_type = 'ngo'")]
+    now_utc = datetime.now(timezone.utc).replace(tzinfo=None)
+    utc_offset = datetime.now() - now_utc
+    rows = []
+    for i in range(listings):
+        listed_at = now_utc - timedelta(hours=rng.uniform(0, 24 * days))
+        fresh_until = listed_at + utc_offset + timedelta(hours=rng.choice((12, 24, 48, 72)))
+        claimed = rng.random() < 0.45
+        claimed_at = listed_at + timedelta(hours=rng.uniform(0.2, 6)) if claimed else None
+        rows.append((rng.choice(restaurants), SAMPLE_FOOD_ITEMS[i % len(SAMPLE_FOOD_ITEMS)], "5 kg",
+                     "Claimed" if claimed else "Available", rng.choice(ngos) if claimed else None,
+                     listed_at.strftime("%Y-%m-%d %H:%M:%S"), fresh_until.isoformat(),
+                     claimed_at.strftime("%Y-%m-%d %H:%M:%S") if claimed else None))
+    connection.executemany(
+        "INSERT INTO food_listings (restaurant_id, food_item, quantity, status, claimed_by_id, timestamp, fresh_until, claimed_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows,
+    )
+    connection.commit()
+
+
+def table_stats(connection, ngo_sql, first_page):
+    start = time.perf_counter()
+    for _ in range(5):
+        connection.execute(ngo_sql, (*first_page, 51)).fetchall()
+    return {
+        "hot_rows": connection.execute("SELECT COUNT(*) FROM food_listings").fetchone()[0],
+        "available_rows": connection.execute("SELECT COUNT(*) FROM food_listings WHERE status = 'Available'").fetchone()[0],
+        "archived_rows": connection.execute("SELECT COUNT(*) FROM food_listings_archive").fetchone()[0],
+        "ngo_first_page_ms": round((time.perf_counter() - start) / 5 * 1000, 3),
+    }
+
+
+def snapshot(connection):
+    return [sorted(tuple(round(v, 3) if isinstance(v, float) else v for v in row) for row in connection.execute(sql))
+            for sql in ("SELECT * FROM restaurant_stats", "SELECT * FROM ngo_stats")]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=90, help="how far back the seeded history goes")
+    parser.add_argument("--archive-after-days", type=float, default=30)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    app = load_app({
+        "LISTING_ARCHIVE_AFTER_DAYS": str(args.archive_after_days),
+        "EXPIRY_SWEEP_BATCH": str(args.batch),
+    })
+    from claims import claim_listing
+    from queries import FIRST_PAGE_CURSOR, NGO_LISTINGS_PAGE_SQL
+    from rollups import rebuild_rollups
+
+    connection = sqlite3.connect(app.DATABASE, timeout=30)
+    rng = random.Random(19)
+    start = time.perf_counter()
+    seed(connection, args.listings, args.days, rng)
+    seed_seconds = time.perf_counter() - start
+
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    before = table_stats(connection, NGO_LISTINGS_PAGE_SQL, FIRST_PAGE_CURSOR)
+    total_before = before["hot_rows"]
+
+    # NGOs keep claiming fresh listings while the sweep runs
+    claimable = [row[0] for row in connection.execute(
+        "SELECT id FROM food_listings WHERE status = 'Available' AND julianday(fresh_until) > julianday('now', 'localtime', '+1 hour') "
+        "ORDER BY id DESC LIMIT 2000")]
+    claim_times = []
+    sweeping = threading.Event()
+    sweeping.set()
+
+    ngo_id = connection.execute("SELECT id FROM users WHERE account_type = 'ngo' LIMIT 1").fetchone()[0]
+
+    def claimer():
+        while sweeping.is_set() and claimable:
+            listing_id = claimable.pop()
+            claim_start = time.perf_counter()
+            with app.db_pool.connection() as claim_connection:
+                claim_listing(claim_connection, listing_id, ngo_id)
+            claim_times.append(time.perf_counter() - claim_start)
+
+    thread = threading.Thread(target=claimer)
+    thread.start()
+    now = datetime.now()
+    report = app.expiry_sweeper.sweep(now)
+    sweeping.clear()
+    thread.join()
+
+    after = table_stats(connection, NGO_LISTINGS_PAGE_SQL, FIRST_PAGE_CURSOR)
+    history_rows = connection.execute("SELECT COUNT(*) FROM food_listings_history").fetchone()[0]
+    overdue = connection.execute(
+        "SELECT COUNT(*) FROM food_listings WHERE status = 'Available' AND julianday(fresh_until) <= julianday(?)",
+        (now.isoformat(),)).fetchone()[0]
+    check("no overdue listing left Available", overdue == 0)
+    check("no listing lost or duplicated", history_rows == total_before)
+    check("listings moved to the archive", report["archived"] > 0 and after["archived_rows"] == report["archived"])
+    check("archive holds only claimed and expired listings", connection.execute(
+        "SELECT COUNT(*) FROM food_listings_archive WHERE status NOT IN ('Claimed', 'Expired')").fetchone()[0] == 0)
+    expired_total = connection.execute("SELECT SUM(expired) FROM restaurant_stats").fetchone()[0]
+    check("rollups counted every expiry", expired_total == connection.execute(
+        "SELECT COUNT(*) FROM food_listings_history WHERE status = 'Expired'").fetchone()[0])
+
+    incremental = snapshot(connection)
+    rebuild_connection = sqlite3.connect(app.DATABASE, isolation_level=None, timeout=30)
+    rebuild_rollups(rebuild_connection)
+    rebuild_connection.close()
+    check("rollups match a rebuild over live and archived listings", snapshot(connection) == incremental)
+
+    second = app.expiry_sweeper.sweep(now)
+    check("second sweep is a no-op", second["expired"] == 0 and second["archived"] == 0)
+    connection.close()
+
+    print(json.dumps({
+        "listings": args.listings,
+        "seed_seconds": round(seed_seconds, 2),
+        "sweep": report,
+        "second_sweep_seconds": second["seconds"],
+        "claims_during_sweep": {
+            "count": len(claim_times),
+            "p50_ms": round(statistics.median(claim_times) * 1000, 2) if claim_times else None,
+            "max_ms": round(max(claim_times) * 1000, 2) if claim_times else None,
+        },
+        "before": before,
+        "after": after,
+        "failed_checks": failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Load test for the live listing feed (GET /api/listings/events) in two phases:
+
+1. Fan-out: hundreds of NGO dashboards subscribed over SSE while restaurants post food,
+   NGOs claim it and a burst of events follows. Every reading client must get every
+   event, in order; reports publish cost and delivery latency.
+2. Backpressure: a few clients that subscribed and never read. Once their socket buffers
+   fill (a few MB on Linux) they stop reading from the broker and must be dropped as
+   stalled, and publishing must not slow down.
+
+Also checks that connections past the subscriber limit are turned away. Exits non-zero
+if a check fails.
+
+    python benchmarks/bench_listing_events.py --subscribers 300 --listings 200
+"""
+import argparse
+import json
+import logging
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+from common import SAMPLE_FOOD_ITEMS, create_user, load_app, login
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": round(samples[-1] * 1000, 2)}
+
+
+class Subscriber(threading.Thread):
+    """Reads the event stream and records when each event id arrived"""
+
+    def __init__(self, url, cookies):
+        super().__init__(daemon=True)
+        self.url = url
+        self.cookies = cookies
+        self.received = {}  # event id -> (type, arrival time)
+        self.order = []
+        self.resyncs = []  # arrival times of resync events, which carry no id
+        self.error = None
+
+    def run(self):
+        try:
+            with requests.get(self.url, cookies=self.cookies, stream=True, timeout=60) as response:
+                event_id = event_type = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("id: "):
+                        event_id = int(line[4:])
+                    elif line.startswith("event: "):
+                        event_type = line[7:]
+                    elif line.startswith("data: "):
+                        if event_type == "bench_done":
+                            return
+                        if event_id is None:
+                            self.resyncs.append(time.time())
+                        else:
+                            self.received[event_id] = (event_type, time.time())
+                            self.order.append(event_id)
+                        event_id = event_type = None
+        except Exception as e:
+            self.error = e
+
+
+def stalled_client(port, cookie_header):
+    """Connects and subscribes but never reads, so its server thread blocks once the socket buffers fill"""
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    sock.sendall(f"GET /api/listings/events HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie_header}\r\n\r\n".encode())
+    return sock
+
+
+def wait_for(predicate, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=300)
+    parser.add_argument("--stalled", type=int, default=5, help="clients that subscribe and never read")
+    parser.add_argument("--listings", type=int, default=200, help="single listings posted through /add_food")
+    parser.add_argument("--claims", type=int, default=50)
+    parser.add_argument("--burst", type=int, default=1000, help="extra events published back to back")
+    parser.add_argument("--stall-mb", type=float, default=32, help="give up on dropping stalled clients after this much")
+    parser.add_argument("--stall-seconds", type=float, default=2,
+                        help="LISTING_EVENTS_STALL_SECONDS: how long a client that far behind may go without reading")
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+
+    app = load_app({
+        "LISTING_EVENTS_QUEUE_SIZE": str(args.queue_size),
+        "LISTING_EVENTS_MAX_SUBSCRIBERS": str(args.subscribers + args.stalled),
+        "LISTING_EVENTS_HEARTBEAT": "1",
+        "LISTING_EVENTS_STALL_SECONDS": str(args.stall_seconds),
+        "SHELF_LIFE_RULE_CONFIDENCE": "0",  # every estimate from the offline rules, no LLM
+    })
+    broker = app.listing_events
+    create_user(app, "bench-restaurant", "restaurant")
+    create_user(app, "bench-ngo", "ngo")
+    restaurant, ngo = app.app.test_client(), app.app.test_client()
+    login(restaurant, "bench-restaurant")
+    login(ngo, "bench-ngo")
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    session_cookie = ngo.get_cookie("session").value
+    subscribers = [Subscriber(f"{base_url}/api/listings/events", {"session": session_cookie})
+                   for _ in range(args.subscribers)]
+    for subscriber in subscribers:
+        subscriber.start()
+    stalled = [stalled_client(server.server_port, f"session={session_cookie}") for _ in range(args.stalled)]
+
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    check("all clients subscribed", wait_for(lambda: broker.stats()["subscribers"] == args.subscribers + args.stalled))
+    over_limit = requests.get(f"{base_url}/api/listings/events", cookies={"session": session_cookie}, timeout=10)
+    check("connection past the limit gets 503", over_limit.status_code == 503)
+
+    # Realistic traffic through the routes: restaurants post, NGOs claim
+    start = time.perf_counter()
+    for i in range(args.listings):
+        restaurant.post("/add_food", data={"food_item": SAMPLE_FOOD_ITEMS[i % len(SAMPLE_FOOD_ITEMS)], "quantity": "5 plates"})
+    for listing_id in range(1, args.claims + 1):
+        ngo.post(f"/claim_food/{listing_id}", headers={"Accept": "application/json"})
+    route_seconds = time.perf_counter() - start
+
+    # Burst straight into the broker
+    publish_times = []
+    for _ in range(args.burst):
+        start = time.perf_counter()
+        broker.publish("listings_added", {"listings": [{"id": 0, "food_item": "Bench Biryani"}]})
+        publish_times.append(time.perf_counter() - start)
+    published = broker.stats()["last_event_id"]
+    published_at = {event["id"]: event["published_at"] for event in broker._history}
+    broker.publish("bench_done", {})
+
+    for subscriber in subscribers:
+        subscriber.join(timeout=60)
+
+    complete = [s for s in subscribers if not s.error and sorted(s.received) == list(range(1, published + 1))]
+    resynced = [s for s in subscribers if s.resyncs]
+    check("every reading client got every event", len(complete) == args.subscribers)
+    check("events arrived in order", all(s.order == sorted(s.order) for s in subscribers))
+    check("no reading client was told to resync", not resynced)
+    latencies = [arrived - published_at[event_id]
+                 for s in subscribers for event_id, (_, arrived) in s.received.items() if event_id in published_at]
+
+    # Phase 2: only the stalled clients are left; publish bulk-upload-sized events until they're dropped
+    check("reading clients disconnected", wait_for(lambda: broker.stats()["subscribers"] == args.stalled))
+    bulk_payload = {"listings": [{"id": i, "food_item": "Bench Biryani", "quantity": "5 plates"} for i in range(50)]}
+    event_bytes = len(json.dumps(bulk_payload))
+    stall_times = []
+    stall_events = 0
+    # A stalled client is only dropped after stall_seconds without reading, so keep publishing at least that long
+    stall_until = time.perf_counter() + 2 * args.stall_seconds
+    while broker.stats()["dropped_slow"] < args.stalled and (stall_events * event_bytes < args.stall_mb * 1e6
+                                                               or time.perf_counter() < stall_until):
+        start = time.perf_counter()
+        broker.publish("listings_added", bulk_payload)
+        stall_times.append(time.perf_counter() - start)
+        stall_events += 1
+        time.sleep(0.0002)  # let the stalled clients' threads fill their sockets
+    stats = broker.stats()
+    check("stalled clients were dropped", stats["dropped_slow"] >= args.stalled)
+    # With a small burst the stalled clients may already be gone before this phase publishes anything
+    check("stalled clients didn't slow publishing", not stall_times or statistics.median(stall_times) < 0.001)
+    check("dropped clients freed their slots", broker.stats()["subscribers"] == 0)
+
+    for sock in stalled:
+        sock.close()
+    server.shutdown()
+
+    print(json.dumps({
+        "subscribers": args.subscribers,
+        "stalled_clients": args.stalled,
+        "events_published": published,
+        "route_events": {"listings": args.listings, "claims": args.claims, "seconds": round(route_seconds, 2)},
+        "publish_ms": percentiles(publish_times),
+        "delivery_latency_ms": percentiles(latencies) if latencies else None,
+        "deliveries": len(latencies),
+        "resynced_subscribers": len(resynced),
+        "subscriber_errors": sum(1 for s in subscribers if s.error),
+        "stalled_phase": {
+            "events_until_dropped": stall_events,
+            "mb_until_dropped": round(stall_events * event_bytes / 1e6, 2),
+            "publish_ms": percentiles(stall_times) if stall_times else None,
+        },
+        "broker": stats,
+        "failed_checks": failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
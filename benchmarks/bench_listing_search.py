@@ -0,0 +1,261 @@
+"""
+Listing search at scale: seeds a seed_data.py database (1m listings by default) and times
+the full-text search (listing_search.py: FTS5 matches ranked by bm25 in SQL, expiry as the
+tiebreak) against the same filters written as a LIKE '%word%' scan, which has to read every
+match too before it could rank them. Checks that the search returns only listings the scan
+matches and as many of them as asked for, in rank order; that a better match outranks one
+expiring sooner; that pending listings are found; that the triggers keep both FTS5 indexes
+in step through claims, edits, expiry and archiving; and that /api/listings/search and the
+NGO dashboard search answer. Exits non-zero if a check fails.
+
+    python benchmarks/bench_listing_search.py
+    python benchmarks/bench_listing_search.py --size 100k
+    python benchmarks/bench_listing_search.py --database foodpulse-1m.db
+
+--database copies a seed_data.py database instead of seeding (a 1m one takes about a
+minute and a half to seed).
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import REPO_ROOT, create_user, load_app, login
+from seed_data import parse_size, seed
+
+sys.path.insert(0, REPO_ROOT)
+
+# (search box text, filters) as an NGO, restaurant or admin would send them
+SEARCHES = [
+    ("rice", {}),
+    ("paneer", {}),
+    ("bread", {}),
+    ("veg", {}),
+    ("chicken biryani", {}),
+    ("noodles", {}),
+    ("milk", {}),
+    ("dosa", {}),
+    ("kheer", {}),
+    ("tamarind", {}),  # no such listing
+    ("biriyani", {}),  # misspelt
+    ("rice", {"max_hours_left": 6}),
+    ("cake", {"min_hours_left": 12}),
+    ("", {"restaurant_id": 3}),
+    ("curry", {"restaurant_id": 1}),
+    ("rice", {"status": "Claimed"}),
+    ("cake", {"status": "Expired"}),
+]
+
+NO_MATCHES = {"tamarind", "biriyani"}
+
+LIMIT = 20
+
+# The same search without FTS5: every listing in the window is read and its text compared
+LIKE_SCAN_SQL = """
+    SELECT fl.id FROM food_listings fl
+    WHERE fl.status = :status
+      AND ((fl.fresh_until > :fresh_after AND fl.fresh_until <= :fresh_before)
+           OR (:include_pending AND fl.fresh_until IS NULL))
+      AND (:restaurant_id IS NULL OR fl.restaurant_id = :restaurant_id) {text_filter}
+"""
+
+
+def like_scan(terms, restaurant_id):
+    """LIKE_SCAN_SQL and its extra parameters: each term (or one of its synonyms) somewhere in the text"""
+    from listing_search import SYNONYMS
+
+    clauses, params = [], {"restaurant_id": restaurant_id}
+    for i, term in enumerate(terms):
+        alternatives = []
+        for j, word in enumerate((term, *SYNONYMS.get(term, ()))):
+            params[f"w{i}_{j}"] = f"%{word}%"
+            alternatives.append(f"fl.food_item LIKE :w{i}_{j} OR fl.quantity LIKE :w{i}_{j}")
+        clauses.append("AND (" + " OR ".join(alternatives) + ")")
+    return " ".join(clauses), params
+
+
+def timed(function, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, samples
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def index_intact(connection, table, against_content):
+    """FTS5's own integrity check; rank 1 also compares the index with food_listings"""
+    try:
+        connection.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('integrity-check', ?)", (int(against_content),))
+        return True
+    except sqlite3.DatabaseError:
+        return False
+
+
+def indexed_rows(connection, table):
+    """Rows in an FTS5 index (not its content table): every row has one restaurant_id token"""
+    connection.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.{table}_vocab USING fts5vocab(main, {table}, 'col')")
+    return connection.execute(f"SELECT COALESCE(SUM(doc), 0) FROM temp.{table}_vocab WHERE col = 'restaurant_id'").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="1m", help="10k, 100k, 1m or a listing count")
+    parser.add_argument("--database", help="use this seed_data.py database instead of seeding")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs of each search")
+    parser.add_argument("--like-repeat", type=int, default=3, help="timed runs of each LIKE scan")
+    parser.add_argument("--seed", type=int, default=21)
+    args = parser.parse_args()
+    database = args.database and os.path.abspath(args.database)
+
+    app = load_app()
+    from listing_search import find_listings, search_params, search_terms
+    from migrations import migrate
+
+    start = time.perf_counter()
+    connection = sqlite3.connect(app.DATABASE)
+    if database:
+        source = sqlite3.connect(database)
+        source.backup(connection)
+        source.close()
+        connection.close()
+        migrate(app.DATABASE)  # a database seeded before the search indexes gets them now
+    else:
+        seed(connection, parse_size(args.size), random.Random(args.seed))
+        connection.close()
+    setup_seconds = time.perf_counter() - start
+
+    connection = sqlite3.connect(app.DATABASE, detect_types=sqlite3.PARSE_DECLTYPES)
+    connection.row_factory = sqlite3.Row
+    listings = connection.execute("SELECT COUNT(*) FROM food_listings").fetchone()[0]
+
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    def rank_order(row, scope):
+        """The order SEARCH_RANKED_SQL promises: bm25, then expiry (pending last)"""
+        fresh_until = row["fresh_until"]
+        expiry = str(fresh_until) if fresh_until is not None else ""
+        if scope == "all":
+            expiry = "".join(chr(0x10FFFF - ord(c)) for c in expiry)
+        return row["rank_score"], fresh_until is None, expiry
+
+    results = []
+    for text, filters in SEARCHES:
+        now = datetime.now()
+        terms = search_terms(text)
+        params = search_params(terms, now=now, limit=LIMIT, **filters)
+        rows, search_ms = timed(lambda: find_listings(connection, params), args.repeat)
+
+        text_filter, like_params = like_scan(terms, filters.get("restaurant_id"))
+        like_params.update(params)
+        like_rows, like_ms = timed(lambda: connection.execute(LIKE_SCAN_SQL.format(text_filter=text_filter),
+                                                              like_params).fetchall(), args.like_repeat)
+        matches = {row["id"] for row in like_rows}
+
+        label = " ".join([repr(text), *(f"{key}={value}" for key, value in filters.items())])
+        check(f"search returns only LIKE matches, as many as asked for, for {label}",
+              {row["id"] for row in rows} <= matches and len(rows) == min(LIMIT, len(matches)))
+        if params["match"] is not None:
+            check(f"results in rank order for {label}",
+                  [rank_order(row, params["scope"]) for row in rows] == sorted(rank_order(row, params["scope"]) for row in rows))
+        results.append({
+            "search": label,
+            "scope": params["scope"],
+            "matches": len(matches),
+            "search_ms": {"p50": round(statistics.median(search_ms), 2), "p95": round(percentile(search_ms, 0.95), 2)},
+            "like_scan_ms": {"p50": round(statistics.median(like_ms), 2)},
+            "top": rows[0]["food_item"] if rows else None,
+        })
+    check("searches found listings",
+          all(bool(result["matches"]) != (text in NO_MATCHES) for result, (text, _) in zip(results, SEARCHES)))
+
+    # Relevance before expiry: the closer match wins even though the other expires first;
+    # a listing still waiting for its estimate is found, but not inside a freshness window
+    soon, later = ((datetime.now() + timedelta(hours=hours)).isoformat() for hours in (1, 40))
+    connection.executemany(
+        "INSERT INTO food_listings (restaurant_id, food_item, quantity, fresh_until) VALUES (1, ?, '5 plates', ?)",
+        [("Kokum Special Platter With Extras", soon), ("Kokum", later), ("Kokum Sherbet Pending", None)])
+    kokum = [row["food_item"] for row in find_listings(connection, search_params(["kokum"]))]
+    check("a better match outranks one expiring sooner",
+          kokum.index("Kokum") < kokum.index("Kokum Special Platter With Extras"))
+    check("pending listings are found", "Kokum Sherbet Pending" in kokum)
+    check("a freshness window leaves pending listings out",
+          "Kokum Sherbet Pending" not in {row["food_item"] for row in find_listings(
+              connection, search_params(["kokum"], max_hours_left=48))})
+    connection.execute("DELETE FROM food_listings WHERE food_item LIKE 'Kokum%'")
+
+    # The triggers: claims, edits, expiry and archiving keep both indexes in step
+    def available_ids(text):
+        return {row["id"] for row in find_listings(connection, search_params(search_terms(text), limit=10 ** 7))}
+
+    rice = sorted(available_ids("rice"))
+    connection.execute("UPDATE food_listings SET status = 'Claimed' WHERE id = ?", (rice[0],))
+    check("claimed listing leaves the Available index", rice[0] not in available_ids("rice"))
+    connection.execute("UPDATE food_listings SET food_item = 'Tamarind Rice Special' WHERE id = ?", (rice[1],))
+    check("edited listing is found by its new words", rice[1] in available_ids("tamarind"))
+    connection.execute("UPDATE food_listings SET status = 'Expired' WHERE id = ?", (rice[2],))
+    connection.execute("DELETE FROM food_listings WHERE id = ?", (rice[2],))  # archived by the sweeper
+    check("archived listing is gone from every search",
+          rice[2] not in {row["id"] for row in find_listings(connection, search_params(["rice"], status="Expired", limit=10 ** 7))})
+    connection.commit()
+    check("every-listing index matches food_listings", index_intact(connection, "listing_search", True)
+          and indexed_rows(connection, "listing_search") == listings - 1)
+    available = connection.execute("SELECT COUNT(*) FROM food_listings WHERE status = 'Available'").fetchone()[0]
+    # Only a subset of food_listings is in it, so it can't be compared with the whole table
+    check("Available index holds exactly the Available listings", index_intact(connection, "available_listing_search", False)
+          and indexed_rows(connection, "available_listing_search") == available)
+    connection.close()
+
+    create_user(app, "bench-search-ngo", "ngo")
+    client = app.app.test_client()
+    login(client, "bench-search-ngo")
+    response = client.get("/api/listings/search?q=veg+rice&max_hours_left=48&limit=5")
+    body = response.get_json()
+    check("API returns ranked matches", response.status_code == 200 and 0 < len(body["listings"]) <= 5
+          and all("rice" in item["food_item"].lower() and 0 <= item["hours_left"] <= 48 for item in body["listings"]))
+    check("API rejects an unknown status", client.get("/api/listings/search?q=rice&status=Gone").status_code == 400)
+    check("API rejects a bad window", client.get("/api/listings/search?q=rice&min_hours_left=soon").status_code == 400)
+    check("API survives FTS5 syntax in the query",
+          client.get('/api/listings/search?q=rice" OR NEAR(*&restaurant_id=1').status_code == 200)
+    check("NGO dashboard shows search results", b"Search Results" in client.get("/dashboard?q=paneer").data)
+
+    summary = {}
+    for scope in ("available", "all"):
+        search_p50 = [result["search_ms"]["p50"] for result in results if result["scope"] == scope]
+        like_p50 = [result["like_scan_ms"]["p50"] for result in results if result["scope"] == scope]
+        summary[scope] = {
+            "search_p50_ms": {"median": round(statistics.median(search_p50), 2), "max": max(search_p50)},
+            "like_scan_p50_ms": {"median": round(statistics.median(like_p50), 2), "max": max(like_p50)},
+        }
+    for scope in ("available", "all"):
+        check(f"{scope} searches beat the LIKE scan, typical and worst case",
+              summary[scope]["search_p50_ms"]["median"] < summary[scope]["like_scan_p50_ms"]["median"]
+              and summary[scope]["search_p50_ms"]["max"] < summary[scope]["like_scan_p50_ms"]["max"])
+    print(json.dumps({
+        "listings": listings,
+        "available_listings": available,
+        "setup_seconds": round(setup_seconds, 1),
+        "searches": results,
+        "summary": summary,
+        "failed_checks": failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
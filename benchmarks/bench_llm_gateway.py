@@ -0,0 +1,154 @@
+"""
+Exercises llm_gateway.LLMGateway against the local fake Groq server: connection reuse,
+retries with backoff, the circuit breaker failing fast during an outage and hearing
+about streams that fail part-way or calls that end in an unexpected exception, and an
+upstream 429's Retry-After reaching the chat user. Exits non-zero if any check fails.
+
+    python benchmarks/bench_llm_gateway.py
+"""
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq import start_fake_groq
+from llm_gateway import CircuitBreaker, LLMError, LLMGateway, LLMRateLimited, LLMUnavailable
+
+CHAT_PAYLOAD = {"model": "llama-3.1-8b-instant", "messages": [{"role": "user", "content": "How does Food Pulse work?"}]}
+
+
+def timed(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main():
+    results = {}
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    # Keep-alive: bare requests.post (old call_groq_api) vs the pooled session
+    server, base_url = start_fake_groq()
+    calls = 100
+    bare_ms = timed(lambda: requests.post(f"{base_url}/chat/completions", json=CHAT_PAYLOAD, timeout=15), calls)
+    bare_connections = server.stats["connections"]
+    gateway = LLMGateway("test-key", base_url=base_url, breaker=CircuitBreaker(failure_threshold=3, reset_seconds=0.5))
+    server.stats["connections"] = 0
+    pooled_ms = timed(lambda: gateway.chat_completion(CHAT_PAYLOAD), calls)
+    results["keep_alive"] = {
+        "calls": calls,
+        "bare_requests": {"avg_ms": round(bare_ms, 3), "connections": bare_connections},
+        "gateway": {"avg_ms": round(pooled_ms, 3), "connections": server.stats["connections"]},
+    }
+    check("gateway reuses connections", server.stats["connections"] <= 2)
+
+    # Retries: two injected 503s, then success
+    gateway.backoff_base = 0.01
+    server.config["fail_next"] = 2
+    try:
+        gateway.chat_completion(CHAT_PAYLOAD)
+        recovered = True
+    except LLMError:
+        recovered = False
+    results["retries"] = {"recovered_after_503s": recovered, "gateway": gateway.stats()}
+    check("retries recover from transient 503s", recovered and gateway.retries == 2)
+
+    # Outage: breaker opens after 3 failed calls, then fails fast without touching the server
+    server.config["error_rate"] = 1.0
+    for _ in range(3):
+        try:
+            gateway.chat_completion(CHAT_PAYLOAD)
+        except LLMError:
+            pass
+    requests_before = server.stats["requests"]
+    start = time.perf_counter()
+    try:
+        gateway.chat_completion(CHAT_PAYLOAD)
+        short_circuited = False
+    except LLMUnavailable:
+        short_circuited = True
+    fail_fast_ms = (time.perf_counter() - start) * 1000
+    results["circuit_breaker"] = {
+        "state_during_outage": gateway.breaker.state,
+        "short_circuited": short_circuited,
+        "fail_fast_ms": round(fail_fast_ms, 3),
+        "server_requests_while_open": server.stats["requests"] - requests_before,
+    }
+    check("breaker fails fast during outage", short_circuited and server.stats["requests"] == requests_before)
+
+    # Recovery: after reset_seconds a trial call goes through and closes the breaker
+    server.config["error_rate"] = 0.0
+    time.sleep(0.6)
+    gateway.chat_completion(CHAT_PAYLOAD)
+    results["circuit_breaker"]["state_after_recovery"] = gateway.breaker.state
+    check("breaker closes after recovery", gateway.breaker.state == "closed")
+
+    # A stream cut off part-way is a failure: with a threshold of 1 the breaker opens
+    server.config["cut_streams_after"] = 3
+    streaming = LLMGateway("test-key", base_url=base_url, breaker=CircuitBreaker(failure_threshold=1, reset_seconds=0.2))
+    pieces = []
+    try:
+        for piece in streaming.stream_chat_completion(CHAT_PAYLOAD):
+            pieces.append(piece)
+        stream_failed = False
+    except LLMError:
+        stream_failed = True
+    server.config["cut_streams_after"] = 0
+    results["stream_failure"] = {"pieces_before_cut": len(pieces), "breaker_state": streaming.breaker.state}
+    check("stream failing part-way opens the breaker", stream_failed and streaming.breaker.state == "open")
+
+    # Half-open trial call ending in an unexpected exception (payload not JSON-serializable)
+    # must still settle, or the breaker never lets another call through
+    time.sleep(0.3)
+    try:
+        streaming.chat_completion({**CHAT_PAYLOAD, "bad": object()})
+    except Exception:
+        pass
+    time.sleep(0.3)
+    try:
+        streaming.chat_completion(CHAT_PAYLOAD)
+        recovered = True
+    except LLMError:
+        recovered = False
+    results["stream_failure"]["recovered_after_unexpected_error"] = recovered
+    check("unexpected error in a trial call doesn't wedge the breaker", recovered and streaming.breaker.state == "closed")
+
+    # Upstream 429: its Retry-After is what the chat user is told to wait
+    server.config.update(rate_limit_rate=1.0, retry_after=7)
+    limited = LLMGateway("test-key", base_url=base_url, backoff_max=0.01)
+    try:
+        limited.chat_completion(CHAT_PAYLOAD)
+        upstream_retry_after = None
+    except LLMRateLimited as e:
+        upstream_retry_after = e.retry_after
+    os.environ.setdefault("GROQ_API_KEY", "test-key")
+    from chat_sessions import ChatSession
+    from chatbot import FoodPulseChatbot
+    chatbot = FoodPulseChatbot(gateway=limited)
+    chatbot.set_document_text("Volunteers can help NGOs collect and deliver donated food.")
+    state = ChatSession("bench")
+    reply = chatbot.generate_response("Can volunteers deliver food?", state)
+    server.config["rate_limit_rate"] = 0.0
+    results["upstream_rate_limit"] = {"retry_after": upstream_retry_after, "chat_retry_after": state.retry_after,
+                                      "chat_busy": state.busy, "reply": reply}
+    check("upstream Retry-After reaches the chat user",
+          upstream_retry_after == 7 and state.retry_after == 7 and state.busy and "7 seconds" in reply)
+
+    results["failed_checks"] = failures
+    print(json.dumps(results, indent=2))
+    server.shutdown()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Checks the /metrics endpoint after a little traffic of every kind: per-route latency,
+SQL statements, template renders, password checks, LLM calls by outcome (success,
+rate_limit, api_error), the 48-hour shelf-life fallback and the FAQ vs LLM ratio. Also
+checks the slow-query log and measures what timing costs per SQL statement. Exits
+non-zero if a check fails.
+
+    python benchmarks/bench_metrics.py
+"""
+import contextlib
+import io
+import json
+import re
+import sqlite3
+import sys
+import time
+
+from common import REPO_ROOT, create_user, load_app, login
+from fake_groq import start_fake_groq
+
+sys.path.insert(0, REPO_ROOT)
+
+from metrics import timed_connection_factory
+
+
+def samples(text):
+    """{metric line without its value: value} for every sample in a Prometheus text page"""
+    result = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            result[name] = float(value)
+    return result
+
+
+def statement_overhead_us(statements=50000):
+    """Microseconds timing adds to a trivial indexed SELECT"""
+    timings = {}
+    for name, factory in (("plain", sqlite3.Connection), ("timed", timed_connection_factory(lambda sql, seconds: None))):
+        connection = sqlite3.connect(":memory:", factory=factory)
+        connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, x)")
+        connection.execute("INSERT INTO t VALUES (1, 1)")
+        start = time.perf_counter()
+        for _ in range(statements):
+            connection.execute("SELECT x FROM t WHERE id = ?", (1,)).fetchone()
+        timings[name] = (time.perf_counter() - start) / statements * 1e6
+    return round(timings["timed"] - timings["plain"], 2), timings
+
+
+def main():
+    fake, fake_url = start_fake_groq(retry_after=0)
+    app = load_app({"GROQ_API_KEY": "bench-key", "GROQ_BASE_URL": fake_url, "SLOW_QUERY_MS": "1000",
+                    "SHELF_LIFE_RULE_CONFIDENCE": "0.75", "CHAT_USER_BURST": "20"})
+    create_user(app, "metrics-restaurant", "restaurant")
+    create_user(app, "metrics-ngo", "ngo")
+    create_user(app, "metrics-admin", "admin")
+    restaurant, ngo, admin = app.app.test_client(), app.app.test_client(), app.app.test_client()
+    login(restaurant, "metrics-restaurant")
+    login(ngo, "metrics-ngo")
+    login(admin, "metrics-admin")
+
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    restaurant.post("/add_food", data={"food_item": "Veg Biryani", "quantity": "5 plates"})  # rules
+    restaurant.post("/add_food", data={"food_item": "Chef's Special", "quantity": "5 plates"})  # LLM
+    fake.config["fail_next"] = 3  # the first try and both retries
+    restaurant.post("/add_food", data={"food_item": "Party Platter", "quantity": "2 trays"})  # LLM down: 48h
+    for client in (restaurant, ngo, admin):
+        client.get("/dashboard")
+    ngo.post("/claim_food/1", headers={"Accept": "application/json"})
+    ngo.post("/chat", json={"message": "how does food pulse work"})  # FAQ
+    ngo.post("/chat", json={"message": "Can volunteers help deliver food on weekends?"})  # LLM
+    fake.config["rate_limit_rate"] = 1.0
+    ngo.post("/chat", json={"message": "Can restaurants donate raw food to NGOs?"})  # LLM keeps answering 429
+    fake.config["rate_limit_rate"] = 0.0
+
+    response = app.app.test_client().get("/metrics")
+    check("metrics served in the Prometheus text format",
+          response.status_code == 200 and response.content_type.startswith("text/plain; version=0.0.4"))
+    page = samples(response.get_data(as_text=True))
+
+    for route in ("/login", "/dashboard", "/add_food", "/claim_food/<int:listing_id>", "/chat"):
+        check(f"request latency for {route}", any(f'route="{route}"' in name for name in page
+                                                   if name.startswith("foodpulse_request_duration_seconds_count")))
+    for statement in ("SELECT users", "INSERT food_listings", "UPDATE food_listings", "COMMIT"):
+        check(f"SQL timing for {statement}", f'foodpulse_sql_statement_duration_seconds_count{{statement="{statement}"}}' in page)
+    for template in ("restaurant_dashboard.html", "ngo_dashboard.html", "admin_dashboard.html"):
+        check(f"render time for {template}", f'foodpulse_template_render_duration_seconds_count{{template="{template}"}}' in page)
+    check("password checks timed", page.get("foodpulse_password_check_duration_seconds_count", 0) >= 3)
+    llm_outcomes = {re.search(r'outcome="(\w+)"', name).group(1): value for name, value in page.items()
+                    if name.startswith("foodpulse_llm_request_duration_seconds_count")}
+    check("LLM outcomes recorded", {"success", "api_error", "rate_limit"} <= set(llm_outcomes))
+    check("48-hour fallback counted", page.get('foodpulse_shelf_life_estimates_total{tier="default_48h"}') == 1)
+    check("chat reply sources counted", page.get('foodpulse_chat_replies_total{source="faq"}') == 1
+          and page.get('foodpulse_chat_replies_total{source="llm"}') == 1
+          and page.get('foodpulse_chat_replies_total{source="rate_limit"}') == 1)
+    check("FAQ hit ratio", page.get("foodpulse_chat_faq_hit_ratio") == 0.5)
+
+    # Slow-query log: everything is slower than 0 ms
+    app.SLOW_QUERY_MS = 0.000001
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        ngo.get("/dashboard")
+    app.SLOW_QUERY_MS = 1000
+    check("slow-query log prints statements over the threshold", "Slow query (" in log.getvalue())
+
+    overhead, per_statement = statement_overhead_us()
+    fake.shutdown()
+    print(json.dumps({
+        "series": len(page),
+        "llm_outcomes": llm_outcomes,
+        "sql_timing_overhead_us_per_statement": overhead,
+        "select_us": {name: round(us, 2) for name, us in per_statement.items()},
+        "failed_checks": failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+"Food near me" at city scale: seeds restaurants spread over a ~40 km city and tens of
+thousands of listings, then times NEARBY_LISTINGS_SQL (R*Tree bounding box) against the
+same filters evaluated over every Available listing. Checks that both return the same
+rows, that the R*Tree follows claims and restaurant moves, and that /api/listings/nearby
+answers. Exits non-zero if a check fails.
+
+    python benchmarks/bench_nearby_listings.py --listings 50000 --restaurants 2000
+"""
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import create_user, load_app, login
+
+CITY_CENTER = (22.5726, 88.3639)
+CITY_SPAN_DEGREES = 0.36  # ~40 km across
+
+# The nearby query without the R*Tree: what the server would do by checking every Available listing
+FULL_SCAN_SQL = """
+    SELECT * FROM (
+        SELECT fl.id, fl.fresh_until,
+               {km2} * ((u.latitude - :lat) * (u.latitude - :lat)
+                   + (u.longitude - :lon) * (u.longitude - :lon) * :lon_scale) AS distance_sq_km,
+               (julianday(fl.fresh_until) - julianday(:now)) * 24 - :handling_hours AS spare_hours
+        FROM food_listings fl JOIN users u ON u.id = fl.restaurant_id
+        WHERE fl.status = 'Available' AND u.latitude IS NOT NULL AND u.longitude IS NOT NULL
+    )
+    WHERE distance_sq_km <= :radius_km * :radius_km
+      AND (fresh_until IS NULL
+           OR (spare_hours > 0 AND spare_hours * spare_hours * :speed_kmh * :speed_kmh >= distance_sq_km))
+    ORDER BY fresh_until IS NULL, julianday(fresh_until), id
+    LIMIT :limit
+"""
+
+
+def seed(connection, restaurants, listings, now, rng):
+    connection.executemany(
+        "INSERT INTO users (name, email, password, account_type, address, phone_number, is_profile_complete, latitude, longitude) "
+        "VALUES (?, ?, 'x', 'restaurant', 'Bench Street', '0', 1, ?, ?)",
+        [(f"r{i}", f"r{i}@bench.local",
+          CITY_CENTER[0] + rng.uniform(-0.5, 0.5) * CITY_SPAN_DEGREES,
+          CITY_CENTER[1] + rng.uniform(-0.5, 0.5) * CITY_SPAN_DEGREES) for i in range(restaurants)],
+    )
+    restaurant_ids = [row[0] for row in connection.execute("SELECT id FROM users WHERE account_type = 'restaurant'")]
+    rows = []
+    for i in range(listings):
+        status = rng.choices(["Available", "Claimed", "Expired"], weights=(6, 3, 1))[0]
+        fresh_until = None if rng.random() < 0.02 else now + timedelta(hours=rng.uniform(-6, 48))
+        rows.append((rng.choice(restaurant_ids), f"Item {i}", "5 kg", now - timedelta(hours=rng.uniform(0, 24)),
+                     fresh_until, status))
+    connection.executemany(
+        "INSERT INTO food_listings (restaurant_id, food_item, quantity, timestamp, fresh_until, status) "
+        "VALUES (?, ?, ?, ?, ?, ?)", rows,
+    )
+    connection.commit()
+    return restaurant_ids
+
+
+def timed(connection, sql, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = connection.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return [row["id"] for row in rows], statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=50000)
+    parser.add_argument("--restaurants", type=int, default=2000)
+    parser.add_argument("--radius-km", type=float, default=5)
+    parser.add_argument("--points", type=int, default=20, help="NGO locations to query from")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = load_app()
+    from geo import KM_PER_DEGREE, nearby_params
+    from queries import NEARBY_LISTINGS_SQL
+    full_scan_sql = FULL_SCAN_SQL.format(km2=KM_PER_DEGREE ** 2)
+
+    rng = random.Random(16)
+    now = datetime.now()
+    connection = sqlite3.connect(app.DATABASE, detect_types=sqlite3.PARSE_DECLTYPES)
+    connection.row_factory = sqlite3.Row
+    start = time.perf_counter()
+    restaurant_ids = seed(connection, args.restaurants, args.listings, now, rng)
+    seed_seconds = time.perf_counter() - start
+
+    failures = []
+
+    def check(name, ok):
+        if not ok:
+            failures.append(name)
+
+    indexed = connection.execute("SELECT COUNT(*) FROM listing_locations").fetchone()[0]
+    available = connection.execute("SELECT COUNT(*) FROM food_listings WHERE status = 'Available'").fetchone()[0]
+    check("R*Tree holds exactly the Available listings", indexed == available)
+
+    now_text = now.strftime("%Y-%m-%d %H:%M:%S")
+    rtree_ms, scan_ms, result_sizes = [], [], []
+    for _ in range(args.points):
+        lat = CITY_CENTER[0] + rng.uniform(-0.4, 0.4) * CITY_SPAN_DEGREES
+        lon = CITY_CENTER[1] + rng.uniform(-0.4, 0.4) * CITY_SPAN_DEGREES
+        params = nearby_params(lat, lon, args.radius_km, now_text, 50)
+        rtree_ids, rtree_time = timed(connection, NEARBY_LISTINGS_SQL, params, args.repeat)
+        scan_ids, scan_time = timed(connection, full_scan_sql, params, args.repeat)
+        check("R*Tree and full scan return the same listings", rtree_ids == scan_ids)
+        rtree_ms.append(rtree_time)
+        scan_ms.append(scan_time)
+        result_sizes.append(len(rtree_ids))
+
+    # The triggers keep the R*Tree in step: claimed listings drop out, moved restaurants take theirs along
+    params = nearby_params(*CITY_CENTER, args.radius_km, now_text, 50)
+    before = [row["id"] for row in connection.execute(NEARBY_LISTINGS_SQL, params)]
+    if before:
+        connection.execute("UPDATE food_listings SET status = 'Claimed' WHERE id = ?", (before[0],))
+        after = [row["id"] for row in connection.execute(NEARBY_LISTINGS_SQL, params)]
+        check("claimed listing leaves the nearby results", before[0] not in after)
+        mover = connection.execute("SELECT restaurant_id FROM food_listings WHERE id = ?", (before[1],)).fetchone()[0]
+        connection.execute("UPDATE users SET latitude = latitude + 1 WHERE id = ?", (mover,))
+        after = [row["id"] for row in connection.execute(NEARBY_LISTINGS_SQL, params)]
+        check("moved restaurant's listings leave the nearby results", before[1] not in after)
+        connection.rollback()
+    check("R*Tree unchanged after rollback",
+          connection.execute("SELECT COUNT(*) FROM listing_locations").fetchone()[0] == indexed)
+    connection.close()
+
+    create_user(app, "bench-ngo", "ngo")
+    client = app.app.test_client()
+    login(client, "bench-ngo")
+    response = client.get(f"/api/listings/nearby?lat={CITY_CENTER[0]}&lon={CITY_CENTER[1]}&radius_km={args.radius_km}")
+    body = response.get_json()
+    check("API returns nearby listings", response.status_code == 200 and len(body["listings"]) > 0)
+    check("API results are soonest-expiring first and in range",
+          all(item["distance_km"] <= args.radius_km for item in body["listings"])
+          and [item["fresh_until"] for item in body["listings"] if item["fresh_until"]]
+          == sorted(item["fresh_until"] for item in body["listings"] if item["fresh_until"]))
+    check("API without a saved location asks for one", client.get("/api/listings/nearby").status_code == 400)
+
+    print(json.dumps({
+        "listings": args.listings,
+        "available_listings": available,
+        "restaurants": len(restaurant_ids),
+        "seed_seconds": round(seed_seconds, 2),
+        "radius_km": args.radius_km,
+        "median_results": statistics.median(result_sizes),
+        "rtree_ms": {"p50": round(statistics.median(rtree_ms), 3), "max": round(max(rtree_ms), 3)},
+        "full_scan_ms": {"p50": round(statistics.median(scan_ms), 3), "max": round(max(scan_ms), 3)},
+        "speedup": round(statistics.median(scan_ms) / statistics.median(rtree_ms), 1),
+        "failed_checks": failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Agreement between the offline shelf-life rules (shelf_life_rules.py) and recorded
+estimates, the rule tier's per-item cost, and a regression table of cooked dishes named
+after raw produce ("Tomato Rice", "Scrambled Eggs") that the rules must not label with the
+produce's shelf life. Exits non-zero if a check fails.
+
+By default the estimates come from shelf_life_reference.json next to this script, so the
+comparison runs offline. --recorded takes another JSON file ({"food item": hours}) or the
+shelf_life_cache table of a Food Pulse database, which only ever holds LLM answers:
+
+    python benchmarks/bench_shelf_life_rules.py
+    python benchmarks/bench_shelf_life_rules.py --recorded database.db
+    python benchmarks/bench_shelf_life_rules.py --recorded llm_shelf_life.json
+
+To record a fresh set (asks the real Groq API once per item, needs GROQ_API_KEY):
+
+    python benchmarks/bench_shelf_life_rules.py --record llm_shelf_life.json
+"""
+import argparse
+import json
+import math
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+from common import SAMPLE_FOOD_ITEMS, load_app
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shelf_life_rules import estimate_shelf_life_by_rules
+
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shelf_life_reference.json")
+
+# Items to record on top of SAMPLE_FOOD_ITEMS: raw produce, seafood, dairy, bakery, grains, stored items
+RECORD_ITEMS = [
+    "Tomatoes", "Potatoes", "Onions", "Spinach", "Bananas", "Apples", "Mangoes", "Cucumbers",
+    "Prawn Curry", "Fish Biryani", "Raw Fish", "Grilled Chicken", "Chicken Biryani", "Raw Chicken",
+    "Mutton Curry", "Boiled Eggs", "Eggs", "Milk", "Paneer", "Curd", "Cheese Slices", "Lassi",
+    "Bread", "Buns", "Chocolate Cake", "Biscuits", "Cookies", "Croissants", "Pizza", "Veg Sandwich",
+    "Basmati Rice", "Wheat Flour", "Toor Dal", "Pasta", "Noodles", "Poha", "Chapati", "Puri",
+    "Kheer", "Rasgulla", "Jalebi", "Pakoras", "Veg Cutlets", "Frozen Peas", "Frozen Chicken",
+    "Canned Beans", "Green Salad", "Orange Juice", "Chicken", "Rice", "Scrambled Eggs", "Egg Noodles",
+    "Veg Noodles", "Tomato Rice", "Mashed Potatoes", "Veg Thali", "Spinach Rice",
+]
+
+# Cooked dishes named after raw produce: (food item, most hours the rule tier may answer with).
+# Deferring to the LLM (no estimate, or one below the confidence threshold) also passes.
+DISH_REGRESSIONS = [
+    ("Scrambled Eggs", 24), ("Egg Noodles", 24), ("Eggs Benedict", 24), ("Egg Fried Rice", 24),
+    ("Veg Noodles", 24), ("Veg Thali", 24), ("Veg Meal", 24), ("Tomato Rice", 24), ("Tomato Soup", 24),
+    ("Mashed Potatoes", 24), ("Potato Wedges", 24), ("Boiled Potatoes", 24), ("Spinach Rice", 24),
+    ("Spinach Pakoras", 24), ("Corn Chaat", 24), ("Mushroom Pizza", 24), ("Stuffed Capsicum", 24),
+    ("Paneer Tikka", 24), ("Curd Rice", 24),
+]
+
+
+def load_recorded(path):
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            recorded = json.load(f)
+        # shelf_life_reference.json wraps the estimates with a note on where they came from
+        recorded = recorded.get("estimates", recorded)
+        return {name: int(hours) for name, hours in recorded.items()}
+    connection = sqlite3.connect(path)
+    rows = connection.execute("SELECT food_key, hours FROM shelf_life_cache").fetchall()
+    connection.close()
+    return {food_key: int(hours) for food_key, hours in rows}
+
+
+def record(path):
+    path = os.path.abspath(path)  # load_app changes directory
+    app = load_app({"GROQ_BASE_URL": os.environ.get("GROQ_BASE_URL", "https://api.groq.com/openai/v1")})
+    recorded = {}
+    for food_item in dict.fromkeys(SAMPLE_FOOD_ITEMS + RECORD_ITEMS):
+        try:
+            recorded[food_item] = app.query_food_freshness_duration(food_item)
+        except Exception as e:
+            print(f"Skipping '{food_item}': {e}")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(recorded, f, indent=2)
+    print(f"Recorded {len(recorded)} LLM estimates to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recorded", default=REFERENCE,
+                        help="JSON file of {food item: hours}, or a database with shelf_life_cache")
+    parser.add_argument("--record", help="ask the LLM for the sample items and write them to this JSON file")
+    parser.add_argument("--confidence", type=float, default=float(os.environ.get("SHELF_LIFE_RULE_CONFIDENCE", 0.75)))
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+    recorded = load_recorded(args.recorded)
+    if not recorded:
+        sys.exit(f"No recorded estimates in {args.recorded}")
+
+    rows = []
+    start = time.perf_counter()
+    estimates = {food_item: estimate_shelf_life_by_rules(food_item) for food_item in recorded}
+    per_item_us = (time.perf_counter() - start) / len(recorded) * 1e6
+
+    for food_item, llm_hours in recorded.items():
+        estimate = estimates[food_item]
+        if estimate is None or estimate.confidence < args.confidence or llm_hours <= 0:
+            continue
+        rows.append((food_item, estimate, llm_hours, abs(math.log(estimate.hours / llm_hours))))
+
+    def share(max_ratio):
+        return round(sum(1 for row in rows if row[3] <= math.log(max_ratio)) / len(rows), 3) if rows else None
+
+    # Rules saying an item keeps more than twice as long as the LLM thinks: the risky direction
+    overestimates = sorted(
+        ({"food_item": name, "rules": est.hours, "llm": llm, "category": est.category}
+         for name, est, llm, _ in rows if est.hours > 2 * llm),
+        key=lambda row: row["rules"] / row["llm"], reverse=True,
+    )
+    failures = []
+    for food_item, max_hours in DISH_REGRESSIONS:
+        estimate = estimate_shelf_life_by_rules(food_item)
+        if estimate is not None and estimate.confidence >= args.confidence and estimate.hours > max_hours:
+            failures.append(f"{food_item}: rules answer {estimate.hours}h ({estimate.category}), at most {max_hours}h")
+
+    print(json.dumps({
+        "recorded": os.path.relpath(args.recorded),
+        "recorded_items": len(recorded),
+        "rule_tier_answers": len(rows),
+        "coverage": round(len(rows) / len(recorded), 3),
+        "rule_estimate_us_per_item": round(per_item_us, 2),
+        "agreement": {
+            "exact": round(sum(1 for row in rows if row[1].hours == row[2]) / len(rows), 3) if rows else None,
+            "within_1_5x": share(1.5),
+            "within_2x": share(2),
+            "median_ratio": round(math.exp(statistics.median(row[3] for row in rows)), 2) if rows else None,
+        },
+        "overestimates_vs_llm": overestimates,
+        "dish_regressions": len(DISH_REGRESSIONS),
+        "failed_checks": failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
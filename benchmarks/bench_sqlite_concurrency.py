@@ -0,0 +1,142 @@
+"""
+Read/write throughput of the SQLite layer under concurrency: the old per-request
+connections in rollback-journal mode vs the pooled WAL connections from db.py.
+Readers run the NGO dashboard page query; writers alternate add_food-style inserts
+and claim_food-style updates.
+
+    python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 4 --seconds 5
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import ConnectionPool, pragmas_from_env
+from migrations import migrate
+from queries import FIRST_PAGE_CURSOR, NGO_LISTINGS_PAGE_SQL
+
+
+def seed(db_path, listings):
+    migrate(db_path)
+    connection = sqlite3.connect(db_path)
+    connection.execute(
+        "INSERT INTO users (name, email, password, account_type) VALUES ('bench', 'bench@bench.local', 'x', 'restaurant')"
+    )
+    connection.executemany(
+        "INSERT INTO food_listings (restaurant_id, food_item, quantity, timestamp, fresh_until) "
+        "VALUES (1, ?, '10 meals', datetime('now', ?), datetime('now', '+1 day'))",
+        [(f"item {i}", f"-{i} seconds") for i in range(listings)]
+    )
+    connection.commit()
+    connection.close()
+
+
+class PerRequestConnections:
+    """What get_db() used to do: a fresh default connection for every request"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def connection(self):
+        connection = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+        connection.row_factory = sqlite3.Row
+        return _closing(connection)
+
+
+class _closing:
+    def __init__(self, connection):
+        self.connection_ = connection
+
+    def __enter__(self):
+        return self.connection_
+
+    def __exit__(self, *exc):
+        self.connection_.close()
+
+
+def run(source, readers, writers, seconds, listings):
+    counts = {"reads": 0, "writes": 0, "locked_errors": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def reader():
+        done = 0
+        while time.perf_counter() < stop:
+            with source.connection() as connection:
+                connection.execute(NGO_LISTINGS_PAGE_SQL, (*FIRST_PAGE_CURSOR, 50)).fetchall()
+            done += 1
+        with lock:
+            counts["reads"] += done
+
+    def writer(worker_id):
+        done = errors = 0
+        while time.perf_counter() < stop:
+            try:
+                with source.connection() as connection:
+                    if done % 2:
+                        connection.execute(
+                            "UPDATE food_listings SET status = 'Claimed', claimed_by_id = 1 WHERE id = ?",
+                            ((done * 7 + worker_id) % listings + 1,)
+                        )
+                    else:
+                        connection.execute(
+                            "INSERT INTO food_listings (restaurant_id, food_item, quantity, fresh_until) "
+                            "VALUES (1, 'bench item', '5 kg', datetime('now', '+1 day'))"
+                        )
+                    connection.commit()
+                done += 1
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["locked_errors"] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "reads_per_s": round(counts["reads"] / seconds, 1),
+        "writes_per_s": round(counts["writes"] / seconds, 1),
+        "locked_errors": counts["locked_errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--listings", type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="foodpulse-bench-")
+    results = {}
+
+    before_path = os.path.join(workdir, "before.db")
+    seed(before_path, args.listings)
+    results["before"] = run(PerRequestConnections(before_path), args.readers, args.writers, args.seconds, args.listings)
+
+    after_path = os.path.join(workdir, "after.db")
+    seed(after_path, args.listings)
+    pool = ConnectionPool(after_path, max_idle=args.readers + args.writers)
+    results["after"] = run(pool, args.readers, args.writers, args.seconds, args.listings)
+    results["after"]["pragmas"] = pragmas_from_env()
+    results["after"]["pool"] = pool.stats()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
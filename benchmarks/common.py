@@ -0,0 +1,45 @@
+"""Shared setup for the benchmark scripts: a throwaway database and an app wired to it."""
+import os
+import sqlite3
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_FOOD_ITEMS = [
+    "Veg Biryani", "Dal Makhani", "Paneer Butter Masala", "Jeera Rice", "Butter Naan",
+    "Chicken Curry", "Fish Fry", "Mixed Veg Sabzi", "Chole", "Rajma Chawal",
+    "Gulab Jamun", "Samosas", "Idli", "Masala Dosa", "Sambar",
+    "Curd Rice", "Aloo Paratha", "Egg Curry", "Mutton Biryani", "Bread Loaves",
+    "Fruit Salad", "Vegetable Pulao", "Khichdi", "Poha", "Upma",
+]
+
+
+def load_app(env=None):
+    """chdir into a temp dir and import app, which creates a fresh database there"""
+    workdir = tempfile.mkdtemp(prefix="foodpulse-bench-")
+    os.chdir(workdir)
+    # Benchmarks seed their own data; a background expiry sweep would change it mid-run
+    os.environ.setdefault("EXPIRY_SWEEP_INTERVAL", "0")
+    os.environ.update(env or {})
+    sys.path.insert(0, REPO_ROOT)
+    # Importing app applies the migrations to ./database.db
+    import app
+    return app
+
+
+def create_user(app_module, name, account_type, password="bench-password"):
+    from werkzeug.security import generate_password_hash
+    connection = sqlite3.connect(app_module.DATABASE)
+    cursor = connection.execute(
+        "INSERT INTO users (name, email, password, account_type, address, phone_number, is_profile_complete) "
+        "VALUES (?, ?, ?, ?, 'Bench Street', '0000000000', 1)",
+        (name, f"{name}@bench.local", generate_password_hash(password), account_type)
+    )
+    connection.commit()
+    connection.close()
+    return cursor.lastrowid
+
+
+def login(client, name, password="bench-password"):
+    client.post("/login", data={"login-email": f"{name}@bench.local", "login-password": password})
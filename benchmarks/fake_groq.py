@@ -0,0 +1,175 @@
+"""
+Local stand-in for Groq's OpenAI-compatible chat completions API, for offline tests
+and benchmarks. Point the app at it with GROQ_BASE_URL=http://127.0.0.1:<port>/openai/v1.
+
+    python benchmarks/fake_groq.py --port 8765 --latency 0.2 --latency-jitter 0.3 --error-rate 0.05
+
+Replies follow the prompt: an integer for single shelf-life prompts, a JSON object for
+batched ones, and a short canned paragraph for chat. Requests with "stream": true get
+the reply word by word as server-sent events, like the real API.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CONFIG = {
+    "latency": 0.0,          # seconds before responding
+    "latency_jitter": 0.0,   # plus an exponentially distributed extra with this mean (a long tail)
+    "prefill_latency": 0.0,  # extra seconds per 1,000 prompt characters (models time-to-first-token)
+    "error_rate": 0.0,       # fraction of requests answered with error_status
+    "error_status": 503,
+    "rate_limit_rate": 0.0,  # fraction answered 429 with a Retry-After header
+    "retry_after": 1,
+    "fail_next": 0,          # fail this many upcoming requests, regardless of error_rate
+    "word_delay": 0.0,       # generation time per reply word: between streamed chunks, or all up front
+    "cut_streams_after": 0,  # drop the connection after this many streamed words (0: never)
+    "shelf_life_hours": 24,
+    "chat_reply": "Food Pulse connects restaurants with surplus food to NGOs that feed people in need.",
+}
+
+
+def _fake_reply(payload, config):
+    system_prompt = next((m["content"] for m in payload.get("messages", []) if m["role"] == "system"), "")
+    user_prompt = next((m["content"] for m in payload.get("messages", []) if m["role"] == "user"), "")
+    if "JSON object mapping" in system_prompt:
+        items = re.findall(r"^- (.+)$", user_prompt, re.MULTILINE)
+        return json.dumps({item: config["shelf_life_hours"] for item in items})
+    if "ONLY an integer" in system_prompt:
+        return str(config["shelf_life_hours"])
+    return config["chat_reply"]
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def _send_stream(self, payload, reply, delay):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = re.findall(r"\S+\s*", reply)
+        for index, word in enumerate(words):
+            if index and index == self.server.config["cut_streams_after"]:
+                self.close_connection = True  # the client sees a body cut off mid-stream
+                return
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "model": payload.get("model"),
+                "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            time.sleep(delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        config = self.server.config
+        prompt_chars = sum(len(m.get("content", "")) for m in payload.get("messages", []))
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+            self.server.stats["prompt_chars"] += prompt_chars
+
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        jitter = random.expovariate(1 / config["latency_jitter"]) if config["latency_jitter"] > 0 else 0.0
+        time.sleep(config["latency"] + jitter + config["prefill_latency"] * prompt_chars / 1000)
+        with self.server.stats_lock:
+            fail = config["fail_next"] > 0 or random.random() < config["error_rate"]
+            rate_limited = not fail and random.random() < config["rate_limit_rate"]
+            if fail:
+                config["fail_next"] = max(0, config["fail_next"] - 1)
+                self.server.stats["errors"] += 1
+            if rate_limited:
+                self.server.stats["rate_limited"] += 1
+        if fail:
+            self._send_json(config["error_status"], {"error": {"message": "injected failure"}})
+            return
+        if rate_limited:
+            self._send_json(429, {"error": {"message": "injected rate limit"}},
+                            {"Retry-After": str(config["retry_after"])})
+            return
+
+        if payload.get("stream"):
+            self._send_stream(payload, _fake_reply(payload, config), config["word_delay"])
+            return
+
+        reply = _fake_reply(payload, config)
+        time.sleep(config["word_delay"] * len(reply.split()))
+        self._send_json(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply},
+                         "finish_reason": "stop"}],
+        })
+
+
+def start_fake_groq(port=0, **config):
+    """Start the server on a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeGroqHandler)
+    server.daemon_threads = True
+    server.config = {**DEFAULT_CONFIG, **config}
+    server.stats = {"connections": 0, "requests": 0, "errors": 0, "rate_limited": 0, "prompt_chars": 0}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/openai/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=DEFAULT_CONFIG["latency"])
+    parser.add_argument("--latency-jitter", type=float, default=DEFAULT_CONFIG["latency_jitter"])
+    parser.add_argument("--prefill-latency", type=float, default=DEFAULT_CONFIG["prefill_latency"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_CONFIG["error_rate"])
+    parser.add_argument("--error-status", type=int, default=DEFAULT_CONFIG["error_status"])
+    parser.add_argument("--rate-limit-rate", type=float, default=DEFAULT_CONFIG["rate_limit_rate"])
+    parser.add_argument("--word-delay", type=float, default=DEFAULT_CONFIG["word_delay"])
+    args = parser.parse_args()
+
+    server, base_url = start_fake_groq(
+        args.port, latency=args.latency, latency_jitter=args.latency_jitter, prefill_latency=args.prefill_latency,
+        error_rate=args.error_rate, error_status=args.error_status, rate_limit_rate=args.rate_limit_rate,
+        word_delay=args.word_delay,
+    )
+    print(f"Fake Groq API listening; set GROQ_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
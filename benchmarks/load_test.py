@@ -0,0 +1,369 @@
+"""
+Load test of the main routes over HTTP, with the fake Groq server standing in for the
+LLM: login, the dashboard for each role, add_food, claim_food and /chat. Each scenario
+runs for --seconds with --threads concurrent clients; throughput and p50/p95/p99
+latency are printed as JSON (and written to --output).
+
+    python benchmarks/load_test.py --size 100k --output load-100k.json
+    python benchmarks/load_test.py --size 100k --compare load-100k.json
+
+Pass --database to load a database made by seed_data.py instead of seeding at startup
+(a 1m database takes about a minute to seed). With --compare, the run is checked
+against an earlier result file and exits non-zero when a scenario's throughput fell or
+its p95 latency rose by more than --tolerance.
+
+Dashboards are measured with the dashboard cache off (--dashboard-cache-ttl 0), so the
+numbers track the queries and templates; pass a TTL to measure cached serving instead.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import requests
+from werkzeug.serving import make_server
+
+from common import REPO_ROOT, load_app
+from fake_groq import start_fake_groq
+from seed_data import FOOD_ITEMS, PASSWORD, parse_size, seed, user_counts
+
+SCENARIOS = ["login", "dashboard_restaurant", "dashboard_ngo", "dashboard_admin", "add_food", "claim_food", "chat"]
+# Items the offline rules can't place, so add_food has to ask the LLM (then the shelf-life cache)
+UNKNOWN_FOOD_ITEMS = ["Chef's Special", "Thali", "Combo Meal", "Party Platter", "Tiffin"]
+LLM_QUESTION = "Can volunteers help deliver food from restaurant {} on weekends?"
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": round(samples[-1] * 1000, 2)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class LoadTest:
+    """The server under test plus one request function per scenario"""
+
+    def __init__(self, app, base_url, users, faq_questions, unknown_food_share):
+        self.app = app
+        self.base_url = base_url
+        self.users = users  # account type -> how many seeded users of that type
+        self.faq_questions = faq_questions
+        self.unknown_food_share = unknown_food_share
+        self.claim_ids = []
+        self._claim_lock = threading.Lock()
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+
+    def next_number(self):
+        with self._counter_lock:
+            self._counter += 1
+            return self._counter
+
+    def logged_in(self, prefix, account_type, worker):
+        """A session logged in as one of the seeded users of account_type, picked by worker"""
+        http = requests.Session()
+        name = f"{prefix}{worker % self.users[account_type] + 1}"
+        response = http.post(f"{self.base_url}/login", allow_redirects=False,
+                             data={"login-email": f"{name}@bench.local", "login-password": PASSWORD})
+        if response.status_code != 302:
+            raise RuntimeError(f"login as {name} failed: {response.status_code}")
+        return http
+
+    def client(self, scenario, worker):
+        """
+        Request function for one worker, returning (response, as expected?), or None when
+        there is nothing left to do (claim_food ran out of listings)
+        """
+        if scenario == "login":
+            http = requests.Session()
+
+            def request():
+                http.cookies.clear()
+                name = f"restaurant{random.randrange(self.users['restaurant']) + 1}"
+                response = http.post(f"{self.base_url}/login", allow_redirects=False,
+                                     data={"login-email": f"{name}@bench.local", "login-password": PASSWORD})
+                return response, response.status_code == 302 and response.headers["Location"].endswith("/dashboard")
+            return request
+
+        if scenario.startswith("dashboard_"):
+            account_type = scenario[len("dashboard_"):]
+            http = self.logged_in(account_type, account_type, worker)
+
+            def request():
+                response = http.get(f"{self.base_url}/dashboard")
+                return response, response.status_code == 200
+            return request
+
+        if scenario == "add_food":
+            http = self.logged_in("restaurant", "restaurant", worker)
+
+            def request():
+                n = self.next_number()
+                if random.random() < self.unknown_food_share:
+                    food_item = f"{random.choice(UNKNOWN_FOOD_ITEMS)} {n % 200}"
+                else:
+                    food_item = random.choice(FOOD_ITEMS)
+                response = http.post(f"{self.base_url}/add_food", allow_redirects=False,
+                                     data={"food_item": food_item, "quantity": f"{n % 30 + 1} plates"})
+                return response, response.status_code == 302
+            return request
+
+        if scenario == "claim_food":
+            http = self.logged_in("ngo", "ngo", worker)
+
+            def request():
+                with self._claim_lock:
+                    if not self.claim_ids:
+                        return None
+                    listing_id = self.claim_ids.pop()
+                response = http.post(f"{self.base_url}/claim_food/{listing_id}", headers={"Accept": "application/json"})
+                return response, response.status_code == 200
+            return request
+
+        if scenario == "chat":
+            http = requests.Session()
+
+            def request():
+                n = self.next_number()
+                # Half FAQ hits, half unique questions that miss the answer cache and reach the LLM
+                message = random.choice(self.faq_questions) if n % 2 else LLM_QUESTION.format(n)
+                response = http.post(f"{self.base_url}/chat", json={"message": message})
+                return response, response.status_code == 200
+            return request
+
+        raise ValueError(f"unknown scenario {scenario}")
+
+    def prepare_claims(self, count):
+        """Make sure at least count listings are open to claim, and queue their ids in random order"""
+        connection = sqlite3.connect(self.app.DATABASE)
+        now = datetime.now()
+        ids = [row[0] for row in connection.execute(
+            "SELECT id FROM food_listings WHERE status = 'Available' AND fresh_until > ?", (now.isoformat(),))]
+        missing = count - len(ids)
+        if missing > 0:
+            restaurant_ids = [row[0] for row in connection.execute("SELECT id FROM users WHERE account_type = 'restaurant'")]
+            with connection:
+                connection.executemany(
+                    "INSERT INTO food_listings (restaurant_id, food_item, quantity, fresh_until) VALUES (?, ?, '5 plates', ?)",
+                    [(random.choice(restaurant_ids), random.choice(FOOD_ITEMS), (now + timedelta(hours=24)).isoformat())
+                     for _ in range(missing)],
+                )
+            ids = [row[0] for row in connection.execute(
+                "SELECT id FROM food_listings WHERE status = 'Available' AND fresh_until > ?", (now.isoformat(),))]
+        connection.close()
+        random.shuffle(ids)
+        self.claim_ids = ids
+
+    def run(self, scenario, threads, seconds, warmup):
+        """Drive one scenario; returns throughput, latency percentiles and status counts"""
+        requests_per_worker = [self.client(scenario, worker) for worker in range(threads)]
+        latencies = []
+        statuses = Counter()
+        errors = Counter()
+        lock = threading.Lock()
+        start = time.perf_counter()
+        measure_from = start + warmup
+        deadline = measure_from + seconds
+        exhausted = False
+
+        def worker(request):
+            nonlocal exhausted
+            local_latencies = []
+            local_statuses = Counter()
+            local_errors = Counter()
+            while time.perf_counter() < deadline:
+                sent = time.perf_counter()
+                try:
+                    outcome = request()
+                except requests.RequestException as e:
+                    outcome = (None, False)
+                    local_errors[type(e).__name__] += 1
+                finished = time.perf_counter()
+                if outcome is None:
+                    exhausted = True
+                    break
+                response, ok = outcome
+                if sent < measure_from:
+                    continue
+                local_latencies.append(finished - sent)
+                if response is not None:
+                    local_statuses[response.status_code] += 1
+                    if not ok:
+                        local_errors[f"unexpected {response.status_code}"] += 1
+            with lock:
+                latencies.extend(local_latencies)
+                statuses.update(local_statuses)
+                errors.update(local_errors)
+
+        workers = [threading.Thread(target=worker, args=(request,)) for request in requests_per_worker]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = min(time.perf_counter(), deadline) - measure_from
+        result = {
+            "requests": len(latencies),
+            "errors": sum(errors.values()),
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+            "latency_ms": percentiles(latencies) if latencies else None,
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        }
+        if errors:
+            result["error_kinds"] = dict(errors)
+        if exhausted:
+            result["ran_out_of_listings"] = True
+        return result
+
+
+def compare(results, baseline, tolerance):
+    """Per-scenario change against a baseline result file; regressions beyond tolerance are listed"""
+    comparison = {}
+    regressions = []
+    for scenario, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if not before or not before.get("latency_ms") or not result.get("latency_ms") or not before["throughput_rps"]:
+            continue
+        throughput_change = result["throughput_rps"] / before["throughput_rps"] - 1
+        p95_change = result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1 if before["latency_ms"]["p95"] else 0.0
+        comparison[scenario] = {"throughput_change": round(throughput_change, 3), "p95_change": round(p95_change, 3)}
+        if throughput_change < -tolerance or p95_change > tolerance:
+            regressions.append(scenario)
+    return {"baseline_commit": baseline.get("commit"), "tolerance": tolerance,
+            "scenarios": comparison, "regressions": regressions}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="10k", help="listings to seed: 10k, 100k, 1m or a count")
+    parser.add_argument("--database", help="use this seed_data.py database instead of seeding")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--threads", type=int, default=8, help="concurrent clients per scenario")
+    parser.add_argument("--seconds", type=float, default=10, help="measured time per scenario")
+    parser.add_argument("--warmup", type=float, default=1, help="unmeasured time before each scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="fake Groq response time in seconds")
+    parser.add_argument("--llm-latency-jitter", type=float, default=0.2, help="mean of the extra random latency")
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.01)
+    parser.add_argument("--unknown-food-share", type=float, default=0.1,
+                        help="share of add_food items the offline rules can't estimate")
+    parser.add_argument("--dashboard-cache-ttl", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=21)
+    parser.add_argument("--output", help="also write the JSON result here")
+    parser.add_argument("--compare", help="earlier result file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    random.seed(args.seed)
+    output_path = args.output and os.path.abspath(args.output)  # load_app changes directory
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    database = args.database and os.path.abspath(args.database)
+
+    fake, fake_url = start_fake_groq(
+        latency=args.llm_latency, latency_jitter=args.llm_latency_jitter,
+        error_rate=args.llm_error_rate, rate_limit_rate=args.llm_rate_limit_rate,
+    )
+    app = load_app({
+        "GROQ_API_KEY": "bench-key",
+        "GROQ_BASE_URL": fake_url,
+        "DASHBOARD_CACHE_TTL": str(args.dashboard_cache_ttl),
+        "SQLITE_POOL_SIZE": str(args.threads),
+        # The app's own chat rate limits would turn most of the load into instant 429s
+        "CHAT_USER_RATE": "1000", "CHAT_USER_BURST": "1000",
+        "CHAT_GLOBAL_RATE": "100000", "CHAT_GLOBAL_BURST": "100000", "CHAT_DAILY_QUOTA": "100000000",
+        "CHAT_GLOBAL_DAILY_QUOTA": "100000000",
+    })
+
+    start = time.perf_counter()
+    connection = sqlite3.connect(app.DATABASE)
+    if database:
+        source = sqlite3.connect(database)
+        source.backup(connection)
+        source.close()
+        listings = connection.execute("SELECT COUNT(*) FROM food_listings").fetchone()[0]
+        users = dict(connection.execute("SELECT account_type, COUNT(*) FROM users GROUP BY account_type").fetchall())
+    else:
+        listings = parse_size(args.size)
+        seed(connection, listings, random.Random(args.seed))
+        restaurants, ngos, homes = user_counts(listings)
+        users = {"restaurant": restaurants, "ngo": ngos, "old-age-home": homes, "admin": 1}
+    connection.close()
+    setup_seconds = time.perf_counter() - start
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    faq_questions = [question for category in app.chatbot_instance.faq_categories.values() for question in category
+                     if app.chatbot_instance.quick_response(question) is None]
+    load_test = LoadTest(app, f"http://127.0.0.1:{server.server_port}", users, faq_questions, args.unknown_food_share)
+
+    results = {}
+    for scenario in scenarios:
+        if scenario == "claim_food":
+            # Enough for the whole run even at a few thousand claims per second
+            load_test.prepare_claims(int(3000 * (args.seconds + args.warmup)))
+        results[scenario] = load_test.run(scenario, args.threads, args.seconds, args.warmup)
+        print(f"{scenario}: {results[scenario]['throughput_rps']} req/s, "
+              f"p95 {(results[scenario]['latency_ms'] or {}).get('p95')} ms", file=sys.stderr)
+    server.shutdown()
+
+    report = {
+        "commit": git_commit(),
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "listings": listings,
+        "users": users,
+        "setup_seconds": round(setup_seconds, 1),
+        "config": {
+            "threads": args.threads,
+            "seconds": args.seconds,
+            "warmup": args.warmup,
+            "llm_latency": args.llm_latency,
+            "llm_latency_jitter": args.llm_latency_jitter,
+            "llm_error_rate": args.llm_error_rate,
+            "llm_rate_limit_rate": args.llm_rate_limit_rate,
+            "unknown_food_share": args.unknown_food_share,
+            "dashboard_cache_ttl": args.dashboard_cache_ttl,
+        },
+        "scenarios": results,
+        "fake_groq": dict(fake.stats),
+        "shelf_life_tiers": app.shelf_life_tiers.stats()["counts"],
+    }
+    fake.shutdown()
+    if baseline is not None:
+        report["comparison"] = compare(report, baseline, args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if baseline is not None and report["comparison"]["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Realistic Food Pulse data for load tests: restaurants, NGOs, old-age homes and an admin
+(all with password "bench-password", emails <name>@bench.local), and listings spread
+over the last few weeks. Older listings are claimed or expired, recent ones are mostly
+still available. A few restaurants post most of the food, as in production.
+
+    python benchmarks/seed_data.py --size 100k foodpulse-100k.db
+
+Sizes are 10k, 100k, 1m or any listing count. The database is created with the app's
+migrations, so the rollup, location and archive triggers fill their tables as rows go in.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from common import REPO_ROOT, SAMPLE_FOOD_ITEMS
+
+sys.path.insert(0, REPO_ROOT)
+
+from migrations import migrate
+from shelf_life_rules import estimate_shelf_life_by_rules
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+PASSWORD = "bench-password"
+
+FOOD_ITEMS = SAMPLE_FOOD_ITEMS + [
+    "Chicken Biryani", "Veg Fried Rice", "Hakka Noodles", "Paneer Tikka", "Palak Paneer",
+    "Aloo Gobi", "Baingan Bharta", "Chana Masala", "Kadhi Chawal", "Lemon Rice",
+    "Tomato Soup", "Green Salad", "Cut Fruit", "Bananas", "Apples", "Bread Rolls",
+    "Pav Bhaji", "Vada Pav", "Veg Sandwiches", "Cheese Pizza", "Chocolate Cake",
+    "Butter Cookies", "Rasgulla", "Kheer", "Boiled Eggs", "Milk Packets", "Curd",
+    "Chapati", "Puri Bhaji", "Uttapam",
+]
+QUANTITY_UNITS = [("plates", 2, 40), ("kg", 1, 15), ("servings", 5, 80), ("boxes", 1, 20), ("trays", 1, 6)]
+CITY_CENTRE = (22.57, 88.36)  # listings and users scattered within ~25 km of here
+
+
+def parse_size(size):
+    return SIZES.get(size.lower()) or int(size)
+
+
+def user_counts(listings):
+    """(restaurants, ngos, old-age homes) in proportion to the listing count"""
+    restaurants = min(max(listings // 500, 20), 2000)
+    ngos = min(max(listings // 2000, 10), 500)
+    return restaurants, ngos, max(ngos // 4, 2)
+
+
+def _users(prefix, account_type, count, password_hash, rng):
+    for i in range(1, count + 1):
+        yield (
+            f"{prefix}{i}", f"{prefix}{i}@bench.local", password_hash, account_type,
+            f"{rng.randint(1, 300)} Bench Street", f"9{rng.randint(0, 999999999):09d}", 1,
+            CITY_CENTRE[0] + rng.uniform(-0.2, 0.2), CITY_CENTRE[1] + rng.uniform(-0.2, 0.2),
+        )
+
+
+def seed(connection, listings, rng=None, days=30, recent_share=0.1, batch_size=50_000):
+    """
+    Insert the users and `listings` listings through `connection` (schema already
+    migrated). recent_share of the listings are from the last day, so there is always
+    food to claim. Returns a summary of what was created.
+    """
+    from werkzeug.security import generate_password_hash
+
+    rng = rng or random.Random(21)
+    restaurants, ngos, homes = user_counts(listings)
+    password_hash = generate_password_hash(PASSWORD)  # hashing is slow; every bench user shares one
+    with connection:
+        connection.executemany(
+            "INSERT INTO users (name, email, password, account_type, address, phone_number, is_profile_complete, "
+            "latitude, longitude) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [*_users("restaurant", "restaurant", restaurants, password_hash, rng),
+             *_users("ngo", "ngo", ngos, password_hash, rng),
+             *_users("home", "old-age-home", homes, password_hash, rng),
+             *_users("admin", "admin", 1, password_hash, rng)],
+        )
+    restaurant_ids = [row[0] for row in connection.execute("SELECT id FROM users WHERE account_type = 'restaurant'")]
+    claimer_ids = [row[0] for row in connection.execute("SELECT id FROM users WHERE account_type IN ('ngo', 'old-age-home')")]
+    # Zipf-like: the busiest restaurants list far more than the rest
+    restaurant_weights = list(accumulate(1 / (rank + 1) for rank in range(len(restaurant_ids))))
+    shelf_life_hours = {item: (estimate_shelf_life_by_rules(item) or (48,))[0] for item in FOOD_ITEMS}
+
+    # timestamp and claimed_at are UTC like CURRENT_TIMESTAMP; fresh_until is local time like the app writes it
+    now_utc = datetime.now(timezone.utc).replace(tzinfo=None)
+    utc_offset = datetime.now() - now_utc
+    ages = sorted((rng.uniform(0, 24) if rng.random() < recent_share else rng.uniform(0, days * 24)
+                   for _ in range(listings)), reverse=True)
+    statuses = {"Available": 0, "Claimed": 0, "Expired": 0}
+
+    def rows(start, stop):
+        for age_hours in ages[start:stop]:
+            food_item = rng.choice(FOOD_ITEMS)
+            unit, low, high = rng.choice(QUANTITY_UNITS)
+            hours = shelf_life_hours[food_item]
+            listed_at = now_utc - timedelta(hours=age_hours)
+            fresh_until = listed_at + utc_offset + timedelta(hours=hours)
+            status, claimed_by, claimed_at = "Available", None, None
+            still_fresh = hours > age_hours
+            if rng.random() < (0.3 if still_fresh else 0.7):
+                status, claimed_by = "Claimed", rng.choice(claimer_ids)
+                claimed_at = listed_at + timedelta(hours=rng.uniform(0.05, 0.9) * min(hours, age_hours))
+            elif not still_fresh:
+                status = "Expired"
+            statuses[status] += 1
+            yield (
+                rng.choices(restaurant_ids, cum_weights=restaurant_weights)[0], food_item,
+                f"{rng.randint(low, high)} {unit}", status, claimed_by,
+                listed_at.strftime("%Y-%m-%d %H:%M:%S"), fresh_until.isoformat(),
+                claimed_at.strftime("%Y-%m-%d %H:%M:%S") if claimed_at else None,
+            )
+
+    for start in range(0, listings, batch_size):
+        with connection:
+            connection.executemany(
+                "INSERT INTO food_listings (restaurant_id, food_item, quantity, status, claimed_by_id, timestamp, "
+                "fresh_until, claimed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows(start, min(start + batch_size, listings)),
+            )
+    connection.execute("ANALYZE")
+    return {
+        "listings": listings,
+        "statuses": statuses,
+        "users": {"restaurant": restaurants, "ngo": ngos, "old-age-home": homes, "admin": 1},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("database", help="path of the database to create")
+    parser.add_argument("--size", default="10k", help="10k, 100k, 1m or a listing count")
+    parser.add_argument("--days", type=int, default=30, help="listings are spread over this many days")
+    parser.add_argument("--seed", type=int, default=21)
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        sys.exit(f"{args.database} already exists")
+    start = time.perf_counter()
+    migrate(args.database)
+    connection = sqlite3.connect(args.database)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = OFF")  # a lost bench database is simply re-seeded
+    summary = seed(connection, parse_size(args.size), random.Random(args.seed), days=args.days)
+    connection.close()
+    summary["seconds"] = round(time.perf_counter() - start, 1)
+    summary["megabytes"] = round(os.path.getsize(args.database) / 1e6, 1)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
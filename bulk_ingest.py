@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+import re
+
+from shelf_life_cache import normalize_food_name
+
+MAX_BULK_ROWS = 500
+BATCH_PROMPT_SIZE = 50
+
+
+def parse_bulk_listings(content_type, body):
+    """Parse a CSV or JSON upload into a list of {food_item, quantity} dicts"""
+    if "json" in content_type:
+        data = json.loads(body)
+        if isinstance(data, dict):
+            data = data.get("listings", [])
+        if not isinstance(data, list):
+            raise ValueError("JSON body must be a list of listings or {\"listings\": [...]}")
+        return [row if isinstance(row, dict) else {} for row in data]
+
+    reader = csv.DictReader(io.StringIO(body))
+    rows = []
+    try:
+        if not reader.fieldnames or "food_item" not in reader.fieldnames:
+            raise ValueError("CSV must have a header row with food_item and quantity columns")
+        for row in reader:
+            rows.append(row)
+    except csv.Error as e:
+        # Same row numbering as the per-row results (0 is the first data row)
+        raise ValueError(f"CSV row {len(rows)}: {e}")
+    return rows
+
+
+def validate_rows(rows):
+    """Split rows into (valid, results); results holds an error entry for each rejected row"""
+    valid = []
+    results = []
+    for index, row in enumerate(rows):
+        food_item = str(row.get("food_item") or "").strip()
+        quantity = str(row.get("quantity") or "").strip()
+        if not food_item or not quantity:
+            results.append({"row": index, "status": "error", "error": "food_item and quantity are required"})
+            continue
+        valid.append((index, food_item, quantity))
+    return valid, results
+
+
+def parse_batch_response(response_text, food_items):
+    """Pull {food item: hours} out of a batched LLM reply, skipping anything unparseable"""
+    match = re.search(r"\{.*\}", response_text, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return {}
+
+    by_key = {normalize_food_name(str(name)): value for name, value in data.items()}
+    hours = {}
+    for food_item in food_items:
+        try:
+            value = int(by_key[normalize_food_name(food_item)])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if value > 0:
+            hours[food_item] = value
+    return hours
+
+
+def estimate_shelf_lives(food_items, cache, query_batch, estimate_single, local_estimate=None, record_tier=None):
+    """
+    Estimate hours for many food items with as few LLM calls as possible.
+    Duplicates (by normalized name) are estimated once, items local_estimate can
+    answer (hours or None) and cache hits skip the LLM, the rest go out in batched
+    prompts, and anything the batch reply is missing falls back to estimate_single
+    (food item -> (hours, source), e.g. llm or a fallback). record_tier, if set, is
+    called with rules, cache or llm for each estimate made here rather than by
+    estimate_single. Returns {normalized key: (hours, source)}.
+    """
+    record_tier = record_tier or (lambda tier: None)
+    estimates = {}
+    pending = {}
+    for food_item in food_items:
+        key = normalize_food_name(food_item)
+        if key in estimates or key in pending:
+            continue
+        local_hours = local_estimate(food_item) if local_estimate else None
+        if local_hours is not None:
+            estimates[key] = (local_hours, "rules")
+            record_tier("rules")
+            continue
+        cached_hours = cache.get(food_item)
+        if cached_hours is not None:
+            estimates[key] = (cached_hours, "cache")
+            record_tier("cache")
+        else:
+            pending[key] = food_item
+
+    names = list(pending.values())
+    for start in range(0, len(names), BATCH_PROMPT_SIZE):
+        chunk = names[start:start + BATCH_PROMPT_SIZE]
+        try:
+            batch_hours = query_batch(chunk)
+        except Exception as e:
+            print(f"Batched shelf-life estimate failed: {e}. Estimating items individually.")
+            batch_hours = {}
+
+        for food_item in chunk:
+            key = normalize_food_name(food_item)
+            if food_item in batch_hours:
+                cache.set(food_item, batch_hours[food_item])
+                estimates[key] = (batch_hours[food_item], "batch")
+                record_tier("llm")
+            else:
+                estimates[key] = estimate_single(food_item)
+    return estimates
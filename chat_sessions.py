@@ -0,0 +1,120 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Rough fixed cost of a session object, its lock and list, on top of the message text
+SESSION_OVERHEAD_BYTES = 512
+
+
+def _exchange_size(exchange):
+    return sum(sys.getsizeof(value) for value in exchange.values())
+
+
+class ChatSession:
+    """Per-user chatbot state: conversation history and how the last reply was limited"""
+
+    def __init__(self, session_id, on_resize=None):
+        self.session_id = session_id
+        self.rate_limit_key = session_id  # who the rate limits count against; see app.get_chat_state
+        self.conversation_history = []
+        self.retry_after = 0  # seconds until the user may ask again, when the last reply was limited
+        self.busy = False  # the last reply was limited upstream (Groq), not by our own rate limits
+        self.session_start = time.time()
+        self.last_seen = self.session_start
+        self.size_bytes = SESSION_OVERHEAD_BYTES
+
+        self.lock = threading.Lock()
+        self._on_resize = on_resize  # set to None, under lock, when the store drops this session
+
+    def add_exchange(self, exchange, max_history_length):
+        """Append an exchange, keeping only the last max_history_length of them"""
+        with self.lock:
+            self.conversation_history.append(exchange)
+            delta = _exchange_size(exchange)
+            while len(self.conversation_history) > max_history_length:
+                delta -= _exchange_size(self.conversation_history.pop(0))
+            self.size_bytes += delta
+            on_resize = self._on_resize
+        # Read under the lock: the size just added is reported exactly when the store's
+        # _drop (which also takes the lock) counted it in the size it took off
+        if on_resize and delta:
+            on_resize(delta)
+
+    def recent_history(self, count):
+        with self.lock:
+            return list(self.conversation_history[-count:])
+
+
+class ChatSessionStore:
+    """
+    Thread-safe map of session id -> ChatSession with LRU eviction, an idle TTL
+    and a hard cap on the approximate memory held by all sessions.
+    """
+
+    def __init__(self, max_sessions=10000, ttl_seconds=3600, max_bytes=64 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.evictions = 0
+
+    def _resize(self, delta):
+        with self._lock:
+            self.total_bytes += delta
+            self._evict(time.time())
+
+    def _drop(self, session_id):
+        """Remove one session; caller must hold the lock"""
+        state = self._sessions.pop(session_id)
+        with state.lock:
+            state._on_resize = None  # a request still holding it must not skew total_bytes
+            size_bytes = state.size_bytes
+        self.total_bytes -= size_bytes
+        self.evictions += 1
+
+    def _evict(self, now):
+        """Drop idle sessions, then least recently used ones, until within limits; caller must hold the lock"""
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            expired = now - oldest.last_seen > self.ttl_seconds
+            # Never evict the only session left, even if it alone exceeds max_bytes
+            over_limit = len(self._sessions) > 1 and (
+                len(self._sessions) > self.max_sessions or self.total_bytes > self.max_bytes
+            )
+            if not (expired or over_limit):
+                break
+            self._drop(oldest_id)
+
+    def get(self, session_id):
+        """Return the session for session_id, creating it if needed"""
+        now = time.time()
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None and now - state.last_seen > self.ttl_seconds:
+                self._drop(session_id)
+                state = None
+            if state is None:
+                state = ChatSession(session_id, on_resize=self._resize)
+                self._sessions[session_id] = state
+                self.total_bytes += state.size_bytes
+            state.last_seen = now
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+            return state
+
+    def discard(self, session_id):
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "approx_bytes": self.total_bytes,
+                "evictions": self.evictions,
+            }
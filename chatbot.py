@@ -1,15 +1,20 @@
+import hashlib
+import math
 import os
-import requests
-import time
-from difflib import SequenceMatcher
 from dotenv import load_dotenv
 from datetime import datetime
+from faq_index import FAQIndex, load_faq_file
+from knowledge_index import KnowledgeIndex, chunk_text, estimate_tokens
+from answer_cache import AnswerCache
+from chat_sessions import ChatSession
+from rate_limiter import RateLimiter
+from llm_gateway import LLMError, LLMRateLimited, get_default_gateway
 
 # Load environment variables from the .env file
 load_dotenv()
 
 class FoodPulseChatbot:
-    def __init__(self):
+    def __init__(self, rate_limiter=None, gateway=None, answer_cache=None, on_reply=None):
         # -------------------------------
         # Step 1: Secure API Configuration
         # -------------------------------
@@ -17,20 +22,37 @@ class FoodPulseChatbot:
         if not self.GROQ_API_KEY or self.GROQ_API_KEY == "YOUR_GROQ_API_KEY_HERE":
             raise ValueError("ERROR: Groq API Key not found in .env file!")
 
-        self.GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+        # Shared pooled HTTP client (retries, timeouts, circuit breaker)
+        self.gateway = gateway or get_default_gateway()
 
-        # Rate limiting
-        self.last_request_time = 0
-        self.rate_limit_delay = 1.0  # seconds between requests
-        self.request_count = 0
+        # Rate limiting: per-user and global token buckets plus a per-user daily quota
+        self.rate_limit_delay = 1.0  # seconds between requests (sustained)
         self.daily_limit = 100
+        self.rate_limiter = rate_limiter or RateLimiter(
+            user_rate=1.0 / self.rate_limit_delay, daily_quota=self.daily_limit
+        )
 
-        # Conversation memory (last 6 exchanges)
-        self.conversation_history = []
+        # LLM answers shared between users asking the same question without prior history
+        self.answer_cache = answer_cache or AnswerCache()
+
+        # Upstream 429 without a Retry-After: how long to tell the user to wait
+        self.busy_retry_after = int(os.getenv("CHAT_BUSY_RETRY_AFTER", 30))
+
+        # Told where each reply came from: quick, faq, llm, rate_limit, daily_limit or api_error
+        self.on_reply = on_reply
+
+        # Conversation memory (last 6 exchanges per session); the prompt gets as many
+        # of the most recent ones as fit in history_tokens
         self.max_history_length = 6
+        self.history_tokens = int(os.getenv("CHAT_HISTORY_TOKENS", 300))
 
-        # User session
-        self.session_start = datetime.now()
+        # Retrieval: only the top context_chunks knowledge chunks fitting in context_tokens go into the prompt
+        self.context_tokens = int(os.getenv("CHAT_CONTEXT_TOKENS", 400))
+        self.context_chunks = int(os.getenv("CHAT_CONTEXT_CHUNKS", 4))
+
+        # Per-user state is passed in by the caller; this one serves callers that
+        # don't track users (e.g. a single-user console session)
+        self.default_session = ChatSession("default")
 
         # -------------------------------
         # Step 2: Enhanced FAQ Data with Categories
@@ -114,6 +136,13 @@ class FoodPulseChatbot:
             }
         }
 
+        # Extra or replacement FAQs from a JSON data file (same shape as faq_categories)
+        faq_data_file = os.getenv("FAQ_DATA_FILE")
+        if faq_data_file:
+            self.load_faqs(faq_data_file)
+        else:
+            self.faq_index = FAQIndex(self.faq_categories)
+
         # -------------------------------
         # Step 3: Enhanced Document Data
         # -------------------------------
@@ -124,6 +153,7 @@ The process begins with restaurants registering and undergoing admin verificatio
 Food Pulse's unique admin-mediated model ensures trust, accountability, and compliance throughout the process. Future expansions aim to integrate smart logistics partnerships, AI-based food matching, and real-time donation tracking to enhance efficiency. By transforming surplus into sustenance, Food Pulse promotes social responsibility, community welfare, and environmental sustainability.
 
 Ultimately, Food Pulse is not just a platform — it's a movement towards eradicating hunger, reducing food waste, and fostering collaboration across sectors to build a more equitable and sustainable world."""
+        self.build_knowledge_index()
 
         # -------------------------------
         # Step 4: Response Templates
@@ -132,61 +162,51 @@ Ultimately, Food Pulse is not just a platform — it's a movement towards eradic
             "welcome": "🌍 Welcome to Food Pulse Chatbot! I'm here to help you understand how we connect surplus food with people in need.",
             "farewell": "Thank you for using Food Pulse Chatbot! Together we can reduce food waste and fight hunger. 🌱❤️",
             "off_topic": "I specialize in Food Pulse, food donations, and hunger relief topics. How can I help you with these?",
-            "rate_limit": "I'm receiving many requests right now. Please wait a moment and try again.",
+            "rate_limit": "I'm receiving many requests right now. Please try again in {retry_after} seconds.",
+            "busy": "The AI service is busy right now. Please try again in a little while.",
             "api_error": "I'm having trouble accessing information right now. Please try again in a moment.",
             "daily_limit": "I've reached my daily request limit. Please try again tomorrow or contact support.",
             "fallback": "I'm not sure about that specific detail. Could you try rephrasing or ask about our platform features, registration process, or food safety guidelines?"
         }
 
-    def find_best_faq_match(self, query, threshold=0.65):
-        """Enhanced FAQ matching with similarity scoring"""
-        query = query.lower().strip()
-        best_match = None
-        best_score = 0
-        best_category = None
-
-        # Flatten all FAQ questions
-        all_questions = {}
-        for category, questions in self.faq_categories.items():
+    def load_faqs(self, path):
+        """Merge FAQ categories from a JSON file and rebuild the FAQ index"""
+        for category, questions in load_faq_file(path).items():
+            self.faq_categories.setdefault(category, {}).update(questions)
+        self.faq_index = FAQIndex(self.faq_categories)
+        if hasattr(self, "document_text"):
+            self.build_knowledge_index()
+            self.answer_cache.invalidate()
+
+    def build_knowledge_index(self):
+        """Chunk document_text and the FAQ answers into the retrieval index"""
+        chunks = chunk_text(self.document_text)
+        for questions in self.faq_categories.values():
             for question, data in questions.items():
-                all_questions[question] = (data["answer"], category)
-
-        # Check direct matches first
-        for question, (answer, category) in all_questions.items():
-            if query == question.lower():
-                return answer, category, 1.0
-
-        # Check keyword matches
-        for question, (answer, category) in all_questions.items():
-            data = self.faq_categories[category][question]
-            for keyword in data.get("keywords", []):
-                if keyword in query:
-                    return answer, category, 0.9
-
-        # Check similarity matches
-        for question, (answer, category) in all_questions.items():
-            score = SequenceMatcher(None, query, question.lower()).ratio()
-            if score > best_score and score > threshold:
-                best_score = score
-                best_match = answer
-                best_category = category
-
-        return best_match, best_category, best_score
-
-    def enforce_rate_limit(self):
-        """Rate limiting to prevent API abuse"""
-        current_time = time.time()
+                chunks.append(f"Q: {question}\nA: {data['answer']}")
+        self.knowledge_index = KnowledgeIndex(chunks)
 
-        # Check daily limit
-        if self.request_count >= self.daily_limit:
-            raise Exception("daily_limit")
-
-        # Enforce delay between requests
-        if current_time - self.last_request_time < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - (current_time - self.last_request_time))
-
-        self.last_request_time = time.time()
-        self.request_count += 1
+    def find_best_faq_match(self, query, threshold=0.65):
+        """FAQ matching against the prebuilt index: exact question, keyword phrase, then n-gram similarity"""
+        return self.faq_index.match(query.strip(), threshold)
+
+    def enforce_rate_limit(self, state):
+        """Rate limiting to prevent API abuse; returns None or the limit hit, without ever sleeping"""
+        allowed, reason, retry_after = self.rate_limiter.check(state.rate_limit_key)
+        state.retry_after = 0 if allowed else math.ceil(retry_after)
+        return None if allowed else reason
+
+    def upstream_limited(self, error, state):
+        """
+        Template for a Groq 429 (LLMRateLimited): rate_limit with Groq's Retry-After when it
+        sent one, else busy with busy_retry_after. Either way the route answers 503.
+        """
+        state.busy = True
+        if error.retry_after:
+            state.retry_after = math.ceil(error.retry_after)
+            return "rate_limit"
+        state.retry_after = self.busy_retry_after
+        return "busy"
 
     def is_food_pulse_related(self, query):
         """Check if query is related to Food Pulse topics"""
@@ -199,28 +219,36 @@ Ultimately, Food Pulse is not just a platform — it's a movement towards eradic
         query_lower = query.lower()
         return any(keyword in query_lower for keyword in related_keywords)
 
-    def get_conversation_context(self):
-        """Build conversation context from history"""
-        if not self.conversation_history:
+    def get_conversation_context(self, state):
+        """Build conversation context from the most recent exchanges that fit in history_tokens"""
+        lines = []
+        used = 0
+        for exchange in reversed(state.recent_history(self.max_history_length)):
+            text = f"User: {exchange['user']}\nAssistant: {exchange['assistant']}\n"
+            used += estimate_tokens(text)
+            if used > self.history_tokens:
+                break
+            lines.append(text)
+        if not lines:
             return ""
+        return "Previous conversation:\n" + "".join(reversed(lines))
 
-        context = "Previous conversation:\n"
-        for i, exchange in enumerate(self.conversation_history[-3:], 1):  # Last 3 exchanges
-            context += f"User: {exchange['user']}\n"
-            context += f"Assistant: {exchange['assistant']}\n"
-        return context
+    def knowledge_chunk_ids(self, user_input):
+        """Indices of the knowledge chunks relevant to the question; the platform overview if nothing matches"""
+        return self.knowledge_index.retrieve_ids(user_input, self.context_tokens, self.context_chunks) or [0]
 
-    def call_groq_api(self, user_input):
-        """Enhanced API call with better error handling and context"""
-        self.enforce_rate_limit()
-
-        # Build conversation context
-        conversation_context = self.get_conversation_context()
+    def get_knowledge_context(self, user_input, chunk_ids=None):
+        """Knowledge chunks relevant to the question (chunk_ids if already retrieved)"""
+        if chunk_ids is None:
+            chunk_ids = self.knowledge_chunk_ids(user_input)
+        return "\n\n".join(self.knowledge_index.chunks[entry] for entry in chunk_ids)
 
+    def build_messages(self, user_input, conversation_context, chunk_ids=None):
+        """Chat messages for the LLM: retrieved context and history in the system prompt, the question as the user turn"""
         system_prompt = f"""You are a helpful, accurate assistant for Food Pulse platform.
 
 CONTEXT INFORMATION:
-{self.document_text}
+{self.get_knowledge_context(user_input, chunk_ids)}
 
 GUIDELINES:
 - Answer based ONLY on the context provided above
@@ -230,61 +258,123 @@ GUIDELINES:
 - Focus on Food Pulse operations, registration, food safety, and impact
 - If asked about unrelated topics, politely redirect to Food Pulse topics
 
-{conversation_context}
+{conversation_context}"""
+
+        return [
+            {
+                "role": "system",
+                "content": system_prompt.rstrip()
+            },
+            {
+                "role": "user",
+                "content": user_input
+            }
+        ]
 
-Current user question: {user_input}"""
+    def document_version(self):
+        """Short hash of document_text; part of every answer cache key"""
+        return hashlib.sha256(self.document_text.encode("utf-8")).hexdigest()[:16]
+
+    def set_document_text(self, document_text):
+        """Replace the context document and drop answers generated from the old one"""
+        self.document_text = document_text
+        self.build_knowledge_index()
+        return self.answer_cache.invalidate()
+
+    def answer_cache_key(self, user_input, conversation_context, chunk_ids):
+        """
+        Answer cache key: the question, the chunks retrieved for it and the document
+        version. None when the prompt carries the user's history, since the answer may
+        then depend on it and must not be served to anyone else.
+        """
+        if conversation_context:
+            return None
+        return self.answer_cache.make_key(user_input, chunk_ids, self.document_version())
+
+    def call_groq_api(self, user_input, state):
+        """Cached, coalesced API call; identical first questions share one upstream call"""
+        # Build conversation context
+        conversation_context = self.get_conversation_context(state)
+        chunk_ids = self.knowledge_chunk_ids(user_input)
+        ask = lambda: self._ask_groq(user_input, conversation_context, chunk_ids, state)
+
+        key = self.answer_cache_key(user_input, conversation_context, chunk_ids)
+        if key is None:
+            return ask()[0]
+        return self.answer_cache.get_or_compute(key, ask)
 
-        payload = {
+    def build_payload(self, user_input, conversation_context, chunk_ids=None):
+        return {
             "model": "llama-3.1-8b-instant",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": user_input
-                }
-            ],
+            "messages": self.build_messages(user_input, conversation_context, chunk_ids),
             "max_tokens": 500,
             "temperature": 0.3,
             "top_p": 0.9
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
+    def _ask_groq(self, user_input, conversation_context, chunk_ids, state):
+        """Enhanced API call with better error handling; returns (response, cacheable)"""
+        limit_hit = self.enforce_rate_limit(state)
+        if limit_hit:
+            return limit_hit, False
 
         try:
-            response = requests.post(
-                self.GROQ_API_URL,
-                json=payload,
-                headers=headers,
-                timeout=15
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                return data["choices"][0]["message"]["content"].strip()
-            elif response.status_code == 429:
-                return "rate_limit"
-            else:
-                # For more detailed error logging on the server
-                print(f"Groq API Error: Status {response.status_code}, Body: {response.text}")
-                return "api_error"
-
-        except requests.exceptions.Timeout:
-            return "api_error"
-        except requests.exceptions.RequestException:
-            return "api_error"
-        except Exception:
-            return "api_error"
-
-    def generate_response(self, user_input):
-        """Main response generation with enhanced logic"""
-        user_input = user_input.strip()
-
+            return self.gateway.chat_completion(self.build_payload(user_input, conversation_context, chunk_ids)), True
+        except LLMRateLimited as e:
+            return self.upstream_limited(e, state), False
+        except LLMError as e:
+            # For more detailed error logging on the server
+            print(f"Groq API Error: {e}")
+            return "api_error", False
+
+    def stream_groq_api(self, user_input, state):
+        """
+        Streaming call_groq_api: yields the reply as the LLM produces it. Cached answers,
+        answers shared with an identical in-flight question, limits and errors come in one piece.
+        """
+        conversation_context = self.get_conversation_context(state)
+        chunk_ids = self.knowledge_chunk_ids(user_input)
+        key = self.answer_cache_key(user_input, conversation_context, chunk_ids)
+        lease = None
+        if key is not None:
+            answer, lease = self.answer_cache.acquire(key)
+            if lease is None:
+                self.count_reply("llm")
+                yield answer
+                return
+
+        pieces = []
+        completed = False
+        try:
+            limit_hit = self.enforce_rate_limit(state)
+            if limit_hit:
+                self.count_reply(limit_hit)
+                yield self.template_response(limit_hit, state)
+                return
+            try:
+                for piece in self.gateway.stream_chat_completion(self.build_payload(user_input, conversation_context, chunk_ids)):
+                    pieces.append(piece)
+                    yield piece
+                completed = True
+                self.count_reply("llm")
+            except LLMRateLimited as e:
+                self.count_reply("rate_limit")
+                yield self.template_response(self.upstream_limited(e, state), state)
+            except LLMError as e:
+                self.count_reply("api_error")
+                print(f"Groq API Error: {e}")
+                # Part of the answer may already be on screen; the apology follows it
+                yield ("\n\n" if pieces else "") + self.response_templates["api_error"]
+        finally:
+            # Also runs when the client disconnects mid-stream (GeneratorExit); that answer isn't kept
+            if lease is not None:
+                lease.release("".join(pieces).strip(), completed)
+
+    def template_response(self, name, state):
+        return self.response_templates[name].format(retry_after=state.retry_after)
+
+    def quick_response(self, user_input):
+        """Replies to empty, greeting, farewell and off-topic messages (not kept in history), else None"""
         if not user_input:
             return "Please ask me a question about Food Pulse! 🌍"
 
@@ -301,33 +391,85 @@ Current user question: {user_input}"""
         # Check if related to Food Pulse
         if not self.is_food_pulse_related(user_input):
             return self.response_templates['off_topic']
+        return None
 
-        # Try FAQ matching first
+    def faq_response(self, user_input):
+        """(answer, category) for a confident FAQ match, else (None, None)"""
         faq_answer, category, confidence = self.find_best_faq_match(user_input)
+        if not faq_answer or confidence <= 0.7:
+            return None, None
+        if confidence < 0.9:
+            faq_answer += "\n\nIf you need more specific details, feel free to ask!"
+        return faq_answer, category
+
+    def count_reply(self, source):
+        if self.on_reply is not None:
+            self.on_reply(source)
+
+    def record_exchange(self, state, user_input, response, category):
+        """Store in conversation history (trimmed to max_history_length)"""
+        state.add_exchange({
+            "user": user_input,
+            "assistant": response,
+            "timestamp": datetime.now().isoformat(),
+            "category": category if category else "api"
+        }, self.max_history_length)
 
-        if faq_answer and confidence > 0.7:
-            response = faq_answer
-            if confidence < 0.9:
-                response += "\n\nIf you need more specific details, feel free to ask!"
-        else:
+    def generate_response(self, user_input, state=None):
+        """Main response generation with enhanced logic; state is the caller's ChatSession"""
+        state = state or self.default_session
+        state.retry_after = 0
+        state.busy = False
+        user_input = user_input.strip()
+
+        quick = self.quick_response(user_input)
+        if quick:
+            self.count_reply("quick")
+            return quick
+
+        # Try FAQ matching first
+        response, category = self.faq_response(user_input)
+        if response is None:
             # Fall back to Groq API
-            api_response = self.call_groq_api(user_input)
+            api_response = self.call_groq_api(user_input, state)
 
-            if api_response in ["rate_limit", "api_error", "daily_limit"]:
-                response = self.response_templates[api_response]
+            if api_response in ["rate_limit", "busy", "api_error", "daily_limit"]:
+                self.count_reply("rate_limit" if api_response == "busy" else api_response)
+                response = self.template_response(api_response, state)
             else:
+                self.count_reply("llm")
                 response = api_response
+        else:
+            self.count_reply("faq")
 
-        # Store in conversation history
-        self.conversation_history.append({
-            "user": user_input,
-            "assistant": response,
-            "timestamp": datetime.now().isoformat(),
-            "category": category if category else "api"
-        })
+        self.record_exchange(state, user_input, response, category)
+        return response
 
-        # Keep history manageable
-        if len(self.conversation_history) > self.max_history_length:
-            self.conversation_history.pop(0)
+    def stream_response(self, user_input, state=None):
+        """
+        generate_response as a generator: FAQ and canned replies come at once, LLM replies
+        piece by piece. The full reply is recorded in history once the stream finishes.
+        """
+        state = state or self.default_session
+        state.retry_after = 0
+        state.busy = False
+        user_input = user_input.strip()
 
-        return response
+        quick = self.quick_response(user_input)
+        if quick:
+            self.count_reply("quick")
+            yield quick
+            return
+
+        response, category = self.faq_response(user_input)
+        if response is not None:
+            self.count_reply("faq")
+            self.record_exchange(state, user_input, response, category)
+            yield response
+            return
+
+        pieces = []
+        for piece in self.stream_groq_api(user_input, state):
+            pieces.append(piece)
+            yield piece
+        self.record_exchange(state, user_input, "".join(pieces).strip(), None)
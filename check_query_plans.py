@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+from migrations import migrate
+from queries import DASHBOARD_QUERIES
+
+
+def is_table_scan(detail):
+    """A SCAN plan line with no index; a virtual table (R*Tree) scan counts as indexed when it has constraints"""
+    if not detail.startswith('SCAN') or 'USING' in detail or 'SUBQUERY' in detail:
+        return False
+    if 'VIRTUAL TABLE INDEX' in detail:
+        return not detail.partition(':')[2].strip()
+    return True
+
+
+def find_table_scans(connection, queries=DASHBOARD_QUERIES):
+    """Return {query name: [plan lines]} for every query whose plan contains a full table scan"""
+    scans = {}
+    for name, sql, params in queries:
+        plan = [row[3] for row in connection.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+        table_scans = [detail for detail in plan if is_table_scan(detail)]
+        if table_scans:
+            scans[name] = plan
+    return scans
+
+
+def main():
+    """Regression check: fail if any dashboard query falls back to a full table scan"""
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, 'plans.db')
+        migrate(db_path)
+        connection = sqlite3.connect(db_path)
+        try:
+            scans = find_table_scans(connection)
+        finally:
+            connection.close()
+
+    for name, plan in scans.items():
+        print(f"FAIL {name}: full table scan")
+        for detail in plan:
+            print(f"    {detail}")
+    if scans:
+        sys.exit(1)
+    print(f"OK: {len(DASHBOARD_QUERIES)} dashboard queries use indexes.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+CLAIMED = "claimed"
+ALREADY_CLAIMED = "already_claimed"
+EXPIRED = "expired"
+NOT_FOUND = "not_found"
+
+CLAIM_MESSAGES = {
+    CLAIMED: "Listing claimed. Please coordinate pickup with the restaurant.",
+    ALREADY_CLAIMED: "Sorry, this listing has already been claimed by another organization.",
+    EXPIRED: "This listing has expired and can no longer be claimed.",
+    NOT_FOUND: "That listing does not exist.",
+}
+
+# DATETIME() normalizes both 'YYYY-MM-DD HH:MM:SS' and ISO 'T'-separated values before comparing
+CLAIMABLE_SQL = "status = 'Available' AND (fresh_until IS NULL OR DATETIME(fresh_until) > DATETIME(?))"
+
+
+def _unclaimable_reason(row):
+    if row is None:
+        return NOT_FOUND
+    if row['status'] == 'Claimed':
+        return ALREADY_CLAIMED
+    return EXPIRED
+
+
+def claim_listing(db, listing_id, claimer_id, now=None):
+    """
+    Compare-and-set claim: only an Available, unexpired listing flips to Claimed, so
+    exactly one of several concurrent claimers wins. Returns one of the result constants.
+    """
+    now = now or datetime.now()
+
+    # Cheap read first so losers of an already-decided race never take the write lock
+    row = db.execute(
+        f"SELECT status, fresh_until, {CLAIMABLE_SQL} AS claimable FROM food_listings WHERE id = ?",
+        (now, listing_id)
+    ).fetchone()
+    if row is None or not row['claimable']:
+        return _unclaimable_reason(row)
+
+    cursor = db.execute(
+        f"UPDATE food_listings SET status = 'Claimed', claimed_by_id = ?, claimed_at = CURRENT_TIMESTAMP "
+        f"WHERE id = ? AND {CLAIMABLE_SQL}",
+        (claimer_id, listing_id, now)
+    )
+    db.commit()
+    if cursor.rowcount == 1:
+        return CLAIMED
+
+    # Someone else won between the read and the update
+    row = db.execute("SELECT status FROM food_listings WHERE id = ?", (listing_id,)).fetchone()
+    return _unclaimable_reason(row)
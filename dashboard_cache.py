@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+
+DATA_VERSION_SQL = "SELECT version FROM data_version WHERE id = 1"
+
+
+def data_version(db):
+    """
+    Version of everything dashboards show, from the row that triggers bump on every
+    listing and user write (migrations/0009_data_version.sql). It lives in the database,
+    so every worker process builds the same cache keys and ETags from it.
+    """
+    return db.execute(DATA_VERSION_SQL).fetchone()[0]
+
+
+class VersionedCache:
+    """
+    LRU cache whose entries are only valid for the version they were stored under, so
+    bumping the version invalidates everything without walking the cache.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (version, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != version:
+                del self._entries[key]
+                self.stale += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, version, compute):
+        value = self.get(key, version)
+        if value is None:
+            value = compute()
+            self.put(key, version, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
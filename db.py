@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+def pragmas_from_env():
+    """SQLite connection pragmas, overridable through environment variables"""
+    return {
+        "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -16000)),  # negative = KiB
+        "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 128 * 1024 * 1024)),
+    }
+
+
+class ConnectionPool:
+    """
+    Reuses tuned SQLite connections across requests instead of opening one per request.
+    Idle connections are kept up to max_idle; a forked worker process never inherits
+    its parent's connections. factory is the sqlite3.Connection subclass to open
+    (e.g. metrics.timed_connection_factory).
+    """
+
+    def __init__(self, db_path, max_idle=8, pragmas=None, factory=sqlite3.Connection):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.pragmas = pragmas if pragmas is not None else pragmas_from_env()
+        self.factory = factory
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+        self.created = 0
+        self.reused = 0
+        self.closed = 0
+        self.in_use = 0
+
+    def _connect(self):
+        busy_timeout_ms = self.pragmas.get("busy_timeout", 5000)
+        connection = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=busy_timeout_ms / 1000,
+            # Only ever used by one thread at a time; the pool hands it between threads
+            check_same_thread=False,
+            factory=self.factory,
+        )
+        connection.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def _check_pid(self):
+        """Drop connections inherited across a fork; caller must hold the lock"""
+        if os.getpid() != self._pid:
+            self._idle = []
+            self._pid = os.getpid()
+            self.in_use = 0
+
+    def acquire(self):
+        with self._lock:
+            self._check_pid()
+            self.in_use += 1
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.created += 1
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self.in_use -= 1
+                self.created -= 1
+            raise
+
+    def release(self, connection):
+        # Never hand the next user a half-finished transaction
+        if connection.in_transaction:
+            connection.rollback()
+        with self._lock:
+            self._check_pid()
+            self.in_use = max(0, self.in_use - 1)
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+            self.closed += 1
+        connection.close()
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.closed += len(idle)
+        for connection in idle:
+            connection.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "closed": self.closed,
+                "idle": len(self._idle),
+                "in_use": self.in_use,
+                "journal_mode": self.pragmas.get("journal_mode"),
+            }
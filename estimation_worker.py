@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+from datetime import timedelta, timezone
+
+from llm_gateway import LLMUnavailable
+
+
+class EstimationWorkerPool:
+    """Background pool that resolves fresh_until for listings inserted in the pending state"""
+
+    def __init__(self, db_pool, estimate_fn, max_workers=4, max_queue_size=256,
+                 max_retries=3, retry_backoff=1.0, fallback_hours=48, fallback_fn=None, on_resolved=None):
+        self.db_pool = db_pool
+        self.estimate_fn = estimate_fn
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.fallback_hours = fallback_hours
+        self.fallback_fn = fallback_fn  # food_item -> hours; overrides the flat fallback_hours
+        self.on_resolved = on_resolved  # (listing_id, fresh_until) after an estimate is stored
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._workers = []
+
+        self.in_flight = 0
+        self.completed = 0
+        self.retries = 0
+        self.fallbacks = 0
+        self.rejected = 0
+
+    def start(self):
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._run, name=f"estimation-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, listing_id, food_item, listed_at):
+        """Queue a listing for estimation; returns False when the queue is full"""
+        try:
+            self._queue.put_nowait((listing_id, food_item, listed_at))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+
+    def requeue_pending(self):
+        """Re-submit listings left pending by a previous process"""
+        with self.db_pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT id, food_item, timestamp FROM food_listings WHERE fresh_until IS NULL AND status = 'Available'"
+            ).fetchall()
+
+        submitted = 0
+        for listing_id, food_item, timestamp in rows:
+            # timestamp is stored by CURRENT_TIMESTAMP in UTC; fresh_until is local time
+            listed_at = timestamp.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+            if self.submit(listing_id, food_item, listed_at):
+                submitted += 1
+        return submitted
+
+    def _estimate_with_retries(self, food_item):
+        """
+        estimate_fn, or the fallback when it fails. The LLM gateway already retries
+        transient errors, so a failed call is not repeated here. Only when the circuit
+        breaker is open (nothing was sent) does the worker wait, up to max_retries
+        times, for it to let a call through.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.estimate_fn(food_item)
+            except LLMUnavailable as e:
+                error = e
+                if attempt == self.max_retries:
+                    break
+                with self._lock:
+                    self.retries += 1
+                time.sleep(max(self.retry_backoff * (2 ** attempt), e.retry_after))
+            except Exception as e:
+                error = e
+                break
+        hours = self.fallback_fn(food_item) if self.fallback_fn else self.fallback_hours
+        print(f"Shelf-life estimate for '{food_item}' failed after {attempt + 1} attempts: {error}. "
+              f"Applying {hours} hour fallback.")
+        with self._lock:
+            self.fallbacks += 1
+        return hours
+
+    def _run(self):
+        while True:
+            listing_id, food_item, listed_at = self._queue.get()
+            with self._lock:
+                self.in_flight += 1
+            try:
+                hours = self._estimate_with_retries(food_item)
+                fresh_until = listed_at + timedelta(hours=hours)
+                with self.db_pool.connection() as connection:
+                    cursor = connection.execute(
+                        'UPDATE food_listings SET fresh_until = ? WHERE id = ? AND fresh_until IS NULL',
+                        (fresh_until, listing_id)
+                    )
+                    connection.commit()
+                with self._lock:
+                    self.completed += 1
+                if cursor.rowcount == 1 and self.on_resolved is not None:
+                    self.on_resolved(listing_id, fresh_until)
+            except Exception as e:
+                print(f"Failed to store shelf-life estimate for listing {listing_id}: {e}")
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                self._queue.task_done()
+
+    def stats(self):
+        """Queue depth and outcome counters"""
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "retries": self.retries,
+                "fallbacks": self.fallbacks,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,167 @@
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# fresh_until is local time, stored by the datetime adapter as 'YYYY-MM-DDTHH:MM:SS'. The
+# plain comparison lets the (status, fresh_until) index find candidates; a 'YYYY-MM-DD HH:MM:SS'
+# value from today also passes it, so julianday() makes the exact call.
+EXPIRE_CANDIDATES_SQL = """
+    SELECT id FROM food_listings
+    WHERE status = 'Available' AND fresh_until < ? AND julianday(fresh_until) <= julianday(?)
+    LIMIT ?
+"""
+
+# timestamp is UTC (CURRENT_TIMESTAMP). INDEXED BY: the planner otherwise picks the status index
+# and sorts every Claimed / Expired row on each batch, which makes a large backlog quadratic.
+ARCHIVE_CANDIDATES_SQL = """
+    SELECT id FROM food_listings INDEXED BY idx_food_listings_timestamp
+    WHERE timestamp < ? AND status IN ('Claimed', 'Expired')
+    ORDER BY timestamp
+    LIMIT ?
+"""
+
+LISTING_COLUMNS = "id, restaurant_id, food_item, quantity, status, claimed_by_id, timestamp, fresh_until, claimed_at"
+
+MAX_BATCH_SIZE = 900  # stays under SQLite's default limit of 999 bound parameters
+
+
+class ExpirySweeper:
+    """
+    Periodically marks listings past fresh_until as Expired, and moves Claimed / Expired
+    listings older than archive_after_days into food_listings_archive. Works in batches,
+    one short transaction each, so claims and new listings are never held up for long.
+    """
+
+    def __init__(self, db_pool, batch_size=500, archive_after_days=30, on_expired=None, on_archived=None):
+        self.db_pool = db_pool
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.archive_after_days = archive_after_days
+        self.on_expired = on_expired  # list of listing ids, after each expiry batch commits
+        self.on_archived = on_archived  # number of listings moved, after a sweep that archived any
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.sweeps = 0
+        self.expired = 0
+        self.archived = 0
+        self.failures = 0
+        self.last_sweep = None
+
+    def start(self, interval_seconds):
+        self._thread = threading.Thread(target=self._run, args=(interval_seconds,), name="expiry-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, interval_seconds):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                print(f"Expiry sweep failed: {e}")
+            self._stop.wait(interval_seconds)
+
+    def expire_batch(self, connection, now):
+        """
+        Mark up to batch_size overdue listings Expired; returns (ids of the listings it
+        changed, number of candidates looked at). A candidate claimed in the meantime is
+        left alone and not among the ids.
+        """
+        candidates = [row[0] for row in connection.execute(
+            EXPIRE_CANDIDATES_SQL, (now.isoformat(), now.isoformat(sep=' '), self.batch_size)
+        )]
+        if not candidates:
+            return [], 0
+        placeholders = ",".join("?" * len(candidates))  # re-checks status: a claim may have won meanwhile
+        ids = [row[0] for row in connection.execute(
+            f"UPDATE food_listings SET status = 'Expired' WHERE id IN ({placeholders}) AND +status = 'Available' "
+            "RETURNING id",
+            candidates
+        ).fetchall()]
+        connection.commit()
+        return ids, len(candidates)
+
+    def archive_batch(self, connection, cutoff):
+        """Move up to batch_size old Claimed / Expired listings to the archive; returns how many"""
+        ids = [row[0] for row in connection.execute(
+            ARCHIVE_CANDIDATES_SQL, (cutoff.strftime('%Y-%m-%d %H:%M:%S'), self.batch_size)
+        )]
+        if not ids:
+            return 0
+        placeholders = ",".join("?" * len(ids))
+        # Unary + keeps the planner on rowid lookups instead of scanning the status index
+        where = f"id IN ({placeholders}) AND +status IN ('Claimed', 'Expired')"
+        connection.execute(
+            f"INSERT INTO food_listings_archive ({LISTING_COLUMNS}) SELECT {LISTING_COLUMNS} FROM food_listings WHERE {where}",
+            ids
+        )
+        moved = connection.execute(f"DELETE FROM food_listings WHERE {where}", ids).rowcount
+        connection.commit()
+        return moved
+
+    def sweep(self, now=None):
+        """One full pass; returns {"expired", "archived", "seconds"}"""
+        start = time.perf_counter()
+        now = now or datetime.now()
+        cutoff = now.astimezone(timezone.utc) - timedelta(days=self.archive_after_days)
+        expired = archived = 0
+        with self.db_pool.connection() as connection:
+            while True:
+                ids, candidates = self.expire_batch(connection, now)
+                expired += len(ids)
+                if ids and self.on_expired is not None:
+                    self.on_expired(ids)
+                if candidates < self.batch_size:
+                    break
+            while True:
+                moved = self.archive_batch(connection, cutoff)
+                archived += moved
+                if moved < self.batch_size:
+                    break
+        if archived and self.on_archived is not None:
+            self.on_archived(archived)
+
+        report = {"expired": expired, "archived": archived, "seconds": round(time.perf_counter() - start, 3),
+                  "at": now.isoformat(timespec='seconds')}
+        with self._lock:
+            self.sweeps += 1
+            self.expired += expired
+            self.archived += archived
+            self.last_sweep = report
+        if expired or archived:
+            print(f"Expiry sweep: {expired} listings expired, {archived} archived in {report['seconds']}s")
+        return report
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sweeps": self.sweeps,
+                "expired": self.expired,
+                "archived": self.archived,
+                "failures": self.failures,
+                "last_sweep": self.last_sweep,
+            }
+
+
+def main():
+    """One sweep from cron or by hand: python expiry_sweeper.py [database.db] [archive_after_days]"""
+    from db import ConnectionPool
+
+    database = sys.argv[1] if len(sys.argv) > 1 else 'database.db'
+    archive_after_days = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    pool = ConnectionPool(database, max_idle=1)
+    try:
+        report = ExpirySweeper(pool, archive_after_days=archive_after_days).sweep()
+    finally:
+        pool.close_all()
+    print(f"Expired {report['expired']} listings and archived {report['archived']} in {report['seconds']}s.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import json
+import math
+import re
+from collections import defaultdict
+
+import numpy as np
+
+NGRAM_SIZE = 3
+
+
+def normalize_text(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^a-z0-9\s]", " ", text.lower()).split())
+
+
+def char_ngrams(normalized_text, n=NGRAM_SIZE):
+    padded = f" {normalized_text} "
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+
+def load_faq_file(path):
+    """Read FAQ categories from JSON: {category: {question: {"answer": ..., "keywords": [...]}}}"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FAQIndex:
+    """
+    FAQ lookup structures built once per FAQ set:
+    exact-question map, inverted keyword-phrase index and a character n-gram TF-IDF
+    matrix stored column-wise (per n-gram postings) so that scoring a query costs
+    one numpy bincount over the postings of its n-grams.
+    """
+
+    def __init__(self, faq_categories):
+        self.questions = []
+        self.answers = []
+        self.categories = []
+
+        self.exact = {}
+        # first keyword token -> [(keyword tokens, entry index)]
+        self.keyword_index = defaultdict(list)
+
+        for category, questions in faq_categories.items():
+            for question, data in questions.items():
+                entry = len(self.questions)
+                self.questions.append(question)
+                self.answers.append(data["answer"])
+                self.categories.append(category)
+                self.exact.setdefault(normalize_text(question), entry)
+                for keyword in data.get("keywords", []):
+                    tokens = tuple(normalize_text(keyword).split())
+                    if tokens:
+                        self.keyword_index[tokens[0]].append((tokens, entry))
+
+        self._build_ngram_matrix()
+
+    def _build_ngram_matrix(self):
+        documents = [char_ngrams(normalize_text(question)) for question in self.questions]
+        self.vocabulary = {}
+        document_frequency = defaultdict(int)
+        for grams in documents:
+            for gram in set(grams):
+                document_frequency[gram] += 1
+
+        total = len(documents)
+        # Smoothed idf, as in scikit-learn's TfidfVectorizer
+        self.idf = {gram: math.log((1 + total) / (1 + df)) + 1 for gram, df in document_frequency.items()}
+
+        postings = defaultdict(list)
+        for entry, grams in enumerate(documents):
+            counts = defaultdict(int)
+            for gram in grams:
+                counts[gram] += 1
+            weights = {gram: count * self.idf[gram] for gram, count in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for gram, weight in weights.items():
+                postings[gram].append((entry, weight / norm))
+
+        indptr = [0]
+        indices = []
+        data = []
+        for gram, entries in postings.items():
+            self.vocabulary[gram] = len(indptr) - 1
+            indices.extend(entry for entry, _ in entries)
+            data.extend(weight for _, weight in entries)
+            indptr.append(len(indices))
+
+        self._indptr = np.asarray(indptr, dtype=np.int64)
+        self._indices = np.asarray(indices, dtype=np.int64)
+        self._data = np.asarray(data, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def _result(self, entry, score):
+        return self.answers[entry], self.categories[entry], score
+
+    def exact_match(self, normalized_query):
+        entry = self.exact.get(normalized_query)
+        return None if entry is None else self._result(entry, 1.0)
+
+    def keyword_match(self, normalized_query):
+        """Earliest FAQ entry with a keyword phrase appearing as whole words in the query"""
+        tokens = normalized_query.split()
+        best = None
+        for position, token in enumerate(tokens):
+            for keyword_tokens, entry in self.keyword_index.get(token, ()):
+                if best is not None and entry >= best:
+                    continue
+                if tuple(tokens[position:position + len(keyword_tokens)]) == keyword_tokens:
+                    best = entry
+        return None if best is None else self._result(best, 0.9)
+
+    def similarity_scores(self, normalized_query):
+        """Cosine similarity of the query against every question"""
+        counts = defaultdict(int)
+        for gram in char_ngrams(normalized_query):
+            if gram in self.vocabulary:
+                counts[gram] += 1
+        if not counts:
+            return np.zeros(len(self), dtype=np.float32)
+
+        gram_ids = [self.vocabulary[gram] for gram in counts]
+        query_weights = np.array([counts[gram] * self.idf[gram] for gram in counts], dtype=np.float32)
+        query_weights /= np.linalg.norm(query_weights)
+
+        starts = self._indptr[gram_ids]
+        lengths = self._indptr[np.asarray(gram_ids) + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        weights = self._data[positions] * np.repeat(query_weights, lengths)
+        return np.bincount(self._indices[positions], weights=weights, minlength=len(self))
+
+    def similarity_match(self, normalized_query, threshold):
+        scores = self.similarity_scores(normalized_query)
+        if not len(scores):
+            return None
+        entry = int(np.argmax(scores))
+        score = float(scores[entry])
+        return self._result(entry, score) if score > threshold else None
+
+    def match(self, query, threshold):
+        """(answer, category, confidence) for the best FAQ entry, or (None, None, 0)"""
+        normalized_query = normalize_text(query)
+        return (
+            self.exact_match(normalized_query)
+            or self.keyword_match(normalized_query)
+            or self.similarity_match(normalized_query, threshold)
+            or (None, None, 0)
+        )
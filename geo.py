@@ -0,0 +1,56 @@
+import math
+import os
+
+KM_PER_DEGREE = 111.32  # one degree of latitude; a degree of longitude is this times cos(latitude)
+
+DEFAULT_RADIUS_KM = float(os.environ.get("NEARBY_RADIUS_KM", 10))
+MAX_RADIUS_KM = 100
+# Collection feasibility: a listing is shown only if an NGO travelling at COLLECTION_SPEED_KMH
+# can reach it and still have COLLECTION_HANDLING_MINUTES before fresh_until
+COLLECTION_SPEED_KMH = float(os.environ.get("COLLECTION_SPEED_KMH", 20))
+COLLECTION_HANDLING_MINUTES = float(os.environ.get("COLLECTION_HANDLING_MINUTES", 30))
+
+
+def parse_coordinates(latitude, longitude):
+    """(lat, lon) as floats; None if both are blank; ValueError if invalid"""
+    if latitude in (None, "") and longitude in (None, ""):
+        return None
+    lat, lon = float(latitude), float(longitude)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):  # also rejects NaN
+        raise ValueError("Latitude must be within ±90 and longitude within ±180")
+    return lat, lon
+
+
+def parse_radius(value, default=DEFAULT_RADIUS_KM):
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(radius, 0.1), MAX_RADIUS_KM) if radius == radius else default
+
+
+def nearby_params(lat, lon, radius_km, now, limit,
+                  speed_kmh=COLLECTION_SPEED_KMH, handling_minutes=COLLECTION_HANDLING_MINUTES):
+    """Named parameters for queries.NEARBY_LISTINGS_SQL"""
+    lat_delta = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(lat)), 0.01)  # don't blow up at the poles
+    lon_delta = min(radius_km / (KM_PER_DEGREE * cos_lat), 180)
+    return {
+        "lat": lat,
+        "lon": lon,
+        "lon_scale": cos_lat * cos_lat,
+        "min_lat": lat - lat_delta,
+        "max_lat": lat + lat_delta,
+        "min_lon": lon - lon_delta,
+        "max_lon": lon + lon_delta,
+        "radius_km": radius_km,
+        "now": now,
+        "speed_kmh": speed_kmh,
+        "handling_hours": handling_minutes / 60,
+        "limit": limit,
+    }
+
+
+def distance_from_row(row):
+    """Kilometres to a NEARBY_LISTINGS_SQL row (it only carries the squared distance)"""
+    return round(math.sqrt(row["distance_sq_km"]), 2)
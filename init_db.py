@@ -1,12 +1,11 @@
-import sqlite3
+import sys
 
-# Establish a connection to the database file
-connection = sqlite3.connect('database.db')
+from migrations import current_version, migrate
 
-# Open and read the schema file
-with open('schema.sql') as f:
-    connection.executescript(f.read())
+# Create or upgrade the database by applying any pending migrations in migrations/
+database = sys.argv[1] if len(sys.argv) > 1 else 'database.db'
 
-print("Database initialized successfully.")
-
-connection.close()
\ No newline at end of file
+applied = migrate(database)
+if applied:
+    print(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+print(f"Database initialized successfully (schema version {current_version(database)}).")
@@ -0,0 +1,101 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from faq_index import normalize_text
+
+# Rough English average for LLaMA-style tokenizers; good enough for budgeting prompts
+CHARS_PER_TOKEN = 4
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it me my of on or our so that the
+their them they this to we what when where which who why will with you your
+""".split())
+
+
+def estimate_tokens(text):
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN)) if text else 0
+
+
+def tokenize(text):
+    return [word for word in normalize_text(text).split() if word not in STOPWORDS]
+
+
+def chunk_text(text, max_tokens=80):
+    """Split text into chunks of whole sentences, never crossing a paragraph, of about max_tokens each"""
+    chunks = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        current = ""
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph.strip()):
+            if not sentence:
+                continue
+            candidate = f"{current} {sentence}".strip()
+            if current and estimate_tokens(candidate) > max_tokens:
+                chunks.append(current)
+                candidate = sentence
+            current = candidate
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class KnowledgeIndex:
+    """
+    BM25 index over knowledge chunks (document paragraphs and FAQ answers), used to put
+    only the passages relevant to a question into the chatbot's system prompt.
+    """
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = list(chunks)
+        self.token_counts = [estimate_tokens(chunk) for chunk in self.chunks]
+
+        documents = [tokenize(chunk) for chunk in self.chunks]
+        lengths = np.array([len(words) for words in documents], dtype=np.float32)
+        average_length = float(lengths.mean()) if len(lengths) and lengths.mean() else 1.0
+        length_norm = k1 * (1 - b + b * lengths / average_length)
+
+        # term -> (chunk indices, BM25 term weights), precomputed so a query is a few numpy adds
+        postings = defaultdict(list)
+        for entry, words in enumerate(documents):
+            for term, count in Counter(words).items():
+                postings[term].append((entry, count))
+
+        total = len(documents)
+        self.postings = {}
+        for term, entries in postings.items():
+            idf = math.log(1 + (total - len(entries) + 0.5) / (len(entries) + 0.5))
+            indices = np.array([entry for entry, _ in entries], dtype=np.int64)
+            counts = np.array([count for _, count in entries], dtype=np.float32)
+            weights = idf * counts * (k1 + 1) / (counts + length_norm[indices])
+            self.postings[term] = (indices, weights)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def scores(self, query):
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term in self.postings:
+                indices, weights = self.postings[term]
+                scores[indices] += weights
+        return scores
+
+    def retrieve_ids(self, query, max_tokens=400, top_k=4):
+        """Indices of the best-scoring chunks for query, highest first, that fit together within max_tokens"""
+        scores = self.scores(query)
+        selected = []
+        used = 0
+        for entry in np.argsort(-scores, kind="stable"):
+            if len(selected) == top_k or scores[entry] <= 0:
+                break
+            if used + self.token_counts[entry] > max_tokens:
+                continue
+            selected.append(int(entry))
+            used += self.token_counts[entry]
+        return selected
+
+    def retrieve(self, query, max_tokens=400, top_k=4):
+        """Best-scoring chunks for query, highest first, that fit together within max_tokens"""
+        return [self.chunks[entry] for entry in self.retrieve_ids(query, max_tokens, top_k)]
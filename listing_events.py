@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+RESYNC = "resync"  # event type telling a client it missed events and must reload
+
+
+class Subscription:
+    """One connected client's read position in the broker's history; see ListingEventBroker.subscribe"""
+
+    def __init__(self, broker, cursor):
+        self.broker = broker
+        self.cursor = cursor  # id of the last event handed to this client
+        self.last_read = time.monotonic()
+        self.waiting = False
+        self.overflowed = False
+        self.closed = False
+        self._ready = threading.Condition(broker._lock)
+
+    def get(self, timeout):
+        """
+        Every event published since the last call, waiting up to timeout seconds for one.
+        [] on timeout; [RESYNC event] (and the subscription is closed) if the client was
+        dropped as stalled or the events it needs have left the history.
+        """
+        with self._ready:
+            if not self.overflowed and self.cursor >= self.broker._next_id - 1:
+                self.waiting = True
+                self._ready.wait(timeout)
+                self.waiting = False
+            self.last_read = time.monotonic()
+            events = None if self.overflowed else self.broker._since(self.cursor)
+            if events is None:
+                self.broker._remove(self)
+                return [{"id": None, "type": RESYNC, "data": {"reason": "too far behind"}}]
+            if events:
+                self.cursor = events[-1]["id"]
+                self.broker.delivered += len(events)
+            return events
+
+    def close(self):
+        with self._ready:
+            self.broker._remove(self)
+
+
+class ListingEventBroker:
+    """
+    In-process fan-out of listing events (added, updated, claimed) to dashboard streams.
+    Events are kept once, in a bounded history; each subscriber only holds its position
+    in it, so a burst costs no per-client memory and a client that is reading keeps up
+    by taking everything new in one batch. publish() never blocks on a subscriber. A
+    client is dropped and told to resync only when it is stalled (max_queue events
+    behind and not back for more in stall_seconds) or the history no longer has the
+    events it missed. A reconnecting client resumes from its Last-Event-ID.
+    """
+
+    def __init__(self, max_subscribers=500, max_queue=256, history_size=4096, stall_seconds=5.0):
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self.stall_seconds = stall_seconds
+
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=max(history_size, max_queue))
+        self._next_id = 1
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped_slow = 0
+        self.rejected = 0
+
+    def publish(self, event_type, data):
+        """Add an event to the history and wake the subscribers waiting for one; returns its id"""
+        with self._lock:
+            event = {"id": self._next_id, "type": event_type, "data": data, "published_at": time.time()}
+            self._next_id += 1
+            self._history.append(event)
+            self.published += 1
+            oldest = self._history[0]["id"]
+            stalled_before = time.monotonic() - self.stall_seconds
+            dropped = []
+            for subscription in self._subscribers:
+                if subscription.waiting:
+                    subscription._ready.notify()
+                elif subscription.cursor < oldest - 1 or (
+                        event["id"] - subscription.cursor >= self.max_queue and subscription.last_read < stalled_before):
+                    # Stalled client (e.g. stuck writing to a dead socket): free its slot now
+                    subscription.overflowed = True
+                    dropped.append(subscription)
+            for subscription in dropped:
+                self._remove(subscription)
+            self.dropped_slow += len(dropped)
+        return event["id"]
+
+    def subscribe(self, last_event_id=None):
+        """
+        New Subscription, or None when max_subscribers are already connected. With
+        last_event_id, events published since then come first, or a resync if they are
+        no longer in the history or the id is newer than anything published here (a
+        restarted server, or another worker's id).
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected += 1
+                return None
+            newest = self._next_id - 1
+            subscription = Subscription(self, newest if last_event_id is None else last_event_id)
+            if last_event_id is not None and (last_event_id > newest or self._since(last_event_id) is None):
+                subscription.overflowed = True  # its first get() says resync
+                return subscription
+            self._subscribers.add(subscription)
+            return subscription
+
+    def _since(self, event_id):
+        """Events after event_id, or None if some of them have left the history. Caller must hold the lock"""
+        oldest = self._history[0]["id"] if self._history else self._next_id
+        if event_id < oldest - 1:
+            return None
+        # From the newest end: a reader that keeps up only wants the last few
+        missed = max(self._next_id - 1 - event_id, 0)
+        return list(islice(reversed(self._history), missed))[::-1]
+
+    def _remove(self, subscription):
+        """Caller must hold the lock"""
+        subscription.closed = True
+        self._subscribers.discard(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped_slow": self.dropped_slow,
+                "rejected": self.rejected,
+                "last_event_id": self._next_id - 1,
+            }
@@ -0,0 +1,113 @@
+import math
+import re
+from datetime import datetime, timedelta
+
+from queries import SEARCH_BROWSE_SQL, SEARCH_PENDING_SQL, SEARCH_RANKED_SQL
+
+# Listing search: find_listings() lets FTS5 match and rank (bm25, food_item over quantity)
+# in SQL and uses expiry only to break ties, so a better match that expires later still
+# comes first. Listings still waiting for their shelf-life estimate (fresh_until IS NULL)
+# are found too, after the rest, unless a freshness window is asked for.
+SEARCH_STATUSES = ("Available", "Claimed", "Expired")
+MAX_SEARCH_TERMS = 8
+# Upper bound for an open freshness window. A full date, not "9999": fresh_until has NUMERIC
+# affinity, so a number-like bound would be compared as a number and be below every date.
+NO_UPPER_BOUND = "9999-12-31T23:59:59"
+
+# A few words listings are written with interchangeably; kept small so results stay predictable
+SYNONYMS = {
+    "veg": ("vegetable", "vegetarian"),
+    "vegetable": ("veg", "sabzi"),
+    "vegetarian": ("veg",),
+    "sabzi": ("vegetable",),
+    "rice": ("chawal",),
+    "chawal": ("rice",),
+    "bread": ("naan", "roti", "chapati", "pav", "loaves"),
+    "roti": ("chapati",),
+    "chapati": ("roti",),
+    "curd": ("dahi", "yogurt"),
+    "yogurt": ("curd", "dahi"),
+    "dahi": ("curd", "yogurt"),
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def search_terms(text):
+    """Lower-cased words of a search box entry, at most MAX_SEARCH_TERMS"""
+    return _WORD.findall((text or "").lower())[:MAX_SEARCH_TERMS]
+
+
+def parse_hours(value):
+    """Hours as a float (negative: in the past); None if blank; ValueError if not a number"""
+    if value in (None, ""):
+        return None
+    hours = float(value)
+    if not math.isfinite(hours):
+        raise ValueError("Hours must be a finite number")
+    return hours
+
+
+def _phrase(word):
+    return '"' + word.replace('"', '""') + '"'
+
+
+def build_match_query(terms, restaurant_id=None):
+    """
+    FTS5 MATCH expression for the search indexes, or None when there is nothing to match on.
+    Every term must appear in food_item or quantity, its synonyms counting as alternatives.
+    Terms are quoted, so nothing typed is read as FTS5 syntax. No prefix matching: without
+    a prefix index "rice*" costs more than the rest of the search put together, and porter
+    stemming already covers plurals.
+    """
+    groups = []
+    for term in terms:
+        alternatives = [_phrase(term)] + [_phrase(synonym) for synonym in SYNONYMS.get(term, ())]
+        groups.append(alternatives[0] if len(alternatives) == 1 else "(" + " OR ".join(alternatives) + ")")
+    clauses = []
+    if groups:
+        clauses.append("{food_item quantity} : (" + " AND ".join(groups) + ")")
+    if restaurant_id is not None:
+        clauses.append("restaurant_id : " + _phrase(str(restaurant_id)))
+    return " AND ".join(clauses) or None
+
+
+def search_params(terms, status="Available", restaurant_id=None, min_hours_left=None, max_hours_left=None,
+                  now=None, limit=50):
+    """
+    Named parameters for the queries.SEARCH_*_SQL queries, plus the scope to run them in.
+    Available listings default to the ones that haven't expired yet; the window bounds are
+    compared with fresh_until as stored (local time, ISO format). Pending listings have no
+    fresh_until, so they only count when no window was asked for.
+    """
+    now = now or datetime.now()
+    include_pending = min_hours_left is None and max_hours_left is None
+    if min_hours_left is None and status == "Available":
+        min_hours_left = 0
+    return {
+        "scope": "available" if status == "Available" else "all",
+        "status": status,
+        "fresh_after": (now + timedelta(hours=min_hours_left)).isoformat() if min_hours_left is not None else "",
+        "fresh_before": (now + timedelta(hours=max_hours_left)).isoformat() if max_hours_left is not None else NO_UPPER_BOUND,
+        "include_pending": int(include_pending),
+        "match": build_match_query(terms, restaurant_id),
+        "limit": limit,
+    }
+
+
+def find_listings(db, params):
+    """Matching rows, best match first; with nothing to match on, every listing in expiry order"""
+    if params["match"] is not None:
+        return db.execute(SEARCH_RANKED_SQL[params["scope"]], params).fetchall()
+    rows = db.execute(SEARCH_BROWSE_SQL[params["scope"]], params).fetchall()
+    if params["include_pending"] and len(rows) < params["limit"]:
+        rows += db.execute(SEARCH_PENDING_SQL, dict(params, limit=params["limit"] - len(rows))).fetchall()
+    return rows
+
+
+def hours_left(fresh_until, now):
+    if fresh_until is None:
+        return None
+    if isinstance(fresh_until, str):
+        fresh_until = datetime.fromisoformat(fresh_until)
+    return (fresh_until - now).total_seconds() / 3600
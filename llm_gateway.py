@@ -0,0 +1,330 @@
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """The LLM call failed; callers fall back to their canned responses"""
+
+
+class LLMRateLimited(LLMError):
+    """The upstream kept answering 429 after retries; retry_after is its last Retry-After in seconds, if any"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMRejected(LLMError):
+    """The upstream refused the request itself (bad request, auth); it is up, so the breaker stays closed"""
+
+
+class LLMUnavailable(LLMError):
+    """The circuit breaker is open; the upstream was not contacted. retry_after: seconds until it lets a trial call through"""
+
+    def __init__(self, message, retry_after=0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(header):
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP date), or None"""
+    if not header:
+        return None
+    try:
+        return max(float(header), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(header).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def call_outcome(error):
+    """Metrics label for a failed call: rate_limit, unavailable or api_error"""
+    if isinstance(error, LLMRateLimited):
+        return "rate_limit"
+    if isinstance(error, LLMUnavailable):
+        return "unavailable"
+    return "api_error"
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for
+    reset_seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold=5, reset_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a trial call through; 0 when it would now"""
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(self.reset_seconds - (time.monotonic() - self.opened_at), 0.0)
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_seconds or self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """
+    Shared client for the OpenAI-compatible Groq API: one pooled keep-alive session,
+    separate connect/read timeouts, jittered exponential backoff on 429/5xx and a
+    circuit breaker so outages fail fast instead of tying up request threads.
+    on_call(model, seconds, outcome), if set, hears about every completion including
+    its retries; outcome is success, rate_limit, unavailable, api_error or (for a stream
+    the caller stopped reading) cancelled.
+    """
+
+    def __init__(self, api_key, base_url="https://api.groq.com/openai/v1", connect_timeout=3.0,
+                 read_timeout=15.0, max_retries=2, backoff_base=0.25, backoff_max=2.0,
+                 pool_size=10, breaker=None, on_call=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.on_call = on_call
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, honouring a short Retry-After (seconds) from the server"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        time.sleep(delay)
+
+    def _admit(self):
+        """Start a call: raises LLMError without an API key, LLMUnavailable while the breaker is open"""
+        if not self.api_key:
+            raise LLMError("Groq API key not configured")
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise LLMUnavailable("Circuit breaker open", self.breaker.retry_in())
+
+    def _settle(self, outcome):
+        """
+        Finish a call admitted by _admit: success, rejected (the upstream is up but refused
+        this request) or failed. Every admitted call must settle exactly once, or a
+        half-open breaker waits on its trial call forever.
+        """
+        if outcome != "success":
+            self._count("failures")
+        if outcome == "failed":
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def post(self, path, payload, stream=False):
+        """
+        POST to the API with retries; returns the successful requests.Response. The
+        caller must have called _admit and settles the call. Raises LLMRateLimited,
+        LLMRejected or LLMError.
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+            self._count("requests_sent")
+            retry_after = None
+            try:
+                response = self.session.post(
+                    f"{self.base_url}{path}", json=payload, timeout=self.timeout, stream=stream
+                )
+            except requests.exceptions.RequestException as e:
+                last_error = LLMError(f"Request failed: {e}")
+            else:
+                if response.status_code == 200:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                body = response.text[:500]
+                response.close()
+                if response.status_code == 429:
+                    last_error = LLMRateLimited("Upstream rate limit (429)", retry_after)
+                elif response.status_code in RETRYABLE_STATUS_CODES:
+                    last_error = LLMError(f"Status {response.status_code}, Body: {body}")
+                else:
+                    # Non-retryable (bad request, auth): the service is up, so don't trip the breaker
+                    raise LLMRejected(f"Status {response.status_code}, Body: {body}")
+
+            if attempt < self.max_retries:
+                self._backoff(attempt, retry_after)
+
+        raise last_error
+
+    def _report(self, payload, started, outcome):
+        if self.on_call is not None:
+            self.on_call(payload.get("model"), time.perf_counter() - started, outcome)
+
+    def chat_completion(self, payload):
+        """Non-streaming chat completion; returns the assistant message text"""
+        started = time.perf_counter()
+        try:
+            self._admit()
+        except LLMError as e:
+            self._report(payload, started, call_outcome(e))
+            raise
+        settled = "failed"
+        try:
+            response = self.post("/chat/completions", payload)
+            try:
+                text = response.json()["choices"][0]["message"]["content"].strip()
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise LLMError(f"Malformed completion response: {e}")
+            settled = "success"
+        except LLMError as e:
+            if isinstance(e, LLMRejected):
+                settled = "rejected"
+            self._report(payload, started, call_outcome(e))
+            raise
+        finally:
+            # Whatever ends the call, even an unexpected exception, the breaker hears about it
+            self._settle(settled)
+        self._report(payload, started, "success")
+        return text
+
+    def stream_chat_completion(self, payload):
+        """
+        Streaming chat completion; yields pieces of the assistant message as the server
+        sends them. The breaker hears the outcome when the stream ends, so one that fails
+        part-way counts as a failure; one the caller stops reading counts as a success.
+        """
+        started = time.perf_counter()
+        outcome = "cancelled"
+        settled = None
+        try:
+            self._admit()
+            settled = "success"  # unless the request or the stream fails
+            response = self.post("/chat/completions", {**payload, "stream": True}, stream=True)
+            response.encoding = "utf-8"
+            finished = False
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    # Server-sent events: "data: {chunk json}" lines, ending with "data: [DONE]".
+                    # Reading on to the end of the body lets the connection go back to the pool.
+                    if finished or not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        finished = True
+                        continue
+                    try:
+                        piece = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                        raise LLMError(f"Malformed stream chunk: {e}")
+                    if piece:
+                        yield piece
+            except requests.exceptions.RequestException as e:
+                raise LLMError(f"Stream interrupted: {e}")
+            finally:
+                response.close()
+            outcome = "success"
+        except Exception as e:
+            if settled is not None:  # None: never admitted
+                settled = "rejected" if isinstance(e, LLMRejected) else "failed"
+            if isinstance(e, LLMError):
+                outcome = call_outcome(e)
+            raise
+        finally:
+            if settled is not None:
+                self._settle(settled)
+            self._report(payload, started, outcome)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests_sent": self.requests_sent,
+                "retries": self.retries,
+                "failures": self.failures,
+                "short_circuited": self.short_circuited,
+                "breaker_state": self.breaker.state,
+            }
+
+
+_default_gateway = None
+_default_gateway_lock = threading.Lock()
+
+
+def get_default_gateway():
+    """Process-wide gateway configured from the environment"""
+    global _default_gateway
+    with _default_gateway_lock:
+        if _default_gateway is None:
+            _default_gateway = LLMGateway(
+                api_key=os.getenv("GROQ_API_KEY"),
+                base_url=os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1"),
+                connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", 3.0)),
+                read_timeout=float(os.getenv("LLM_READ_TIMEOUT", 15.0)),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", 2)),
+                pool_size=int(os.getenv("LLM_POOL_SIZE", 10)),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", 5)),
+                    reset_seconds=float(os.getenv("LLM_BREAKER_RESET", 30)),
+                ),
+            )
+        return _default_gateway
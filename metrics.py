@@ -0,0 +1,236 @@
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+# Seconds; request, template and LLM latencies
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; SQLite statements are mostly well under a millisecond
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Prometheus histogram: per label set, a count per bucket plus the sum and count of observations"""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labelvalues -> [per-bucket counts (last is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect_left(self.buckets, value)  # first bucket with value <= le
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        with self._lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labelvalues, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Collected:
+    """
+    Gauge or counter whose values live elsewhere (e.g. a stats() method) and are read
+    when /metrics is scraped: read() returns {labelvalues tuple: value}
+    """
+
+    def __init__(self, name, help_text, read, labelnames=(), metric_type="gauge"):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.labelnames = tuple(labelnames)
+        self.metric_type = metric_type
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        for labelvalues, value in sorted(self.read().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics published on /metrics, in the Prometheus text exposition format"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def collected(self, name, help_text, read, labelnames=(), metric_type="gauge"):
+        return self.register(Collected(name, help_text, read, labelnames, metric_type))
+
+    def render(self):
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+_STATEMENT_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def statement_label(sql):
+    """Low-cardinality name for a statement: its verb and first table, e.g. "SELECT food_listings" """
+    words = sql.split(None, 1)
+    verb = words[0].upper() if words else "?"
+    table = _STATEMENT_TABLE.search(sql)
+    return f"{verb} {table.group(1)}" if table else verb
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that reports each statement's execute + fetch time to its connection's
+    on_statement(sql, seconds), once the statement is finished with: on the next
+    execute, close, or when the cursor is dropped. Rows read by iterating over the
+    cursor aren't timed.
+    """
+
+    _sql = None
+    _elapsed = 0.0
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def _finish(self):
+        if self._sql is not None:
+            sql, self._sql = self._sql, None
+            self.connection.on_statement(sql, self._elapsed)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self._sql, self._elapsed = sql, 0.0
+        self._timed(super().execute, sql, parameters)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        self._sql, self._elapsed = sql, 0.0
+        self._timed(super().executemany, sql, seq_of_parameters)
+        return self
+
+    def fetchone(self):
+        return self._timed(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed(super().fetchmany, *(() if size is None else (size,)))
+
+    def fetchall(self):
+        return self._timed(super().fetchall)
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+def timed_connection_factory(on_statement):
+    """
+    sqlite3.Connection subclass (for sqlite3.connect(factory=...)) whose execute and
+    commit calls report (sql, seconds) to on_statement; commits are reported as "COMMIT"
+    """
+
+    class TimedConnection(sqlite3.Connection):
+        def cursor(self, factory=TimedCursor):
+            return super().cursor(factory)
+
+        def execute(self, sql, parameters=()):
+            return self.cursor().execute(sql, parameters)
+
+        def executemany(self, sql, seq_of_parameters):
+            return self.cursor().executemany(sql, seq_of_parameters)
+
+        def commit(self):
+            start = time.perf_counter()
+            try:
+                super().commit()
+            finally:
+                on_statement("COMMIT", time.perf_counter() - start)
+
+        def __exit__(self, exc_type, exc_value, traceback):
+            # "with connection:" commits without going through commit()
+            if exc_type is not None or not self.in_transaction:
+                return super().__exit__(exc_type, exc_value, traceback)
+            start = time.perf_counter()
+            try:
+                return super().__exit__(exc_type, exc_value, traceback)
+            finally:
+                on_statement("COMMIT", time.perf_counter() - start)
+
+    TimedConnection.on_statement = staticmethod(on_statement)
+    return TimedConnection
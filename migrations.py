@@ -0,0 +1,86 @@
+import os
+import re
+import sqlite3
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def load_migrations(migrations_dir=MIGRATIONS_DIR):
+    """Return [(version, name, sql)] for every NNNN_name.sql file, ordered by version"""
+    migrations = []
+    for filename in os.listdir(migrations_dir):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(migrations_dir, filename)) as f:
+            migrations.append((int(match.group(1)), match.group(2), f.read()))
+    migrations.sort()
+    return migrations
+
+
+def split_statements(script):
+    """Split a SQL script into complete statements (trigger bodies stay intact)"""
+    statements = []
+    current = ''
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            if current.strip():
+                statements.append(current.strip())
+            current = ''
+    leftover = [line for line in current.splitlines() if line.strip() and not line.strip().startswith('--')]
+    if leftover:
+        statements.append(current.strip())
+    return statements
+
+
+def migrate(db_path, migrations_dir=MIGRATIONS_DIR):
+    """Apply pending migrations in order, each in its own transaction. Returns the versions applied."""
+    connection = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    applied = []
+    try:
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        for version, name, sql in load_migrations(migrations_dir):
+            # BEGIN IMMEDIATE takes the write lock, so concurrent workers starting up
+            # re-check the version under the lock instead of applying it twice
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                done = connection.execute(
+                    'SELECT 1 FROM schema_migrations WHERE version = ?', (version,)
+                ).fetchone()
+                if done:
+                    connection.execute('COMMIT')
+                    continue
+                for statement in split_statements(sql):
+                    connection.execute(statement)
+                connection.execute(
+                    'INSERT INTO schema_migrations (version, name) VALUES (?, ?)', (version, name)
+                )
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            applied.append(version)
+    finally:
+        connection.close()
+    return applied
+
+
+def current_version(db_path):
+    connection = sqlite3.connect(db_path)
+    try:
+        row = connection.execute('SELECT MAX(version) FROM schema_migrations').fetchone()
+        return row[0] or 0
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        connection.close()
@@ -23,4 +23,11 @@ CREATE TABLE IF NOT EXISTS food_listings (
     fresh_until DATETIME, -- <-- ADD THIS LINE
     FOREIGN KEY (restaurant_id) REFERENCES users (id),
     FOREIGN KEY (claimed_by_id) REFERENCES users (id)
-);
\ No newline at end of file
+);
+
+-- Cache of LLM shelf-life estimates, keyed by normalized food name
+CREATE TABLE IF NOT EXISTS shelf_life_cache (
+    food_key TEXT PRIMARY KEY,
+    hours INTEGER NOT NULL,
+    stored_at REAL NOT NULL -- unix time the estimate was stored
+);
@@ -0,0 +1,17 @@
+-- Indexes for the dashboard() access paths
+
+-- Restaurant dashboard: WHERE restaurant_id = ? ORDER BY timestamp DESC
+CREATE INDEX IF NOT EXISTS idx_food_listings_restaurant_timestamp
+    ON food_listings (restaurant_id, timestamp);
+
+-- NGO dashboard: filter on status, then freshness, newest first
+CREATE INDEX IF NOT EXISTS idx_food_listings_status_fresh_until_timestamp
+    ON food_listings (status, fresh_until, timestamp);
+
+-- Admin dashboard: every listing, newest first
+CREATE INDEX IF NOT EXISTS idx_food_listings_timestamp
+    ON food_listings (timestamp);
+
+-- Admin dashboard: restaurants / NGOs lists
+CREATE INDEX IF NOT EXISTS idx_users_account_type
+    ON users (account_type);
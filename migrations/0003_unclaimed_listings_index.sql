@@ -0,0 +1,6 @@
+-- The NGO dashboard pages through unclaimed listings newest first. Without this the planner
+-- picks the status index and sorts every unclaimed row before applying LIMIT; the partial
+-- index lets it walk unclaimed rows in timestamp order and stop after one page.
+CREATE INDEX IF NOT EXISTS idx_food_listings_unclaimed_timestamp
+    ON food_listings (timestamp)
+    WHERE status IN ('Available', 'Expired');
@@ -0,0 +1,6 @@
+-- Token-bucket state for the chatbot rate limiter when it is shared between worker processes
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    bucket_key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL -- unix time of the last refill/consume
+);
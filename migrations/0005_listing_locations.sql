@@ -0,0 +1,59 @@
+-- Coordinates for users (a restaurant's pickup point, an NGO's base) and an R*Tree over
+-- the locations of Available listings, so "food near me" reads one bounding box instead
+-- of every listing in the city. The triggers keep the R*Tree in step with food_listings.
+ALTER TABLE users ADD COLUMN latitude REAL;
+ALTER TABLE users ADD COLUMN longitude REAL;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS listing_locations USING rtree(
+    id,                -- food_listings.id
+    min_lat, max_lat,
+    min_lon, max_lon
+);
+
+-- Listings of restaurants that have coordinates are indexed while they are Available
+INSERT INTO listing_locations (id, min_lat, max_lat, min_lon, max_lon)
+SELECT fl.id, u.latitude, u.latitude, u.longitude, u.longitude
+FROM food_listings fl JOIN users u ON u.id = fl.restaurant_id
+WHERE fl.status = 'Available' AND u.latitude IS NOT NULL AND u.longitude IS NOT NULL;
+
+CREATE TRIGGER IF NOT EXISTS listing_locations_after_insert
+AFTER INSERT ON food_listings
+WHEN NEW.status = 'Available'
+BEGIN
+    INSERT OR REPLACE INTO listing_locations (id, min_lat, max_lat, min_lon, max_lon)
+    SELECT NEW.id, latitude, latitude, longitude, longitude
+    FROM users
+    WHERE id = NEW.restaurant_id AND latitude IS NOT NULL AND longitude IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS listing_locations_after_status_change
+AFTER UPDATE OF status ON food_listings
+WHEN NEW.status IS NOT OLD.status
+BEGIN
+    DELETE FROM listing_locations WHERE id = NEW.id AND NEW.status != 'Available';
+    INSERT OR REPLACE INTO listing_locations (id, min_lat, max_lat, min_lon, max_lon)
+    SELECT NEW.id, latitude, latitude, longitude, longitude
+    FROM users
+    WHERE NEW.status = 'Available' AND id = NEW.restaurant_id
+      AND latitude IS NOT NULL AND longitude IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS listing_locations_after_delete
+AFTER DELETE ON food_listings
+BEGIN
+    DELETE FROM listing_locations WHERE id = OLD.id;
+END;
+
+-- A restaurant that sets or moves its location takes its Available listings with it
+CREATE TRIGGER IF NOT EXISTS listing_locations_after_user_move
+AFTER UPDATE OF latitude, longitude ON users
+WHEN NEW.latitude IS NOT OLD.latitude OR NEW.longitude IS NOT OLD.longitude
+BEGIN
+    DELETE FROM listing_locations
+    WHERE id IN (SELECT id FROM food_listings WHERE restaurant_id = NEW.id);
+    INSERT INTO listing_locations (id, min_lat, max_lat, min_lon, max_lon)
+    SELECT fl.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+    FROM food_listings fl
+    WHERE fl.restaurant_id = NEW.id AND fl.status = 'Available'
+      AND NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+END;
@@ -0,0 +1,108 @@
+-- Per-restaurant and per-NGO totals for the admin dashboard, kept up to date by triggers
+-- so the page reads one summary row per user instead of aggregating every listing.
+-- They are lifetime totals: removing a listing row does not change them.
+-- rollups.py rebuilds both tables from the listing rows.
+
+-- When a listing was claimed (UTC, like timestamp), for time-to-claim
+ALTER TABLE food_listings ADD COLUMN claimed_at DATETIME;
+
+CREATE TABLE IF NOT EXISTS restaurant_stats (
+    restaurant_id INTEGER PRIMARY KEY,
+    listed INTEGER NOT NULL DEFAULT 0,
+    claimed INTEGER NOT NULL DEFAULT 0,
+    expired INTEGER NOT NULL DEFAULT 0,
+    timed_claims INTEGER NOT NULL DEFAULT 0,    -- claims with a claimed_at
+    claim_seconds REAL NOT NULL DEFAULT 0,      -- sum of claimed_at - timestamp over those
+    last_listed_at DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS ngo_stats (
+    ngo_id INTEGER PRIMARY KEY,
+    claimed INTEGER NOT NULL DEFAULT 0,
+    timed_claims INTEGER NOT NULL DEFAULT 0,
+    claim_seconds REAL NOT NULL DEFAULT 0,
+    last_claimed_at DATETIME
+);
+
+CREATE TRIGGER IF NOT EXISTS listing_stats_after_insert
+AFTER INSERT ON food_listings
+BEGIN
+    INSERT INTO restaurant_stats (restaurant_id, listed, claimed, expired, timed_claims, claim_seconds, last_listed_at)
+    VALUES (
+        NEW.restaurant_id, 1, NEW.status = 'Claimed', NEW.status = 'Expired',
+        NEW.status = 'Claimed' AND NEW.claimed_at IS NOT NULL,
+        COALESCE(CASE WHEN NEW.status = 'Claimed'
+            THEN (julianday(NEW.claimed_at) - julianday(NEW.timestamp)) * 86400 END, 0),
+        NEW.timestamp
+    )
+    ON CONFLICT (restaurant_id) DO UPDATE SET
+        listed = listed + 1,
+        claimed = claimed + excluded.claimed,
+        expired = expired + excluded.expired,
+        timed_claims = timed_claims + excluded.timed_claims,
+        claim_seconds = claim_seconds + excluded.claim_seconds,
+        last_listed_at = COALESCE(MAX(last_listed_at, excluded.last_listed_at), last_listed_at, excluded.last_listed_at);
+
+    INSERT INTO ngo_stats (ngo_id, claimed, timed_claims, claim_seconds, last_claimed_at)
+    SELECT NEW.claimed_by_id, 1, NEW.claimed_at IS NOT NULL,
+           COALESCE((julianday(NEW.claimed_at) - julianday(NEW.timestamp)) * 86400, 0), NEW.claimed_at
+    WHERE NEW.status = 'Claimed' AND NEW.claimed_by_id IS NOT NULL
+    ON CONFLICT (ngo_id) DO UPDATE SET
+        claimed = claimed + 1,
+        timed_claims = timed_claims + excluded.timed_claims,
+        claim_seconds = claim_seconds + excluded.claim_seconds,
+        last_claimed_at = COALESCE(MAX(last_claimed_at, excluded.last_claimed_at), last_claimed_at, excluded.last_claimed_at);
+END;
+
+-- Claims and expiry: move the listing from its old status's counters to its new one's
+CREATE TRIGGER IF NOT EXISTS listing_stats_after_status_change
+AFTER UPDATE OF status ON food_listings
+WHEN NEW.status IS NOT OLD.status
+BEGIN
+    UPDATE restaurant_stats SET
+        claimed = claimed + (NEW.status = 'Claimed') - (OLD.status = 'Claimed'),
+        expired = expired + (NEW.status = 'Expired') - (OLD.status = 'Expired'),
+        timed_claims = timed_claims
+            + (NEW.status = 'Claimed' AND NEW.claimed_at IS NOT NULL)
+            - (OLD.status = 'Claimed' AND OLD.claimed_at IS NOT NULL),
+        claim_seconds = claim_seconds
+            + COALESCE(CASE WHEN NEW.status = 'Claimed'
+                THEN (julianday(NEW.claimed_at) - julianday(NEW.timestamp)) * 86400 END, 0)
+            - COALESCE(CASE WHEN OLD.status = 'Claimed'
+                THEN (julianday(OLD.claimed_at) - julianday(OLD.timestamp)) * 86400 END, 0)
+    WHERE restaurant_id = NEW.restaurant_id;
+
+    UPDATE ngo_stats SET
+        claimed = claimed - 1,
+        timed_claims = timed_claims - (OLD.claimed_at IS NOT NULL),
+        claim_seconds = claim_seconds
+            - COALESCE((julianday(OLD.claimed_at) - julianday(OLD.timestamp)) * 86400, 0)
+    WHERE OLD.status = 'Claimed' AND ngo_id = OLD.claimed_by_id;
+
+    INSERT INTO ngo_stats (ngo_id, claimed, timed_claims, claim_seconds, last_claimed_at)
+    SELECT NEW.claimed_by_id, 1, NEW.claimed_at IS NOT NULL,
+           COALESCE((julianday(NEW.claimed_at) - julianday(NEW.timestamp)) * 86400, 0), NEW.claimed_at
+    WHERE NEW.status = 'Claimed' AND NEW.claimed_by_id IS NOT NULL
+    ON CONFLICT (ngo_id) DO UPDATE SET
+        claimed = claimed + 1,
+        timed_claims = timed_claims + excluded.timed_claims,
+        claim_seconds = claim_seconds + excluded.claim_seconds,
+        last_claimed_at = COALESCE(MAX(last_claimed_at, excluded.last_claimed_at), last_claimed_at, excluded.last_claimed_at);
+END;
+
+-- Backfill from existing listings (same aggregation as rollups.rebuild_rollups)
+INSERT INTO restaurant_stats (restaurant_id, listed, claimed, expired, timed_claims, claim_seconds, last_listed_at)
+SELECT restaurant_id, COUNT(*), SUM(status = 'Claimed'), SUM(status = 'Expired'),
+       SUM(status = 'Claimed' AND claimed_at IS NOT NULL),
+       COALESCE(SUM(CASE WHEN status = 'Claimed'
+           THEN (julianday(claimed_at) - julianday(timestamp)) * 86400 END), 0),
+       MAX(timestamp)
+FROM food_listings
+GROUP BY restaurant_id;
+
+INSERT INTO ngo_stats (ngo_id, claimed, timed_claims, claim_seconds, last_claimed_at)
+SELECT claimed_by_id, COUNT(*), COUNT(claimed_at),
+       COALESCE(SUM((julianday(claimed_at) - julianday(timestamp)) * 86400), 0), MAX(claimed_at)
+FROM food_listings
+WHERE status = 'Claimed' AND claimed_by_id IS NOT NULL
+GROUP BY claimed_by_id;
@@ -0,0 +1,35 @@
+-- Hot/archive split: expired and claimed listings past the retention window move out of
+-- food_listings (see expiry_sweeper.py), so dashboard queries only touch the live set.
+CREATE TABLE IF NOT EXISTS food_listings_archive (
+    id INTEGER PRIMARY KEY, -- the id it had in food_listings (AUTOINCREMENT never reuses it)
+    restaurant_id INTEGER NOT NULL,
+    food_item TEXT NOT NULL,
+    quantity TEXT NOT NULL,
+    status TEXT NOT NULL,
+    claimed_by_id INTEGER,
+    timestamp DATETIME,
+    fresh_until DATETIME,
+    claimed_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_food_listings_archive_restaurant_timestamp
+    ON food_listings_archive (restaurant_id, timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_food_listings_archive_timestamp
+    ON food_listings_archive (timestamp);
+
+-- Every listing ever posted, live or archived
+CREATE VIEW IF NOT EXISTS food_listings_history AS
+    SELECT id, restaurant_id, food_item, quantity, status, claimed_by_id, timestamp, fresh_until, claimed_at
+    FROM food_listings
+    UNION ALL
+    SELECT id, restaurant_id, food_item, quantity, status, claimed_by_id, timestamp, fresh_until, claimed_at
+    FROM food_listings_archive;
+
+-- The sweeper stores 'Expired', so the NGO dashboard now pages through Available rows only
+CREATE INDEX IF NOT EXISTS idx_food_listings_available_timestamp
+    ON food_listings (timestamp)
+    WHERE status = 'Available';
+
+DROP INDEX IF EXISTS idx_food_listings_unclaimed_timestamp;
@@ -0,0 +1,77 @@
+-- Full-text search over food_item and quantity (see listing_search.py): two external-content
+-- FTS5 indexes over food_listings (the text stays in food_listings, they only hold the
+-- inverted index), kept in step by the triggers below.
+-- - available_listing_search: Available listings only, like listing_locations. NGO searches
+--   use it; a common word's entries are then the listings that can still be claimed, not
+--   every listing ever posted, which is what keeps a search in the low milliseconds.
+-- - listing_search: every listing, for restaurants and admins looking up claimed or expired ones.
+-- restaurant_id is indexed so a restaurant filter narrows the match inside FTS5. Porter
+-- stemming lets "noodle" find "Hakka Noodles"; remove_diacritics folds accents.
+CREATE VIRTUAL TABLE IF NOT EXISTS listing_search USING fts5(
+    food_item,
+    quantity,
+    restaurant_id,
+    content = 'food_listings',
+    content_rowid = 'id',
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS available_listing_search USING fts5(
+    food_item,
+    quantity,
+    restaurant_id,
+    content = 'food_listings',
+    content_rowid = 'id',
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+
+-- Index the listings that already exist
+INSERT INTO listing_search (listing_search) VALUES ('rebuild');
+
+INSERT INTO available_listing_search (rowid, food_item, quantity, restaurant_id)
+SELECT id, food_item, quantity, restaurant_id FROM food_listings WHERE status = 'Available';
+
+-- External content: removing a row from an index takes the values it was indexed with,
+-- and only rows that are in the index may be removed
+CREATE TRIGGER IF NOT EXISTS listing_search_after_insert
+AFTER INSERT ON food_listings
+BEGIN
+    INSERT INTO listing_search (rowid, food_item, quantity, restaurant_id)
+    VALUES (NEW.id, NEW.food_item, NEW.quantity, NEW.restaurant_id);
+    INSERT INTO available_listing_search (rowid, food_item, quantity, restaurant_id)
+    SELECT NEW.id, NEW.food_item, NEW.quantity, NEW.restaurant_id WHERE NEW.status = 'Available';
+END;
+
+CREATE TRIGGER IF NOT EXISTS listing_search_after_delete
+AFTER DELETE ON food_listings
+BEGIN
+    INSERT INTO listing_search (listing_search, rowid, food_item, quantity, restaurant_id)
+    VALUES ('delete', OLD.id, OLD.food_item, OLD.quantity, OLD.restaurant_id);
+    INSERT INTO available_listing_search (available_listing_search, rowid, food_item, quantity, restaurant_id)
+    SELECT 'delete', OLD.id, OLD.food_item, OLD.quantity, OLD.restaurant_id WHERE OLD.status = 'Available';
+END;
+
+CREATE TRIGGER IF NOT EXISTS listing_search_after_text_change
+AFTER UPDATE OF food_item, quantity, restaurant_id ON food_listings
+WHEN NEW.food_item IS NOT OLD.food_item OR NEW.quantity IS NOT OLD.quantity
+  OR NEW.restaurant_id IS NOT OLD.restaurant_id
+BEGIN
+    INSERT INTO listing_search (listing_search, rowid, food_item, quantity, restaurant_id)
+    VALUES ('delete', OLD.id, OLD.food_item, OLD.quantity, OLD.restaurant_id);
+    INSERT INTO listing_search (rowid, food_item, quantity, restaurant_id)
+    VALUES (NEW.id, NEW.food_item, NEW.quantity, NEW.restaurant_id);
+END;
+
+-- Claims and the expiry sweeper move listings out of the Available index; fresh_until
+-- updates don't touch either index
+CREATE TRIGGER IF NOT EXISTS available_listing_search_after_update
+AFTER UPDATE OF food_item, quantity, status, restaurant_id ON food_listings
+WHEN (OLD.status = 'Available' OR NEW.status = 'Available')
+  AND (NEW.status IS NOT OLD.status OR NEW.food_item IS NOT OLD.food_item
+       OR NEW.quantity IS NOT OLD.quantity OR NEW.restaurant_id IS NOT OLD.restaurant_id)
+BEGIN
+    INSERT INTO available_listing_search (available_listing_search, rowid, food_item, quantity, restaurant_id)
+    SELECT 'delete', OLD.id, OLD.food_item, OLD.quantity, OLD.restaurant_id WHERE OLD.status = 'Available';
+    INSERT INTO available_listing_search (rowid, food_item, quantity, restaurant_id)
+    SELECT NEW.id, NEW.food_item, NEW.quantity, NEW.restaurant_id WHERE NEW.status = 'Available';
+END;
@@ -0,0 +1,47 @@
+-- One row whose version goes up with every write that changes what a dashboard shows.
+-- Dashboard cache entries and ETags are built from it (see dashboard_cache.py), so every
+-- worker process, and anything else writing to the database (cron sweeps, scripts),
+-- agrees on when a cached page is stale.
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS data_version_listing_insert
+AFTER INSERT ON food_listings
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_listing_update
+AFTER UPDATE ON food_listings
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_listing_delete
+AFTER DELETE ON food_listings
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+-- The admin dashboard lists every user; listings show the restaurant's name and address
+CREATE TRIGGER IF NOT EXISTS data_version_user_insert
+AFTER INSERT ON users
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_user_update
+AFTER UPDATE ON users
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_version_user_delete
+AFTER DELETE ON users
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
@@ -0,0 +1,47 @@
+import base64
+import binascii
+from datetime import datetime
+
+from queries import FIRST_PAGE_CURSOR
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(row):
+    """Opaque cursor pointing just past a listing row (keyset on timestamp, id)"""
+    raw = f"{row['timestamp']}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token):
+    """Turn a cursor back into (timestamp, id); a missing or malformed cursor means the first page"""
+    if not token:
+        return FIRST_PAGE_CURSOR
+    try:
+        timestamp, listing_id = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return timestamp, int(listing_id)
+    except (ValueError, binascii.Error):
+        return FIRST_PAGE_CURSOR
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+def fetch_page(db, sql, params, cursor_token, page_size):
+    """Run a *_PAGE_SQL query; returns (rows, next cursor or None)"""
+    rows = db.execute(sql, (*params, *decode_cursor(cursor_token), page_size + 1)).fetchall()
+    if len(rows) > page_size:
+        return rows[:page_size], encode_cursor(rows[page_size - 1])
+    return rows, None
+
+
+def listing_to_dict(row):
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in zip(row.keys(), row)
+    }
@@ -0,0 +1,185 @@
+# SQL used by the dashboard() views and /api/listings. Kept in one place so
+# check_query_plans.py can EXPLAIN exactly what the app runs.
+
+from geo import KM_PER_DEGREE
+
+EXPIRATION_CHECK_SQL = """CASE
+        WHEN fresh_until IS NULL THEN CASE WHEN status = 'Available' THEN 'Pending Estimate' ELSE status END
+        WHEN DATETIME('now', 'localtime') > fresh_until THEN 'Expired'
+        ELSE status
+    END as current_status"""
+
+RESTAURANT_LISTINGS_SQL = f"""
+    SELECT *, {EXPIRATION_CHECK_SQL}
+    FROM food_listings
+    WHERE restaurant_id = ?
+    ORDER BY timestamp DESC
+"""
+
+# Keyset pagination: rows strictly older than the (timestamp, id) cursor, newest first.
+# The first page passes FIRST_PAGE_CURSOR, which sorts after every real row.
+FIRST_PAGE_CURSOR = ("9999-12-31 23:59:59", 0)
+
+RESTAURANT_LISTINGS_PAGE_SQL = f"""
+    SELECT *, {EXPIRATION_CHECK_SQL}
+    FROM food_listings
+    WHERE restaurant_id = ? AND (timestamp, id) < (?, ?)
+    ORDER BY timestamp DESC, id DESC
+    LIMIT ?
+"""
+
+# status is one of Available / Claimed / Expired; expiry_sweeper.py stores 'Expired', so only
+# listings that went past fresh_until since its last sweep still show up here as Expired. The
+# status test matches the partial index's WHERE clause; INDEXED BY pins it because without
+# ANALYZE stats the planner prefers the status index and sorts every Available row before LIMIT.
+NGO_LISTINGS_PAGE_SQL = f"""
+    SELECT fl.*, u.name as restaurant_name, u.address as restaurant_address, {EXPIRATION_CHECK_SQL}
+    FROM food_listings fl INDEXED BY idx_food_listings_available_timestamp
+    JOIN users u ON fl.restaurant_id = u.id
+    WHERE fl.status = 'Available' AND (fl.timestamp, fl.id) < (?, ?)
+    ORDER BY fl.timestamp DESC, fl.id DESC
+    LIMIT ?
+"""
+
+# One row per user with its rollup totals (migrations/0006_admin_rollups.sql), never the listings
+ADMIN_RESTAURANTS_SQL = """
+    SELECT u.id, u.name, u.email, u.address, u.phone_number,
+           COALESCE(s.listed, 0) AS listed, COALESCE(s.claimed, 0) AS claimed,
+           COALESCE(s.expired, 0) AS expired, COALESCE(s.timed_claims, 0) AS timed_claims,
+           COALESCE(s.claim_seconds, 0) AS claim_seconds, s.last_listed_at
+    FROM users u LEFT JOIN restaurant_stats s ON s.restaurant_id = u.id
+    WHERE u.account_type = 'restaurant'
+"""
+
+ADMIN_NGOS_SQL = """
+    SELECT u.id, u.name, u.email, u.address, u.phone_number, u.account_type,
+           COALESCE(s.claimed, 0) AS claimed, COALESCE(s.timed_claims, 0) AS timed_claims,
+           COALESCE(s.claim_seconds, 0) AS claim_seconds, s.last_claimed_at
+    FROM users u LEFT JOIN ngo_stats s ON s.ngo_id = u.id
+    WHERE u.account_type IN ('ngo', 'old-age-home')
+"""
+
+ADMIN_LISTINGS_PAGE_SQL = f"""
+    SELECT fl.*, u.name as restaurant_name, {EXPIRATION_CHECK_SQL}
+    FROM food_listings fl JOIN users u ON fl.restaurant_id = u.id
+    WHERE (fl.timestamp, fl.id) < (?, ?)
+    ORDER BY fl.timestamp DESC, fl.id DESC
+    LIMIT ?
+"""
+
+# History: listings the expiry sweeper moved out of food_listings, same keyset paging
+RESTAURANT_ARCHIVE_PAGE_SQL = """
+    SELECT *, status as current_status
+    FROM food_listings_archive
+    WHERE restaurant_id = ? AND (timestamp, id) < (?, ?)
+    ORDER BY timestamp DESC, id DESC
+    LIMIT ?
+"""
+
+ADMIN_ARCHIVE_PAGE_SQL = """
+    SELECT a.*, u.name as restaurant_name, a.status as current_status
+    FROM food_listings_archive a JOIN users u ON a.restaurant_id = u.id
+    WHERE (a.timestamp, a.id) < (?, ?)
+    ORDER BY a.timestamp DESC, a.id DESC
+    LIMIT ?
+"""
+
+# Available listings near a point, soonest-expiring first. The R*Tree narrows the search to
+# the bounding box (see geo.nearby_params); only those rows get the exact distance check
+# (equirectangular, fine at city scale) and the collection check: travelling :speed_kmh
+# must leave at least :handling_hours before fresh_until. Pending estimates come last.
+NEARBY_LISTINGS_SQL = f"""
+    SELECT * FROM (
+        SELECT fl.*, u.name AS restaurant_name, u.address AS restaurant_address,
+               u.latitude, u.longitude, {EXPIRATION_CHECK_SQL},
+               {KM_PER_DEGREE ** 2} * ((u.latitude - :lat) * (u.latitude - :lat)
+                   + (u.longitude - :lon) * (u.longitude - :lon) * :lon_scale) AS distance_sq_km,
+               (julianday(fl.fresh_until) - julianday(:now)) * 24 - :handling_hours AS spare_hours
+        FROM listing_locations loc
+        CROSS JOIN food_listings fl ON fl.id = loc.id  -- CROSS JOIN: the R*Tree must drive the join
+        JOIN users u ON u.id = fl.restaurant_id
+        WHERE loc.max_lat >= :min_lat AND loc.min_lat <= :max_lat
+          AND loc.max_lon >= :min_lon AND loc.min_lon <= :max_lon
+          AND fl.status = 'Available'
+    )
+    WHERE distance_sq_km <= :radius_km * :radius_km
+      AND (fresh_until IS NULL
+           OR (spare_hours > 0 AND spare_hours * spare_hours * :speed_kmh * :speed_kmh >= distance_sq_km))
+    ORDER BY fresh_until IS NULL, julianday(fresh_until), id
+    LIMIT :limit
+"""
+
+SAMPLE_NEARBY_PARAMS = {
+    "lat": 22.57, "lon": 88.36, "lon_scale": 0.85, "min_lat": 22.48, "max_lat": 22.66,
+    "min_lon": 88.26, "max_lon": 88.46, "radius_km": 10, "now": "2026-01-01 12:00:00",
+    "speed_kmh": 20, "handling_hours": 0.5, "limit": 50,
+}
+
+# Listing search (listing_search.py), by scope:
+# - "available": Available listings through available_listing_search
+# - "all": any status through listing_search
+# Ranked by bm25 in SQL, food_item weighted over quantity (restaurant_id only filters), then
+# by expiry: soonest first for Available, most recent first otherwise, pending estimates
+# (fresh_until IS NULL, only with :include_pending) last. FTS5 drives the join (CROSS JOIN)
+# and only the matches are read; the window and status are checked on each.
+SEARCH_SCOPES = {"available": ("available_listing_search", "ASC"), "all": ("listing_search", "DESC")}
+
+SEARCH_RANKED_SQL = {
+    scope: f"""
+    SELECT fl.*, u.name AS restaurant_name, u.address AS restaurant_address, {EXPIRATION_CHECK_SQL},
+           bm25({table}, 4.0, 1.0, 0.0) AS rank_score
+    FROM {table}
+    CROSS JOIN food_listings fl ON fl.id = {table}.rowid
+    JOIN users u ON u.id = fl.restaurant_id
+    WHERE {table} MATCH :match AND fl.status = :status
+      AND ((fl.fresh_until > :fresh_after AND fl.fresh_until <= :fresh_before)
+           OR (:include_pending AND fl.fresh_until IS NULL))
+    ORDER BY rank_score, fl.fresh_until IS NULL, fl.fresh_until {order}
+    LIMIT :limit
+"""
+    for scope, (table, order) in SEARCH_SCOPES.items()
+}
+
+# No search words and no restaurant: every listing in the window, in expiry order, off the
+# (status, fresh_until) index; listing_search.find_listings adds pending ones after these
+SEARCH_BROWSE_SQL = {
+    scope: f"""
+    SELECT fl.*, u.name AS restaurant_name, u.address AS restaurant_address, {EXPIRATION_CHECK_SQL}
+    FROM food_listings fl INDEXED BY idx_food_listings_status_fresh_until_timestamp
+    JOIN users u ON u.id = fl.restaurant_id
+    WHERE fl.status = :status AND fl.fresh_until > :fresh_after AND fl.fresh_until <= :fresh_before
+    ORDER BY fl.fresh_until {order}
+    LIMIT :limit
+"""
+    for scope, (table, order) in SEARCH_SCOPES.items()
+}
+
+SEARCH_PENDING_SQL = f"""
+    SELECT fl.*, u.name AS restaurant_name, u.address AS restaurant_address, {EXPIRATION_CHECK_SQL}
+    FROM food_listings fl INDEXED BY idx_food_listings_status_fresh_until_timestamp
+    JOIN users u ON u.id = fl.restaurant_id
+    WHERE fl.status = :status AND fl.fresh_until IS NULL
+    ORDER BY fl.timestamp
+    LIMIT :limit
+"""
+
+SAMPLE_SEARCH_PARAMS = {
+    "status": "Available", "fresh_after": "2026-01-01T12:00:00", "fresh_before": "9999-12-31T23:59:59",
+    "include_pending": 1, "match": '{food_item quantity} : ("rice" OR "chawal")', "limit": 50,
+}
+
+# (name, sql, sample params) for every query a dashboard page runs
+DASHBOARD_QUERIES = [
+    ("restaurant_listings", RESTAURANT_LISTINGS_SQL, (1,)),
+    ("restaurant_listings_page", RESTAURANT_LISTINGS_PAGE_SQL, (1, *FIRST_PAGE_CURSOR, 50)),
+    ("ngo_listings_page", NGO_LISTINGS_PAGE_SQL, (*FIRST_PAGE_CURSOR, 50)),
+    ("admin_restaurants", ADMIN_RESTAURANTS_SQL, ()),
+    ("admin_ngos", ADMIN_NGOS_SQL, ()),
+    ("admin_listings_page", ADMIN_LISTINGS_PAGE_SQL, (*FIRST_PAGE_CURSOR, 50)),
+    ("ngo_nearby_listings", NEARBY_LISTINGS_SQL, SAMPLE_NEARBY_PARAMS),
+    ("restaurant_archive_page", RESTAURANT_ARCHIVE_PAGE_SQL, (1, *FIRST_PAGE_CURSOR, 50)),
+    ("admin_archive_page", ADMIN_ARCHIVE_PAGE_SQL, (*FIRST_PAGE_CURSOR, 50)),
+    *((f"search_{scope}", sql, SAMPLE_SEARCH_PARAMS) for scope, sql in SEARCH_RANKED_SQL.items()),
+    *((f"search_{scope}_browse", sql, SAMPLE_SEARCH_PARAMS) for scope, sql in SEARCH_BROWSE_SQL.items()),
+    ("search_pending", SEARCH_PENDING_SQL, SAMPLE_SEARCH_PARAMS),
+]
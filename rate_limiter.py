@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# refill_per_second == 0 means the bucket only refills by rolling over to a new key (daily quotas)
+Bucket = namedtuple("Bucket", ["key", "capacity", "refill_per_second", "reason", "resets_at"])
+
+
+def _refilled(bucket, tokens, updated_at, now):
+    if tokens is None:
+        return float(bucket.capacity)
+    return min(float(bucket.capacity), tokens + (now - updated_at) * bucket.refill_per_second)
+
+
+def _take(buckets, current_tokens, now):
+    """
+    All-or-nothing: returns (new token counts, None, 0) when every bucket has a token,
+    otherwise (None, reason, retry_after seconds) for the bucket that blocks longest.
+    """
+    blocked_reason = None
+    retry_after = 0.0
+    for bucket, tokens in zip(buckets, current_tokens):
+        if tokens >= 1:
+            continue
+        if bucket.refill_per_second > 0:
+            wait = (1 - tokens) / bucket.refill_per_second
+        else:
+            wait = max(0.0, bucket.resets_at - now)
+        if wait >= retry_after:
+            blocked_reason, retry_after = bucket.reason, wait
+    if blocked_reason:
+        return None, blocked_reason, retry_after
+    return [tokens - 1 for tokens in current_tokens], None, 0.0
+
+
+class MemoryBucketStore:
+    """Token buckets for a single process"""
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, buckets, now):
+        with self._lock:
+            current = [_refilled(b, *self._buckets.get(b.key, (None, now)), now) for b in buckets]
+            remaining, reason, retry_after = _take(buckets, current, now)
+            if remaining is not None:
+                for bucket, tokens in zip(buckets, remaining):
+                    self._buckets[bucket.key] = (tokens, now)
+            return reason, retry_after
+
+    def prune(self, key_prefix, keep_suffix):
+        """Forget buckets under key_prefix that don't end with keep_suffix (e.g. past days)"""
+        with self._lock:
+            for key in [k for k in self._buckets if k.startswith(key_prefix) and not k.endswith(keep_suffix)]:
+                del self._buckets[key]
+
+    def prune_idle(self, key_prefix, updated_before):
+        """Forget buckets under key_prefix last used before updated_before (e.g. full again anyway)"""
+        with self._lock:
+            for key in [k for k, (_, updated_at) in self._buckets.items()
+                        if k.startswith(key_prefix) and updated_at <= updated_before]:
+                del self._buckets[key]
+
+
+class SQLiteBucketStore:
+    """Token buckets in the rate_limit_buckets table, shared by every worker process using the database"""
+
+    def __init__(self, db_pool):
+        self.db_pool = db_pool
+
+    def take(self, buckets, now):
+        with self.db_pool.connection() as connection:
+            # IMMEDIATE takes the write lock up front so the read-modify-write is atomic across processes
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                stored = {}
+                for bucket in buckets:
+                    row = connection.execute(
+                        "SELECT tokens, updated_at FROM rate_limit_buckets WHERE bucket_key = ?", (bucket.key,)
+                    ).fetchone()
+                    stored[bucket.key] = (row[0], row[1]) if row else (None, now)
+                current = [_refilled(b, *stored[b.key], now) for b in buckets]
+                remaining, reason, retry_after = _take(buckets, current, now)
+                if remaining is not None:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO rate_limit_buckets (bucket_key, tokens, updated_at) VALUES (?, ?, ?)",
+                        [(bucket.key, tokens, now) for bucket, tokens in zip(buckets, remaining)]
+                    )
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+        return reason, retry_after
+
+    def prune(self, key_prefix, keep_suffix):
+        with self.db_pool.connection() as connection:
+            connection.execute(
+                "DELETE FROM rate_limit_buckets WHERE bucket_key LIKE ? AND bucket_key NOT LIKE ?",
+                (f"{key_prefix}%", f"%{keep_suffix}")
+            )
+            connection.commit()
+
+    def prune_idle(self, key_prefix, updated_before):
+        with self.db_pool.connection() as connection:
+            connection.execute(
+                "DELETE FROM rate_limit_buckets WHERE bucket_key LIKE ? AND updated_at <= ?",
+                (f"{key_prefix}%", updated_before)
+            )
+            connection.commit()
+
+
+class RateLimiter:
+    """
+    Non-blocking token-bucket limiter for LLM calls: a per-user bucket, a global bucket,
+    a per-user daily quota and a global daily quota, both resetting at local midnight.
+    check() never sleeps; it tells the caller how long to wait instead. user_key should
+    be something a client can't mint for free (an account id, or the client IP), or
+    the per-user limits can be dodged by starting new sessions.
+    """
+
+    def __init__(self, store=None, user_rate=1.0, user_burst=3, global_rate=10.0, global_burst=20, daily_quota=100,
+                 global_daily_quota=1000, prune_interval=300):
+        self.store = store or MemoryBucketStore()
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.daily_quota = daily_quota
+        self.global_daily_quota = global_daily_quota
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+
+    def _prune(self, today, now):
+        """Drop past days' quota counters and per-user buckets idle long enough to have refilled
+        to capacity (a missing bucket starts full, so nobody's limit changes)"""
+        self.store.prune("daily:", f":{today.isoformat()}")
+        if self.user_rate > 0:
+            self.store.prune_idle("user:", now - self.user_burst / self.user_rate)
+
+    def check(self, user_key, now=None):
+        """Consume one request for user_key; returns (allowed, reason, retry_after_seconds)"""
+        now = now if now is not None else time.time()
+        today = datetime.fromtimestamp(now).date()
+        if now >= self._next_prune:
+            # Every prune_interval, so buckets left by one-off clients don't pile up within a day
+            self._next_prune = now + self.prune_interval
+            self._prune(today, now)
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+        buckets = [
+            Bucket(f"daily:global:{today.isoformat()}", self.global_daily_quota, 0, "daily_limit", midnight),
+            Bucket(f"daily:{user_key}:{today.isoformat()}", self.daily_quota, 0, "daily_limit", midnight),
+            Bucket(f"user:{user_key}", self.user_burst, self.user_rate, "rate_limit", None),
+            Bucket("global", self.global_burst, self.global_rate, "rate_limit", None),
+        ]
+        reason, retry_after = self.store.take(buckets, now)
+        return reason is None, reason, retry_after
@@ -0,0 +1,62 @@
+import sqlite3
+import sys
+import time
+
+# Same aggregation as the backfill in migrations/0006_admin_rollups.sql, over live and archived
+# listings. The triggers there keep these tables current, so this is only needed after editing
+# food_listings by hand.
+REBUILD_STATEMENTS = [
+    "DELETE FROM restaurant_stats",
+    "DELETE FROM ngo_stats",
+    """
+    INSERT INTO restaurant_stats (restaurant_id, listed, claimed, expired, timed_claims, claim_seconds, last_listed_at)
+    SELECT restaurant_id, COUNT(*), SUM(status = 'Claimed'), SUM(status = 'Expired'),
+           SUM(status = 'Claimed' AND claimed_at IS NOT NULL),
+           COALESCE(SUM(CASE WHEN status = 'Claimed'
+               THEN (julianday(claimed_at) - julianday(timestamp)) * 86400 END), 0),
+           MAX(timestamp)
+    FROM food_listings_history
+    GROUP BY restaurant_id
+    """,
+    """
+    INSERT INTO ngo_stats (ngo_id, claimed, timed_claims, claim_seconds, last_claimed_at)
+    SELECT claimed_by_id, COUNT(*), COUNT(claimed_at),
+           COALESCE(SUM((julianday(claimed_at) - julianday(timestamp)) * 86400), 0), MAX(claimed_at)
+    FROM food_listings_history
+    WHERE status = 'Claimed' AND claimed_by_id IS NOT NULL
+    GROUP BY claimed_by_id
+    """,
+]
+
+
+def rebuild_rollups(connection):
+    """Recompute restaurant_stats and ngo_stats from food_listings_history in one transaction"""
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        for statement in REBUILD_STATEMENTS:
+            connection.execute(statement)
+        connection.execute('COMMIT')
+    except Exception:
+        connection.execute('ROLLBACK')
+        raise
+    return {
+        "restaurants": connection.execute("SELECT COUNT(*) FROM restaurant_stats").fetchone()[0],
+        "ngos": connection.execute("SELECT COUNT(*) FROM ngo_stats").fetchone()[0],
+    }
+
+
+def main():
+    """Backfill the admin dashboard rollups: python rollups.py [database.db]"""
+    database = sys.argv[1] if len(sys.argv) > 1 else 'database.db'
+    connection = sqlite3.connect(database, isolation_level=None, timeout=30)
+    try:
+        start = time.perf_counter()
+        counts = rebuild_rollups(connection)
+    finally:
+        connection.close()
+    print(f"Rebuilt rollups for {counts['restaurants']} restaurants and {counts['ngos']} NGOs "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == '__main__':
+    main()
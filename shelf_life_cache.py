@@ -0,0 +1,101 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_food_name(food_item_name):
+    """Reduce a food name to a cache key (case, punctuation, spacing, plurals)"""
+    text = re.sub(r"[^a-z0-9\s]", " ", food_item_name.lower())
+    words = []
+    for word in text.split():
+        if len(word) > 3 and not word.endswith(("ss", "us")):
+            if word.endswith("ies"):
+                word = word[:-3] + "y"
+            elif word.endswith(("oes", "ches", "shes", "xes")):
+                word = word[:-2]
+            elif word.endswith("s"):
+                word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+class ShelfLifeCache:
+    """Two-level cache of shelf-life estimates: an in-process LRU in front of a SQLite table"""
+
+    def __init__(self, db_pool, ttl_seconds=7 * 24 * 3600, max_entries=1024):
+        self.db_pool = db_pool
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._memory = OrderedDict()  # key -> (hours, stored_at)
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, stored_at, now):
+        return self.ttl_seconds is None or now - stored_at < self.ttl_seconds
+
+    def _remember(self, key, hours, stored_at):
+        """Insert into the LRU layer; caller must hold the lock"""
+        self._memory[key] = (hours, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, food_item_name):
+        """Return cached hours for a food item, or None on a miss"""
+        key = normalize_food_name(food_item_name)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_fresh(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+        with self.db_pool.connection() as connection:
+            row = connection.execute(
+                'SELECT hours, stored_at FROM shelf_life_cache WHERE food_key = ?', (key,)
+            ).fetchone()
+
+        with self._lock:
+            if row is not None and self._is_fresh(row[1], now):
+                self._remember(key, row[0], row[1])
+                self.db_hits += 1
+                return row[0]
+            self.misses += 1
+        return None
+
+    def set(self, food_item_name, hours):
+        """Store an estimate in both layers"""
+        key = normalize_food_name(food_item_name)
+        now = time.time()
+
+        with self.db_pool.connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO shelf_life_cache (food_key, hours, stored_at) VALUES (?, ?, ?)',
+                (key, hours, now)
+            )
+            connection.commit()
+
+        with self._lock:
+            self._remember(key, hours, now)
+
+    def stats(self):
+        """Hit/miss counters for both cache layers"""
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
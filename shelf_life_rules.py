@@ -0,0 +1,193 @@
+import threading
+from collections import namedtuple
+
+from shelf_life_cache import normalize_food_name
+
+# Hours for food prepared and stored correctly (the assumption the LLM prompt makes too).
+# cooked_hours / raw_hours of None mean the food only comes one way (a dish is always
+# cooked, fruit is sold raw); raw_by_default means a bare name ("tomatoes") is the raw
+# produce. Keywords are matched as whole words after normalize_food_name.
+FoodRule = namedtuple("FoodRule", ["category", "cooked_hours", "raw_hours", "keywords", "raw_by_default"],
+                      defaults=(False,))
+RuleEstimate = namedtuple("RuleEstimate", ["hours", "confidence", "category", "modifiers"])
+
+FOOD_RULES = [
+    FoodRule("seafood", 12, 24, (
+        "fish", "prawn", "shrimp", "crab", "lobster", "seafood", "squid", "calamari", "mussel",
+        "oyster", "clam", "salmon", "tuna", "pomfret", "hilsa", "rohu", "mackerel", "sardine",
+    )),
+    FoodRule("poultry", 24, 24, ("chicken", "turkey", "duck")),
+    FoodRule("meat", 24, 48, (
+        "mutton", "lamb", "beef", "pork", "goat", "keema", "meat", "sausage", "bacon", "ham",
+    )),
+    FoodRule("egg", 24, 504, ("egg", "omelette", "omelet"), raw_by_default=True),
+    FoodRule("rice_dish", 24, None, (
+        "biryani", "pulao", "pulav", "fried rice", "jeera rice", "khichdi", "curd rice",
+        "lemon rice", "tamarind rice", "rice bowl", "bisi bele bath", "chawal",
+    )),
+    FoodRule("grain", 24, 4320, (
+        "rice", "wheat", "flour", "atta", "maida", "besan", "lentil", "oat", "pasta", "noodle",
+        "spaghetti", "macaroni", "quinoa", "millet", "barley", "semolina", "rava", "sooji", "poha",
+        "toor dal", "moong dal", "masoor dal", "chana dal", "urad dal",
+    )),
+    FoodRule("cooked_curry", 24, None, (
+        "curry", "sabzi", "sabji", "dal makhani", "dal tadka", "dal fry", "sambar", "rasam",
+        "rajma", "chole", "chana masala", "korma", "kadhi", "stew", "soup", "gravy", "nihari",
+        "paneer butter masala", "palak paneer", "shahi paneer", "kadai paneer",
+    )),
+    FoodRule("dairy", 24, 72, ("curd", "yogurt", "yoghurt", "dahi", "paneer", "cream"), raw_by_default=True),
+    FoodRule("milk", None, 48, ("milk",)),
+    FoodRule("long_life_dairy", None, 336, ("cheese", "butter", "ghee")),
+    FoodRule("drink", None, 24, ("lassi", "buttermilk", "chaas", "juice", "smoothie", "milkshake")),
+    FoodRule("bread", None, 72, ("bread", "bun", "pav", "loaf", "bagel", "croissant", "muffin")),
+    FoodRule("cake", None, 72, ("cake", "pastry", "brownie", "doughnut", "donut")),
+    FoodRule("dry_bakery", None, 336, ("biscuit", "cookie", "rusk", "cracker", "khari", "toast")),
+    FoodRule("flatbread", None, 24, (
+        "roti", "chapati", "chapatti", "naan", "paratha", "puri", "poori", "kulcha", "bhatura",
+    )),
+    FoodRule("fast_food", None, 24, (
+        "pizza", "sandwich", "burger", "wrap", "roll", "momo", "frankie", "pasta salad",
+    )),
+    FoodRule("south_indian", None, 24, ("idli", "dosa", "vada", "uttapam", "appam", "pongal", "upma")),
+    FoodRule("fried_snack", None, 24, (
+        "samosa", "pakora", "pakoda", "bhaji", "kachori", "cutlet", "spring roll", "french fries", "tikki",
+    )),
+    FoodRule("milk_sweet", None, 24, ("kheer", "payasam", "rabri", "custard", "pudding")),
+    FoodRule("sweet", None, 72, (
+        "gulab jamun", "rasgulla", "jalebi", "ladoo", "laddu", "barfi", "burfi", "halwa",
+        "sandesh", "mithai", "peda", "sweet",
+    )),
+    FoodRule("cut_produce", None, 24, ("fruit salad", "cut fruit", "salad", "sprout", "chutney", "raita")),
+    FoodRule("leafy_greens", 24, 72, ("spinach", "palak", "lettuce", "coriander", "methi", "mint", "greens"),
+             raw_by_default=True),
+    FoodRule("vegetable", 24, 168, (
+        "vegetable", "veg", "veggie", "tomato", "potato", "onion", "carrot", "cabbage", "cauliflower",
+        "cucumber", "chilli", "chillies", "chili", "capsicum", "brinjal", "beans", "peas", "okra", "bhindi",
+        "pumpkin", "gourd", "mushroom", "corn",
+    ), raw_by_default=True),
+    FoodRule("fruit", None, 120, (
+        "fruit", "apple", "banana", "orange", "mango", "grape", "papaya", "guava", "pear",
+        "pomegranate", "watermelon", "melon", "pineapple",
+    )),
+    FoodRule("shelf_stable", None, 4320, ("canned", "tinned", "packaged", "dry fruit", "nut", "jam", "pickle")),
+]
+
+# Words that say how the item was prepared, for foods that can be cooked or raw. Normalized
+# like the item names, so "noodles" is stored as "noodle".
+COOKED_WORDS = frozenset(normalize_food_name(word) for word in (
+    "cooked", "curry", "fry", "fried", "roast", "roasted", "grilled", "boiled", "baked", "steamed",
+    "masala", "gravy", "tikka", "tandoori", "makhani", "kebab", "kabab", "korma", "kadai", "kadhai",
+    "stew", "soup", "sabzi", "sabji", "biryani", "pulao", "chaap", "nihari", "rezala", "bhuna",
+    "keema", "dopiaza", "butter", "chilli", "manchurian", "tadka", "khichdi", "kheer", "halwa",
+    "scrambled", "poached", "mashed", "sauteed", "stuffed", "noodles", "thali", "meal", "wedges",
+    "chaat", "benedict", "bhurji", "fritters", "pie", "casserole",
+))
+RAW_WORDS = frozenset(("raw", "uncooked", "fresh", "whole", "dry", "dried", "uncut"))
+
+# Storage: multiply the base estimate, then clamp
+STORAGE_MODIFIERS = [
+    ("frozen", ("frozen", "freezer"), 10.0, 2160),
+    ("room_temperature", ("room temperature", "unrefrigerated", "ambient", "outside"), 0.25, None),
+    ("refrigerated", ("refrigerated", "chilled", "fridge"), 1.0, None),
+]
+
+DISH_CONFIDENCE = 0.9        # the food only comes one way, e.g. "biryani"
+PREPARATION_CONFIDENCE = 0.85  # cooked or raw is stated, e.g. "chicken curry", "raw fish"
+RAW_DEFAULT_CONFIDENCE = 0.8  # bare produce name, e.g. "tomatoes", and nothing else
+AMBIGUOUS_CONFIDENCE = 0.5   # could be either, e.g. "chicken"; the safer (shorter) estimate is used
+MIXED_PENALTY = 0.05         # several foods in one item, e.g. "chicken and fish"
+
+
+def _phrases(words):
+    """Every 1-3 word phrase in words"""
+    return {" ".join(words[i:i + n]) for n in (1, 2, 3) for i in range(len(words) - n + 1)}
+
+
+# phrase -> rules that mention it; built once so an estimate is a few set lookups
+_KEYWORD_INDEX = {}
+for _rule in FOOD_RULES:
+    for _keyword in _rule.keywords:
+        _KEYWORD_INDEX.setdefault(normalize_food_name(_keyword), []).append(_rule)
+
+
+def _rule_hours(rule, words, only_match):
+    """
+    (hours, confidence) for one matched rule given the item's other words. A produce name is
+    only taken as the raw produce when no other food matched: "tomato rice" is a dish, so it
+    gets the cooked hours, and a confidence low enough that the LLM has the final word.
+    """
+    if rule.raw_hours is None:
+        return rule.cooked_hours, DISH_CONFIDENCE
+    if rule.cooked_hours is None:
+        return rule.raw_hours, DISH_CONFIDENCE
+    if words & COOKED_WORDS:
+        return rule.cooked_hours, PREPARATION_CONFIDENCE
+    if words & RAW_WORDS:
+        return rule.raw_hours, PREPARATION_CONFIDENCE
+    if rule.raw_by_default and only_match:
+        return rule.raw_hours, RAW_DEFAULT_CONFIDENCE
+    if rule.raw_by_default:
+        return rule.cooked_hours, AMBIGUOUS_CONFIDENCE
+    return min(rule.cooked_hours, rule.raw_hours), AMBIGUOUS_CONFIDENCE
+
+
+def estimate_shelf_life_by_rules(food_item_name):
+    """
+    Offline shelf-life estimate from the keyword tables, or None when no rule matches.
+    A dish that matches several rules (e.g. "fish biryani") gets the shortest shelf life
+    among all its matches, confident or not: it spoils as fast as its most perishable part.
+    """
+    key = normalize_food_name(food_item_name)
+    words = key.split()
+    phrases = _phrases(words)
+
+    matches = {}
+    for phrase in phrases:
+        for rule in _KEYWORD_INDEX.get(phrase, ()):
+            # A longer phrase ("fried rice") makes a shorter one it contains ("rice") redundant
+            if rule.category not in matches or len(phrase) > len(matches[rule.category][0]):
+                matches[rule.category] = (phrase, rule)
+    if not matches:
+        return None
+
+    # Drop single-word matches swallowed by a longer matched phrase from another rule
+    matched_phrases = [phrase for phrase, _ in matches.values()]
+    rules = [rule for phrase, rule in matches.values()
+             if not any(phrase != other and f" {phrase} " in f" {other} " for other in matched_phrases)]
+    candidates = [(rule, *_rule_hours(rule, set(words), len(rules) == 1)) for rule in rules]
+
+    # Confidence comes from the most confident matches; every match caps the hours
+    best_confidence = max(confidence for _, _, confidence in candidates)
+    confident = [c for c in candidates if c[2] >= best_confidence - 0.1]
+    rule, hours, _ = min(candidates, key=lambda c: (c[1], -c[2]))
+    confidence = best_confidence if len(confident) == 1 else best_confidence - MIXED_PENALTY
+
+    applied = []
+    for name, keywords, factor, cap in STORAGE_MODIFIERS:
+        if any(keyword in phrases for keyword in keywords):
+            hours = hours * factor
+            if cap is not None:
+                hours = min(hours, cap)
+            applied.append(name)
+            break
+    return RuleEstimate(max(2, int(round(hours))), round(confidence, 2), rule.category, tuple(applied))
+
+
+class EstimateTierStats:
+    """How many shelf-life estimates each tier (rules, cache, llm, fallbacks) answered"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, tier, count=1):
+        with self._lock:
+            self._counts[tier] = self._counts.get(tier, 0) + count
+
+    def stats(self):
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                "counts": dict(self._counts),
+                "shares": {tier: count / total for tier, count in self._counts.items()} if total else {},
+            }
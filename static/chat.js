@@ -0,0 +1,131 @@
+// PulseBot chat widget, shared by index.html and layout.html
+document.addEventListener('DOMContentLoaded', () => {
+    const chatWidget = document.querySelector('.chat-widget');
+    const chatBubble = document.querySelector('.chat-bubble');
+    const chatCloseBtn = document.querySelector('.chat-close');
+    const chatLog = document.getElementById('chat-log');
+    const chatInput = document.getElementById('chat-input');
+    const chatSendBtn = document.getElementById('chat-send-btn');
+    if (!chatWidget) return;
+
+    // Toggle chat window visibility
+    chatBubble.addEventListener('click', () => chatWidget.classList.toggle('open'));
+    chatCloseBtn.addEventListener('click', () => chatWidget.classList.remove('open'));
+
+    // Function to add a message to the chat log
+    function addMessage(sender, text) {
+        const messageElem = document.createElement('div');
+        messageElem.classList.add('chat-message', sender);
+        messageElem.textContent = text;
+        chatLog.appendChild(messageElem);
+        chatLog.scrollTop = chatLog.scrollHeight; // Auto-scroll
+        return messageElem;
+    }
+
+    // Rate limited: keep the send button off until the server says to try again
+    function waitBeforeSending(seconds) {
+        chatSendBtn.disabled = true;
+        setTimeout(() => { chatSendBtn.disabled = false; }, seconds * 1000);
+    }
+
+    // Parse one server-sent event into { type, data }; the type is "message" unless named
+    function parseEvent(event) {
+        let type = 'message';
+        let data = null;
+        for (const line of event.split('\n')) {
+            if (line.startsWith('event: ')) type = line.slice(7);
+            else if (line.startsWith('data: ')) data = JSON.parse(line.slice(6));
+        }
+        return { type, data };
+    }
+
+    // Function to handle sending a message
+    async function sendMessage() {
+        const messageText = chatInput.value.trim();
+        if (messageText === '' || chatSendBtn.disabled) return;
+
+        // Display user's message
+        addMessage('user', messageText);
+        chatInput.value = '';
+
+        // Show a "typing" indicator
+        const typingIndicator = document.createElement('div');
+        typingIndicator.classList.add('chat-message', 'bot');
+        typingIndicator.textContent = '● ● ●';
+        chatLog.appendChild(typingIndicator);
+        chatLog.scrollTop = chatLog.scrollHeight;
+
+        // Replace the "typing" indicator with the reply as it arrives
+        let replyElem = null;
+        const showText = (text) => {
+            if (!replyElem) {
+                chatLog.removeChild(typingIndicator);
+                replyElem = addMessage('bot', '');
+            }
+            replyElem.textContent += text;
+            chatLog.scrollTop = chatLog.scrollHeight;
+        };
+
+        try {
+            // Stream the reply from the Flask backend as server-sent events: "delta" pieces,
+            // then an "event: done" with the full reply (and retry_after when rate limited)
+            const response = await fetch('/chat/stream', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ message: messageText }),
+            });
+
+            if (!response.ok || !response.body) {
+                throw new Error('Network response was not ok');
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let finished = null;
+            while (finished === null) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split('\n\n');
+                buffer = events.pop();
+                for (const event of events) {
+                    const { type, data } = parseEvent(event);
+                    if (!data) continue;
+                    if (type === 'done') {
+                        finished = data;
+                        break;
+                    }
+                    if (data.delta) showText(data.delta);
+                }
+            }
+            // No "done" event: the connection dropped part-way through the reply
+            if (finished === null) throw new Error('Reply stream ended early');
+
+            if (finished.retry_after) {
+                if (!replyElem) showText(`I'm receiving many requests right now. Please try again in ${finished.retry_after} seconds.`);
+                waitBeforeSending(finished.retry_after);
+            } else if (!replyElem) {
+                throw new Error('Empty reply');
+            }
+
+        } catch (error) {
+            // Handle errors; a reply cut off part-way keeps its text and gets a note after it
+            console.error('Chat error:', error);
+            if (typingIndicator.parentNode) chatLog.removeChild(typingIndicator);
+            addMessage('bot', replyElem
+                ? 'Sorry, the connection dropped before I could finish that answer. Please try again.'
+                : 'Sorry, I am having trouble connecting. Please try again.');
+        }
+    }
+
+    // Event listeners for sending a message
+    chatSendBtn.addEventListener('click', sendMessage);
+    chatInput.addEventListener('keypress', (e) => {
+        if (e.key === 'Enter') {
+            sendMessage();
+        }
+    });
+});
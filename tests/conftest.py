@@ -0,0 +1,25 @@
+"""
+The checks themselves live in check_query_plans.py and benchmarks/; these tests run
+them as scripts, each in its own process (the benchmarks import app, which sets up a
+fresh database in a temp dir), and fail with the script's output when it exits non-zero.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def run_check():
+    def run(script, *args, timeout=600):
+        path = os.path.join(REPO_ROOT, script)
+        result = subprocess.run(
+            [sys.executable, path, *args], cwd=os.path.dirname(path),
+            capture_output=True, text=True, timeout=timeout,
+        )
+        assert result.returncode == 0, f"{script} failed:\n{result.stdout}\n{result.stderr}"
+        return result.stdout
+    return run
@@ -0,0 +1,2 @@
+def test_chat_stream_pieces_done_event_and_history(run_check):
+    run_check("benchmarks/bench_chat_streaming.py")
@@ -0,0 +1,2 @@
+def test_one_winner_per_contended_listing(run_check):
+    run_check("benchmarks/bench_claim_contention.py", "--threads", "16", "--listings", "50", "--claims", "1000")
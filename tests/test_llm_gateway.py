@@ -0,0 +1,2 @@
+def test_gateway_retries_breaker_and_retry_after(run_check):
+    run_check("benchmarks/bench_llm_gateway.py")
@@ -0,0 +1,2 @@
+def test_dashboard_queries_use_indexes(run_check):
+    assert run_check("check_query_plans.py").startswith("OK:")